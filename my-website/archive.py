@@ -0,0 +1,452 @@
+"""
+지난 학기 보관(archive)
+기준일(cutoff) 이전의 야자 기록과 마감이 지난 수행평가를 별도 SQLite 파일로 옮겨
+자주 조회하는 테이블(yaja_students, suhang)을 작게 유지합니다.
+
+- 기준일은 오늘에서 ARCHIVE_AFTER_DAYS일 전이 속한 학기의 첫날이므로 학기 단위로 옮겨집니다.
+- 원본 행은 학기(semester) 컬럼과 함께 *_archive 테이블에 그대로 보관합니다.
+- 야자 기록은 날짜+학생 단위 요약(yaja_rollup)도 만들어, 통계 조회가 보관 구간을 포함할 때만 합칩니다.
+- 학기별 행 수와 기간은 archive_summary에 남깁니다.
+- 아직 Supabase로 전송되지 않은 행(아웃박스 대기)은 옮기지 않습니다.
+- Supabase에는 전체 이력이 그대로 남으며, 복제본 동기화는 보관된 id를 다시 가져오지 않습니다.
+
+사용법 (my-website 디렉터리에서):
+    python archive.py                      # 기본 기준일
+    python archive.py --cutoff 2025-09-01
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from config import Config
+from outbox import pending_changes
+from yaja_stats import semester_key, semester_start
+
+logger = logging.getLogger(__name__)
+
+YAJA_COLUMNS = ('id', 'date', 'period', 'student_name', 'student_code', 'student_number', 'reason',
+                'class_id', 'created_at')
+SUHANG_COLUMNS = ('id', 'subject', 'title', 'deadline', 'description', 'creator_name', 'creator_code',
+                  'class_id', 'created_at')
+# 보관 테이블: 원본 테이블 -> (보관 테이블, 컬럼, 기준 날짜 컬럼)
+ARCHIVED_TABLES = {
+    'yaja_students': ('yaja_students_archive', YAJA_COLUMNS, 'date'),
+    'suhang': ('suhang_archive', SUHANG_COLUMNS, 'deadline'),
+}
+
+
+def _chunks(values, size=500):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class Archive:
+    def __init__(self, db_path, archive_path, outbox, after_days=180, interval=0, on_archived=None):
+        self.db_path = db_path
+        self.archive_path = archive_path
+        self.outbox = outbox
+        self.after_days = after_days
+        self.interval = interval
+        # 옮긴 뒤 {'yaja_students': {(class_id, date)}, 'suhang': {(class_id,)}}로 호출 (캐시·인덱스 무효화용)
+        self.on_archived = on_archived
+        self._ids = {}
+        self._ids_lock = threading.Lock()
+        # 마지막으로 읽은 archive_runs id (다른 프로세스의 실행도 감지)
+        self._seen_run = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.archived_through = None
+        self.last_run = None
+
+    def _connect(self):
+        return sqlite3.connect(self.archive_path, timeout=30)
+
+    def init(self):
+        conn = self._connect()
+        try:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS yaja_students_archive (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    period INTEGER NOT NULL,
+                    student_name TEXT NOT NULL,
+                    student_code TEXT NOT NULL,
+                    student_number TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    class_id TEXT NOT NULL,
+                    created_at TIMESTAMP,
+                    semester TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_yaja_archive_class_date ON yaja_students_archive (class_id, date, period);
+                CREATE INDEX IF NOT EXISTS idx_yaja_archive_class_student_date
+                    ON yaja_students_archive (class_id, student_code, date, period);
+                CREATE TABLE IF NOT EXISTS suhang_archive (
+                    id INTEGER PRIMARY KEY,
+                    subject TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    deadline TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    creator_name TEXT NOT NULL,
+                    creator_code TEXT NOT NULL,
+                    class_id TEXT NOT NULL,
+                    created_at TIMESTAMP,
+                    semester TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_suhang_archive_class_deadline ON suhang_archive (class_id, deadline);
+                -- 날짜+학생 단위 야자 요약: 차시별 행 수와 사유 목록(JSON, 원래 순서)
+                CREATE TABLE IF NOT EXISTS yaja_rollup (
+                    class_id TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    student_name TEXT NOT NULL,
+                    p1 INTEGER NOT NULL DEFAULT 0,
+                    p2 INTEGER NOT NULL DEFAULT 0,
+                    p3 INTEGER NOT NULL DEFAULT 0,
+                    reasons TEXT NOT NULL,
+                    PRIMARY KEY (class_id, date, student_name)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS archive_summary (
+                    class_id TEXT NOT NULL,
+                    semester TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    rows INTEGER NOT NULL,
+                    first_date TEXT,
+                    last_date TEXT,
+                    PRIMARY KEY (class_id, semester, table_name)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS archive_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    cutoff TEXT NOT NULL,
+                    yaja_rows INTEGER NOT NULL,
+                    suhang_rows INTEGER NOT NULL,
+                    duration_ms REAL,
+                    ran_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            ''')
+        finally:
+            conn.close()
+        self._refresh()
+
+    def _refresh(self):
+        """보관이 새로 실행되었으면 (CLI 실행 포함) 보관 범위와 id 캐시를 다시 읽습니다."""
+        conn = self._connect()
+        try:
+            run_id = conn.execute('SELECT MAX(id) FROM archive_runs').fetchone()[0]
+            if run_id == self._seen_run:
+                return
+            through = conn.execute('SELECT MAX(date) FROM yaja_rollup').fetchone()[0]
+        finally:
+            conn.close()
+        with self._ids_lock:
+            self._ids.clear()
+            self.archived_through = through
+            self._seen_run = run_id
+
+    def cutoff(self, today=None):
+        """오늘에서 after_days일 전이 속한 학기의 첫날. 이 날짜 이전의 행을 옮깁니다."""
+        today = today or date.today()
+        return semester_start(today - timedelta(days=self.after_days))
+
+    # 옮기기
+    def run(self, cutoff=None):
+        """
+        기준일 이전의 행을 보관 파일로 옮깁니다.
+
+        Returns:
+            {'cutoff', 'yaja_students', 'suhang', 'duration_ms'} (옮긴 행 수)
+        """
+        cutoff = (cutoff or self.cutoff()).isoformat()
+        started = time.time()
+        touched = {}
+        moved = {}
+        # 복제본 동기화·아웃박스 전송과 겹치지 않도록 같은 락을 잡음
+        with self.outbox.lock:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                conn.execute('ATTACH DATABASE ? AS archive', (self.archive_path,))
+                conn.execute('BEGIN IMMEDIATE')
+                upserts, _ = pending_changes(conn)
+                for table in ARCHIVED_TABLES:
+                    moved[table], touched[table] = self._move(conn, table, cutoff, upserts.get(table, set()))
+                duration_ms = (time.time() - started) * 1000
+                conn.execute('''INSERT INTO archive.archive_runs (cutoff, yaja_rows, suhang_rows, duration_ms)
+                                VALUES (?, ?, ?, ?)''', (cutoff, moved['yaja_students'], moved['suhang'], duration_ms))
+                conn.execute('COMMIT')
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+            finally:
+                conn.close()
+        self._refresh()
+        self.last_run = {'cutoff': cutoff, 'yaja_students': moved['yaja_students'], 'suhang': moved['suhang'],
+                         'duration_ms': round(duration_ms, 3)}
+        if self.on_archived is not None and any(touched.values()):
+            self.on_archived(touched)
+        return self.last_run
+
+    def _move(self, conn, table, cutoff, pending):
+        archive_table, columns, date_column = ARCHIVED_TABLES[table]
+        rows = [dict(zip(columns, row)) for row in conn.execute(
+            f'''SELECT {', '.join(columns)} FROM main.{table} WHERE {date_column} < ?
+                ORDER BY {date_column}{', period' if table == 'yaja_students' else ''}, id''', (cutoff,))]
+        # 아웃박스 대기 중인 행은 다음 실행에서 옮김
+        rows = [row for row in rows if row['id'] not in pending]
+        if not rows:
+            return 0, set()
+        ids = [row['id'] for row in rows]
+        # 이전 실행이 보관 파일만 커밋하고 중단된 경우, 이미 보관된 행은 요약에 다시 더하지 않음
+        existing = set()
+        for chunk in _chunks(ids):
+            existing.update(r[0] for r in conn.execute(
+                f"SELECT id FROM archive.{archive_table} WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        new_rows = [row for row in rows if row['id'] not in existing]
+        for row in new_rows:
+            row['semester'] = semester_key(row[date_column])
+        conn.executemany(f'''INSERT INTO archive.{archive_table} ({', '.join(columns)}, semester)
+                             VALUES ({', '.join('?' * len(columns))}, ?)''',
+                         [tuple(row[c] for c in columns) + (row['semester'],) for row in new_rows])
+        if table == 'yaja_students':
+            self._rollup_yaja(conn, new_rows)
+        self._summarize(conn, table, date_column, new_rows)
+        for chunk in _chunks(ids):
+            conn.execute(f"DELETE FROM main.{table} WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        if table == 'yaja_students':
+            touched = {(row['class_id'], row['date']) for row in rows}
+        else:
+            touched = {(row['class_id'],) for row in rows}
+        return len(rows), touched
+
+    @staticmethod
+    def _rollup_yaja(conn, rows):
+        rollups = {}
+        for row in rows:
+            key = (row['class_id'], row['date'], row['student_name'])
+            if key not in rollups:
+                existing = conn.execute('''SELECT p1, p2, p3, reasons FROM archive.yaja_rollup
+                                           WHERE class_id = ? AND date = ? AND student_name = ?''', key).fetchone()
+                if existing:
+                    rollups[key] = [list(existing[:3]), json.loads(existing[3])]
+                else:
+                    rollups[key] = [[0, 0, 0], []]
+            counts, reasons = rollups[key]
+            if 1 <= row['period'] <= 3:
+                counts[row['period'] - 1] += 1
+            reasons.append(row['reason'])
+        conn.executemany('''INSERT OR REPLACE INTO archive.yaja_rollup
+                            (class_id, date, student_name, p1, p2, p3, reasons) VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                         [key + tuple(counts) + (json.dumps(reasons, ensure_ascii=False),)
+                          for key, (counts, reasons) in rollups.items()])
+
+    @staticmethod
+    def _summarize(conn, table, date_column, rows):
+        summary = {}
+        for row in rows:
+            key = (row['class_id'], row['semester'])
+            count, first, last = summary.get(key, (0, row[date_column], row[date_column]))
+            summary[key] = (count + 1, min(first, row[date_column]), max(last, row[date_column]))
+        conn.executemany('''INSERT INTO archive.archive_summary (class_id, semester, table_name, rows, first_date, last_date)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(class_id, semester, table_name) DO UPDATE SET
+                                rows = rows + excluded.rows,
+                                first_date = min(first_date, excluded.first_date),
+                                last_date = max(last_date, excluded.last_date)''',
+                         [(class_id, semester, table, count, first, last)
+                          for (class_id, semester), (count, first, last) in summary.items()])
+
+    # 삭제
+    def delete(self, table, row_id, class_id):
+        """
+        보관된 행 하나를 지우고 요약(yaja_rollup, archive_summary)에서 빼며, 같은 트랜잭션에서
+        아웃박스에 Supabase 삭제를 기록합니다.
+
+        Returns:
+            지운 행(dict) 또는 보관 파일에 없으면 None
+        """
+        archive_table, columns, date_column = ARCHIVED_TABLES[table]
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute('ATTACH DATABASE ? AS archive', (self.archive_path,))
+            conn.execute('BEGIN IMMEDIATE')
+            found = conn.execute(f'''SELECT {', '.join(columns)}, semester FROM archive.{archive_table}
+                                     WHERE id = ? AND class_id = ?''', (row_id, class_id)).fetchone()
+            if found is None:
+                conn.execute('ROLLBACK')
+                return None
+            row = dict(zip(columns + ('semester',), found))
+            conn.execute(f'DELETE FROM archive.{archive_table} WHERE id = ?', (row_id,))
+            if table == 'yaja_students':
+                self._unroll_yaja(conn, row)
+            conn.execute('''UPDATE archive.archive_summary SET rows = rows - 1
+                            WHERE class_id = ? AND semester = ? AND table_name = ?''',
+                         (row['class_id'], row['semester'], table))
+            conn.execute('DELETE FROM archive.archive_summary WHERE rows <= 0')
+            self.outbox.enqueue(conn.cursor(), table, 'delete', {'column': 'id', 'value': row_id})
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        # archived_ids에는 남겨 두어, 아웃박스가 보내기 전에 복제본이 Supabase의 행을 다시 가져오지 않게 함
+        self.outbox.notify()
+        return row
+
+    @staticmethod
+    def _unroll_yaja(conn, row):
+        key = (row['class_id'], row['date'], row['student_name'])
+        existing = conn.execute('''SELECT p1, p2, p3, reasons FROM archive.yaja_rollup
+                                   WHERE class_id = ? AND date = ? AND student_name = ?''', key).fetchone()
+        if existing is None:
+            return
+        counts, reasons = list(existing[:3]), json.loads(existing[3])
+        if 1 <= row['period'] <= 3 and counts[row['period'] - 1] > 0:
+            counts[row['period'] - 1] -= 1
+        if row['reason'] in reasons:
+            reasons.remove(row['reason'])
+        if not any(counts) and not reasons:
+            conn.execute('DELETE FROM archive.yaja_rollup WHERE class_id = ? AND date = ? AND student_name = ?', key)
+        else:
+            conn.execute('''UPDATE archive.yaja_rollup SET p1 = ?, p2 = ?, p3 = ?, reasons = ?
+                            WHERE class_id = ? AND date = ? AND student_name = ?''',
+                         tuple(counts) + (json.dumps(reasons, ensure_ascii=False),) + key)
+
+    # 조회
+    def covers(self, start_date):
+        """start_date부터의 조회에 보관된 야자 기록이 포함될 수 있는지 반환합니다 (None이면 처음부터)."""
+        self._refresh()
+        return self.archived_through is not None and (not start_date or start_date <= self.archived_through)
+
+    def yaja_rollups(self, class_id, start_date=None, end_date=None):
+        """통계용 요약을 build_yaja_statistics의 rollups 형식으로 반환합니다."""
+        query = 'SELECT date, student_name, p1, p2, p3, reasons FROM yaja_rollup WHERE class_id = ?'
+        params = [class_id]
+        if start_date:
+            query += ' AND date >= ?'
+            params.append(start_date)
+        if end_date:
+            query += ' AND date <= ?'
+            params.append(end_date)
+        conn = self._connect()
+        try:
+            rows = conn.execute(query + ' ORDER BY date', params).fetchall()
+        finally:
+            conn.close()
+        return [(row[0], row[1], row[2:5], json.loads(row[5])) for row in rows]
+
+    def yaja_rows(self, class_id, day):
+        """보관된 날짜의 야자 기록을 (id, period, student_name, student_code, student_number, reason)으로 반환합니다."""
+        conn = self._connect()
+        try:
+            return conn.execute('''SELECT id, period, student_name, student_code, student_number, reason
+                                   FROM yaja_students_archive WHERE class_id = ? AND date = ?
+                                   ORDER BY period, student_name''', (class_id, day)).fetchall()
+        finally:
+            conn.close()
+
+    def yaja_student_rows(self, class_id, student_code, start_date=None, end_date=None):
+        """보관된 학생 한 명의 야자 기록을 build_student_history의 rows 형식으로 반환합니다."""
+        query = '''SELECT date, period, reason, student_name, student_number
+                   FROM yaja_students_archive WHERE class_id = ? AND student_code = ?'''
+        params = [class_id, student_code]
+        if start_date:
+            query += ' AND date >= ?'
+            params.append(start_date)
+        if end_date:
+            query += ' AND date <= ?'
+            params.append(end_date)
+        conn = self._connect()
+        try:
+            return conn.execute(query + ' ORDER BY date, period', params).fetchall()
+        finally:
+            conn.close()
+
+    def yaja_keys(self, class_id, start_date, end_date):
+        """보관된 기간의 (date, period, student_code) 집합 (일괄 가져오기의 중복 확인용)."""
+        conn = self._connect()
+        try:
+            return set(conn.execute('''SELECT date, period, student_code FROM yaja_students_archive
+                                       WHERE class_id = ? AND date >= ? AND date <= ?''',
+                                    (class_id, start_date, end_date)))
+        finally:
+            conn.close()
+
+    def archived_ids(self, table):
+        """보관된 행의 id 집합 (복제본이 다시 가져오지 않도록 사용)."""
+        if table not in ARCHIVED_TABLES:
+            return set()
+        self._refresh()
+        with self._ids_lock:
+            ids = self._ids.get(table)
+            if ids is None:
+                conn = self._connect()
+                try:
+                    ids = {row[0] for row in conn.execute(f'SELECT id FROM {ARCHIVED_TABLES[table][0]}')}
+                finally:
+                    conn.close()
+                self._ids[table] = ids
+            return ids
+
+    # 백그라운드 실행 (interval이 0이면 사용 안 함)
+    def start(self):
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='archive', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                result = self.run()
+                logger.info('보관 완료: %s', result)
+            except Exception as e:
+                logger.error('보관 실패: %s', e)
+
+    # 메트릭
+    def stats(self):
+        conn = self._connect()
+        try:
+            summary = [{'class_id': c, 'semester': s, 'table': t, 'rows': n, 'first_date': f, 'last_date': l}
+                       for c, s, t, n, f, l in conn.execute(
+                           'SELECT * FROM archive_summary ORDER BY class_id, semester, table_name')]
+        finally:
+            conn.close()
+        return {
+            'archived_through': self.archived_through,
+            'next_cutoff': self.cutoff().isoformat(),
+            'last_run': self.last_run,
+            'semesters': summary
+        }
+
+
+def main(argv=None):
+    from database import db_manager
+    from outbox import OutboxReplayer
+
+    parser = argparse.ArgumentParser(description='지난 학기 야자 기록·수행평가를 보관 파일로 옮기기')
+    parser.add_argument('--cutoff', default=None, help='이 날짜(YYYY-MM-DD) 이전의 행을 옮김 (기본: 학기 단위 자동)')
+    args = parser.parse_args(argv)
+
+    # 락만 공유하면 되므로 리플레이어는 시작하지 않음 (실행 중인 서버와는 SQLite 락으로 직렬화)
+    outbox = OutboxReplayer(Config.SQLITE_PATH, db_manager, enabled=False)
+    archive = Archive(Config.SQLITE_PATH, Config.ARCHIVE_DB_PATH, outbox, Config.ARCHIVE_AFTER_DAYS)
+    archive.init()
+    cutoff = date.fromisoformat(args.cutoff) if args.cutoff else None
+    result = archive.run(cutoff)
+    print(f"✅ 기준일 {result['cutoff']}: 야자 {result['yaja_students']}행, 수행평가 {result['suhang']}행 보관 "
+          f"({result['duration_ms']:.0f}ms) -> {Config.ARCHIVE_DB_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+"""
+SQLite 온라인 백업
+users.db(계정, Supabase 장애 중 쓰기, 아웃박스)를 서버가 쓰는 중에도 안전하게 스냅숏으로 남깁니다.
+파일을 그대로 복사하면 쓰는 도중의 페이지나 WAL에만 있는 변경이 빠질 수 있습니다.
+
+- mode='backup': SQLite 온라인 백업 API로 pages개씩 복사하고 단계 사이에 sleep_ms만큼 쉬어
+  쓰기 요청이 락을 기다리지 않게 합니다. 복사 중 다른 연결이 쓰면 SQLite가 처음부터 다시 복사하므로,
+  max_restarts번 넘게 다시 시작하면 한 단계로 복사합니다 (WAL 모드에서는 한 단계여도 쓰기를 막지 않음).
+- mode='vacuum': `VACUUM INTO`로 빈 페이지를 뺀 사본을 만듭니다 (읽기 트랜잭션 하나).
+- 사본은 quick_check로 확인한 뒤 gzip으로 압축하고, 원본 내용의 sha256을 옆의 .json에 남깁니다.
+- 최근 keep개만 남기고, restore는 체크섬과 무결성을 확인한 뒤 백업 API로 되돌립니다
+  (되돌리기 전 현재 DB도 스냅숏으로 남김).
+
+사용법 (my-website 디렉터리에서):
+    python backup.py                          # 지금 백업
+    python backup.py list                     # 스냅숏 목록
+    python backup.py verify <스냅숏.db.gz>     # 체크섬·무결성 확인
+    python backup.py restore <스냅숏.db.gz>    # users.db로 되돌리기 (서버를 멈춘 뒤 권장)
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MODES = ('backup', 'vacuum')
+SUFFIX = '.db.gz'
+# 압축·체크섬을 계산할 때 읽는 크기
+CHUNK_SIZE = 1024 * 1024
+# restore 직전 스냅숏의 라벨. 정기 스냅숏의 keep과 따로 최근 PRE_RESTORE_KEEP개를 남김
+PRE_RESTORE = 'pre-restore'
+PRE_RESTORE_KEEP = 3
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _quick_check(path):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute('PRAGMA quick_check').fetchone()[0]
+    finally:
+        conn.close()
+    if result != 'ok':
+        raise RuntimeError(f'백업 사본 무결성 확인 실패: {result}')
+
+
+class Backup:
+    def __init__(self, db_path, directory, mode='backup', pages=256, sleep_ms=5.0, max_restarts=5, keep=14,
+                 interval=0, compresslevel=6):
+        """
+        Args:
+            db_path: 백업할 SQLite 파일
+            directory: 스냅숏(.db.gz, .json)을 둘 디렉터리
+            mode: 'backup'(온라인 백업 API, 단계 복사) 또는 'vacuum'(VACUUM INTO)
+            pages: backup 모드에서 한 단계에 복사할 페이지 수
+            sleep_ms: 단계 사이에 쉬는 시간
+            max_restarts: 이만큼 다시 시작되면 남은 복사를 한 단계로
+            keep: 남겨 둘 최근 스냅숏 수
+            interval: 서버 안에서 백업하는 주기(초, 0이면 사용 안 함)
+        """
+        if mode not in MODES:
+            raise ValueError(f'알 수 없는 백업 모드: {mode}')
+        self.db_path = db_path
+        self.directory = directory
+        self.mode = mode
+        self.pages = pages
+        self.sleep_ms = sleep_ms
+        self.max_restarts = max_restarts
+        self.keep = keep
+        self.interval = interval
+        self.compresslevel = compresslevel
+        self.prefix = os.path.splitext(os.path.basename(db_path))[0] + '-'
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+        self.last_error = None
+        self.runs = 0
+
+    # 복사
+    def _copy_backup(self, target):
+        """온라인 백업 API로 복사하고 다시 시작된 횟수를 반환합니다."""
+        state = {'remaining': None, 'restarts': 0}
+
+        def progress(status, remaining, total):
+            # 남은 페이지가 늘었으면 다른 연결의 쓰기로 처음부터 다시 복사한 것
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+            state['remaining'] = remaining
+            if state['restarts'] > self.max_restarts:
+                raise _TooManyRestarts
+
+        source = sqlite3.connect(self.db_path, timeout=30)
+        destination = sqlite3.connect(target)
+        try:
+            try:
+                source.backup(destination, pages=self.pages, progress=progress, sleep=self.sleep_ms / 1000)
+            except _TooManyRestarts:
+                source.backup(destination, pages=-1)
+        finally:
+            destination.close()
+            source.close()
+        return state['restarts']
+
+    def _copy_vacuum(self, target):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute('VACUUM INTO ?', (target,))
+        finally:
+            conn.close()
+        return 0
+
+    # 스냅숏
+    def run(self, label=None):
+        """
+        스냅숏을 하나 만들고 오래된 스냅숏을 지웁니다.
+
+        Returns:
+            스냅숏 정보 {'file', 'label', 'created_at', 'created_ts', 'mode', 'db_bytes', 'gz_bytes', 'sha256', 'copy_ms', 'duration_ms', 'restarts'}
+        """
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            now = time.time()
+            name = self.prefix + time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f'{now % 1:.3f}'[1:]
+            if label:
+                name += f'-{label}'
+
+            path = os.path.join(self.directory, name + SUFFIX)
+            fd, raw_path = tempfile.mkstemp(suffix='.db', dir=self.directory)
+            os.close(fd)
+            os.remove(raw_path)  # VACUUM INTO는 없는 파일에만 씀
+            started = time.perf_counter()
+            try:
+                restarts = self._copy_vacuum(raw_path) if self.mode == 'vacuum' else self._copy_backup(raw_path)
+                copy_ms = (time.perf_counter() - started) * 1000
+                _quick_check(raw_path)
+                digest = hashlib.sha256()
+                with open(raw_path, 'rb') as src, gzip.open(path + '.tmp', 'wb', self.compresslevel) as dst:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                os.replace(path + '.tmp', path)
+                entry = {
+                    'file': os.path.basename(path),
+                    'label': label,
+                    'created_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)),
+                    'created_ts': now,
+                    'source': os.path.abspath(self.db_path),
+                    'mode': self.mode,
+                    'db_bytes': os.path.getsize(raw_path),
+                    'gz_bytes': os.path.getsize(path),
+                    'sha256': digest.hexdigest(),
+                    'copy_ms': round(copy_ms, 1),
+                    'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+                    'restarts': restarts
+                }
+                with open(path[:-len(SUFFIX)] + '.json', 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False, indent=2)
+            finally:
+                for leftover in (raw_path, path + '.tmp'):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+            self._prune()
+            self.runs += 1
+            self.last_run = entry
+            return entry
+
+    def snapshots(self):
+        """스냅숏 정보를 최신순으로 반환합니다."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith(self.prefix) and name.endswith('.json'):
+                try:
+                    with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                        entries.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(entries, key=lambda e: e['created_ts'], reverse=True)
+
+    def _prune(self):
+        # 되돌리기 전 스냅숏은 정기 백업이 keep을 채워도 지우지 않음
+        snapshots = self.snapshots()
+        regular = [entry for entry in snapshots if entry.get('label') != PRE_RESTORE]
+        pre_restore = [entry for entry in snapshots if entry.get('label') == PRE_RESTORE]
+        for entry in regular[self.keep:] + pre_restore[PRE_RESTORE_KEEP:]:
+            base = os.path.join(self.directory, entry['file'][:-len(SUFFIX)])
+            for path in (base + SUFFIX, base + '.json'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # 확인·되돌리기
+    def _manifest(self, snapshot_path):
+        with open(snapshot_path[:-len(SUFFIX)] + '.json', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _extract(self, snapshot_path):
+        """스냅숏을 임시 파일로 풀고 체크섬·무결성을 확인한 뒤 그 경로를 반환합니다."""
+        manifest = self._manifest(snapshot_path)
+        fd, raw_path = tempfile.mkstemp(suffix='.db', dir=os.path.dirname(os.path.abspath(snapshot_path)))
+        try:
+            with os.fdopen(fd, 'wb') as dst, gzip.open(snapshot_path, 'rb') as src:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            if _sha256_file(raw_path) != manifest['sha256']:
+                raise RuntimeError(f'체크섬이 다릅니다: {snapshot_path}')
+            _quick_check(raw_path)
+        except Exception:
+            os.remove(raw_path)
+            raise
+        return raw_path
+
+    def verify(self, snapshot_path):
+        """체크섬과 무결성을 확인합니다. 문제가 있으면 RuntimeError."""
+        os.remove(self._extract(snapshot_path))
+        return self._manifest(snapshot_path)
+
+    def restore(self, snapshot_path, target=None, snapshot_first=True):
+        """
+        스냅숏을 target(기본: db_path)으로 되돌립니다. 파일을 바꿔치지 않고 백업 API로 덮어쓰므로
+        WAL·다른 연결과 충돌하지 않습니다.
+        """
+        target = target or self.db_path
+        raw_path = self._extract(snapshot_path)
+        try:
+            if snapshot_first and os.path.exists(target):
+                Backup(target, self.directory, keep=self.keep).run(label=PRE_RESTORE)
+            source = sqlite3.connect(raw_path)
+            destination = sqlite3.connect(target, timeout=30)
+            try:
+                source.backup(destination)
+            finally:
+                destination.close()
+                source.close()
+        finally:
+            os.remove(raw_path)
+        return self._manifest(snapshot_path)
+
+    # 백그라운드 실행 (interval이 0이면 사용 안 함)
+    def start(self):
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='backup', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _due(self):
+        # 여러 워커 프로세스가 같은 디렉터리를 쓰면 다른 프로세스가 방금 만든 스냅숏이 있는지 봄
+        latest = self.snapshots()[:1]
+        return not latest or time.time() - latest[0]['created_ts'] >= self.interval * 0.5
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if self._due():
+                    entry = self.run()
+                    logger.info('백업 완료: %s (%dB, %.0fms)', entry['file'], entry['gz_bytes'], entry['duration_ms'])
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error('백업 실패: %s', e)
+
+    # 메트릭
+    def stats(self):
+        snapshots = self.snapshots()
+        return {
+            'mode': self.mode,
+            'interval': self.interval,
+            'runs': self.runs,
+            'snapshots': len(snapshots),
+            'latest': snapshots[0] if snapshots else None,
+            'last_run': self.last_run,
+            'last_error': self.last_error
+        }
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def from_config(db_path=None):
+    return Backup(db_path or Config.SQLITE_PATH, Config.BACKUP_DIR, mode=Config.BACKUP_MODE,
+                  pages=Config.BACKUP_PAGES, sleep_ms=Config.BACKUP_SLEEP_MS, keep=Config.BACKUP_KEEP,
+                  interval=Config.BACKUP_INTERVAL)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='users.db 온라인 백업·확인·되돌리기')
+    parser.add_argument('command', nargs='?', default='run', choices=('run', 'list', 'verify', 'restore'))
+    parser.add_argument('snapshot', nargs='?', help='verify/restore할 스냅숏(.db.gz)')
+    parser.add_argument('--to', default=None, help='restore 대상 (기본: SQLITE_PATH)')
+    parser.add_argument('--mode', choices=MODES, default=None, help='복사 방식 (기본: BACKUP_MODE)')
+    args = parser.parse_args(argv)
+
+    backup = from_config()
+    if args.mode:
+        backup.mode = args.mode
+    if args.command == 'run':
+        entry = backup.run()
+        print(f"✅ {entry['file']}: {entry['db_bytes']:,}B -> {entry['gz_bytes']:,}B "
+              f"(복사 {entry['copy_ms']:.0f}ms, 전체 {entry['duration_ms']:.0f}ms, 재시작 {entry['restarts']}) "
+              f"-> {backup.directory}")
+    elif args.command == 'list':
+        for entry in backup.snapshots():
+            print(f"{entry['file']}  {entry['gz_bytes']:>12,}B  {entry['created_at']}  {entry['sha256'][:12]}")
+    else:
+        if not args.snapshot:
+            parser.error(f'{args.command}할 스냅숏 파일을 지정하세요.')
+        if args.command == 'verify':
+            entry = backup.verify(args.snapshot)
+            print(f"✅ {entry['file']}: 체크섬·무결성 확인 ({entry['sha256'][:12]})")
+        else:
+            entry = backup.restore(args.snapshot, args.to)
+            print(f"✅ {entry['file']} ({entry['created_at']}) -> {args.to or backup.db_path} 되돌림 "
+                  f"(이전 내용은 pre-restore 스냅숏으로 남김)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+"""
+API 부하 테스트 및 마이크로 벤치마크 모음
+my-website 디렉터리에서 `python -m benchmarks.run` 으로 실행합니다.
+"""
@@ -0,0 +1,175 @@
+"""
+백업 중 쓰기 지연
+쓰기 스레드가 야자 기록을 한 행씩 INSERT·commit하는 동안 backup.Backup으로 스냅숏을 만들고,
+백업이 없을 때(baseline)와 복사 방식별 쓰기 지연(p50/p95/p99/max)과 백업 시간을 비교합니다.
+
+- backup(pages, sleep): 온라인 백업 API 단계 복사 (기본 설정)
+- backup(one-step): pages=-1, 한 단계 복사
+- vacuum: VACUUM INTO
+
+사용법 (my-website 디렉터리에서):
+    python -m benchmarks.backup --scale 200000 --runs 5
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.loadgen import percentile
+from benchmarks.run import RESULTS_DIR, git_commit, prepare_environment
+
+# 단계가 바뀌어도 학번이 겹치지 않도록 (class_id, date, period, student_code)가 유일해야 함
+_codes = itertools.count(1)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='users.db 백업 중 쓰기 지연과 백업 시간 측정')
+    parser.add_argument('--scale', type=int, default=200000, help='야자 기록 행 수 (DB 크기)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--runs', type=int, default=5, help='방식마다 연속으로 만들 스냅숏 수')
+    parser.add_argument('--baseline-seconds', type=float, default=3.0, help='백업 없이 쓰기만 재는 시간')
+    parser.add_argument('--pages', type=int, default=256, help='단계 복사의 한 단계 페이지 수')
+    parser.add_argument('--sleep-ms', type=float, default=5.0, help='단계 사이 쉬는 시간')
+    parser.add_argument('--label', default='backup')
+    parser.add_argument('--output', default=RESULTS_DIR)
+    return parser.parse_args(argv)
+
+
+class Writer:
+    """별도 연결에서 한 행씩 INSERT·commit하며 한 번마다 걸린 시간을 기록합니다."""
+
+    def __init__(self, db_path, class_id):
+        self.db_path = db_path
+        self.class_id = class_id
+        self.latencies = []
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        while not self._stop.is_set():
+            i = next(_codes)
+            started = time.perf_counter()
+            try:
+                with conn:
+                    conn.execute('''INSERT INTO yaja_students
+                                    (date, period, student_name, student_code, student_number, reason, class_id)
+                                    VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                                 ('2099-01-01', 1, '벤치', f'bench{i}', '0', '백업 측정', self.class_id))
+            except sqlite3.Error:
+                self.errors += 1
+                continue
+            self.latencies.append((time.perf_counter() - started) * 1000)
+        conn.close()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def summarize(writer, seconds):
+    values = sorted(writer.latencies)
+    return {
+        'writes': len(values),
+        'errors': writer.errors,
+        'writes_per_s': round(len(values) / seconds, 1) if seconds else 0.0,
+        'p50_ms': round(percentile(values, 50), 3),
+        'p95_ms': round(percentile(values, 95), 3),
+        'p99_ms': round(percentile(values, 99), 3),
+        'max_ms': round(values[-1], 3) if values else 0.0
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='my-website-backup-')
+    prepare_environment(workdir)
+
+    import flask_app
+    from backup import Backup
+    from benchmarks.seed import generate_dataset, seed_sqlite
+
+    dataset = generate_dataset(args.scale, args.seed)
+    seed_sqlite(flask_app.DB_PATH, dataset)
+    db_path = flask_app.DB_PATH
+    directory = os.path.join(workdir, 'backups')
+    phases = {
+        f'backup(pages={args.pages},sleep={args.sleep_ms:g}ms)': dict(mode='backup', pages=args.pages,
+                                                                    sleep_ms=args.sleep_ms),
+        'backup(one-step)': dict(mode='backup', pages=-1),
+        'vacuum': dict(mode='vacuum')
+    }
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlite': sqlite3.sqlite_version,
+            'scale': args.scale,
+            'runs': args.runs,
+            'db_bytes': os.path.getsize(db_path)
+        },
+        'phases': {}
+    }
+    print(f"DB {report['meta']['db_bytes']:,}B (야자 기록 {args.scale:,}행)")
+
+    with Writer(db_path, dataset['class_id']) as writer:
+        time.sleep(args.baseline_seconds)
+    report['phases']['baseline'] = {'writes': summarize(writer, args.baseline_seconds)}
+
+    for name, options in phases.items():
+        backup = Backup(db_path, directory, keep=args.runs, **options)
+        entries = []
+        with Writer(db_path, dataset['class_id']) as writer:
+            started = time.perf_counter()
+            for _ in range(args.runs):
+                entries.append(backup.run())
+            seconds = time.perf_counter() - started
+        backup.verify(os.path.join(directory, entries[-1]['file']))
+        report['phases'][name] = {
+            'writes': summarize(writer, seconds),
+            'backup': {
+                'copy_ms': round(sum(e['copy_ms'] for e in entries) / len(entries), 1),
+                'duration_ms': round(sum(e['duration_ms'] for e in entries) / len(entries), 1),
+                'restarts': sum(e['restarts'] for e in entries),
+                'db_bytes': entries[-1]['db_bytes'],
+                'gz_bytes': entries[-1]['gz_bytes']
+            }
+        }
+
+    print(f"{'phase':<34} {'writes/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>9} {'err':>4}  "
+          f"{'copy':>8} {'total':>8} restarts")
+    for name, phase in report['phases'].items():
+        w = phase['writes']
+        line = (f"{name:<34} {w['writes_per_s']:>9.0f} {w['p50_ms']:>6.2f}ms {w['p95_ms']:>6.2f}ms "
+                f"{w['p99_ms']:>6.2f}ms {w['max_ms']:>7.2f}ms {w['errors']:>4}")
+        if 'backup' in phase:
+            b = phase['backup']
+            line += f"  {b['copy_ms']:>6.0f}ms {b['duration_ms']:>6.0f}ms {b['restarts']:>8}"
+        print(line)
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{time.strftime('%Y%m%d-%H%M%S')}-{args.label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'✅ 결과 저장: {path}')
+
+
+if __name__ == '__main__':
+    main()
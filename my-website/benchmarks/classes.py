@@ -0,0 +1,177 @@
+"""
+반 수 증가에 따른 반별 조회 지연 측정
+반마다 같은 크기의 데이터를 한 SQLite DB에 넣고, 반 수를 늘려 가며
+반별 읽기 라우트의 지연과 쿼리 실행 계획(class_id 선두 인덱스 사용 여부)을 기록합니다.
+
+사용법 (my-website 디렉터리에서):
+    python -m benchmarks.classes --classes 1,5,10,20,40 --scale-per-class 1000
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.run import RESULTS_DIR, git_commit, prepare_environment
+
+# 반별 라우트와 같은 쿼리 (실행 계획·순수 쿼리 시간 측정용)
+QUERIES = {
+    'yaja_list': ('''SELECT id, period, student_name, student_code, student_number, reason
+                     FROM yaja_students WHERE class_id = ? AND date = ? ORDER BY period, student_name''',
+                  lambda class_id, day, days: (class_id, day)),
+    'yaja_statistics': ('''SELECT date, period, reason, student_name FROM yaja_students
+                           WHERE class_id = ? AND date >= ? AND date <= ? ORDER BY date, period''',
+                        lambda class_id, day, days: (class_id, days[0], days[-1])),
+    'hagteugsa_list': ('''SELECT h.id, h.title, h.description, h.max_members, h.creator_name,
+                                 (SELECT COUNT(*) FROM hagteugsa_members hm
+                                  WHERE hm.class_id = h.class_id AND hm.hagteugsa_id = h.id)
+                          FROM hagteugsa h WHERE h.class_id = ? ORDER BY h.created_at DESC''',
+                       lambda class_id, day, days: (class_id,)),
+    'suhang_list': ('''SELECT id, subject, title, deadline, description, creator_name, creator_code, created_at
+                       FROM suhang WHERE class_id = ? ORDER BY deadline ASC''',
+                    lambda class_id, day, days: (class_id,)),
+}
+
+
+def class_ids(count):
+    """1-1, 1-2, ... 순으로 count개의 반을 만듭니다 (학년당 14반)."""
+    ids = []
+    for grade in range(1, 10):
+        for number in range(1, 15):
+            ids.append(f'{grade}-{number}')
+            if len(ids) == count:
+                return ids
+    raise ValueError('반 수가 너무 많습니다.')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='반 수에 따른 반별 조회 지연 측정')
+    parser.add_argument('--classes', default='1,5,10,20,40', help='쉼표 구분 반 수 목록')
+    parser.add_argument('--scale-per-class', type=int, default=1000, help='반별 야자 기록 행 수')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='라우트별 요청 수')
+    parser.add_argument('--query-repeat', type=int, default=200, help='쿼리별 직접 실행 횟수')
+    parser.add_argument('--label', default='classes')
+    parser.add_argument('--output', default=RESULTS_DIR)
+    return parser.parse_args(argv)
+
+
+def seed_classes(db_path, datasets):
+    from benchmarks.seed import insert_dataset, seed_sqlite
+
+    seed_sqlite(db_path, datasets[0])
+    conn = sqlite3.connect(db_path)
+    for dataset in datasets[1:]:
+        insert_dataset(conn.cursor(), dataset)
+    conn.execute('ANALYZE')
+    conn.commit()
+    conn.close()
+
+
+def measure_queries(db_path, classes, days, repeat):
+    """쿼리를 직접 실행해 반별 중앙값(µs)과 사용한 인덱스를 기록합니다."""
+    conn = sqlite3.connect(db_path)
+    results = {}
+    try:
+        for name, (sql, make_params) in QUERIES.items():
+            plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql,
+                                                   make_params(classes[0], days[0], days))]
+            samples = []
+            for i in range(repeat):
+                params = make_params(classes[i % len(classes)], days[i % len(days)], days)
+                started = time.perf_counter()
+                conn.execute(sql, params).fetchall()
+                samples.append((time.perf_counter() - started) * 1e6)
+            results[name] = {'median_us': round(statistics.median(samples), 1), 'plan': plan}
+    finally:
+        conn.close()
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    counts = [int(c) for c in args.classes.split(',') if c.strip()]
+    prepare_environment(tempfile.mkdtemp(prefix='my-website-classes-'))
+
+    import flask_app
+    from database import db_manager
+    from benchmarks.loadgen import ServerThread, run_load
+    from benchmarks.seed import generate_dataset
+
+    # 반별 쿼리 비용만 보도록 Supabase는 끊고 SQLite 경로로 측정합니다.
+    original_client = db_manager.supabase
+    db_manager.supabase = None
+
+    all_classes = class_ids(max(counts))
+    datasets, next_id = [], 1
+    for i, class_id in enumerate(all_classes):
+        dataset = generate_dataset(args.scale_per_class, args.seed + i, class_id=class_id,
+                                   hagteugsa_id_start=next_id)
+        next_id += len(dataset['hagteugsa'])
+        datasets.append(dataset)
+    days = datasets[0]['days']
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale_per_class': args.scale_per_class,
+            'seed': args.seed,
+            'concurrency': args.concurrency,
+            'requests_per_route': args.requests
+        },
+        'runs': {}
+    }
+    try:
+        for count in counts:
+            classes = all_classes[:count]
+            seed_classes(flask_app.DB_PATH, datasets[:count])
+            flask_app.stats_cache.clear()
+            flask_app.suhang_index.invalidate()
+            routes = {
+                'GET /api/yaja/list/<date>': lambda i: (
+                    'GET', f'/api/yaja/list/{days[i % len(days)]}?class_id={classes[i % len(classes)]}', None),
+                'GET /api/yaja/statistics': lambda i: (
+                    'GET', f'/api/yaja/statistics?start_date={days[0]}&end_date={days[-1]}'
+                           f'&class_id={classes[i % len(classes)]}', None),
+                'GET /api/hagteugsa/list': lambda i: (
+                    'GET', f'/api/hagteugsa/list?class_id={classes[i % len(classes)]}', None),
+                'GET /api/suhang/list': lambda i: (
+                    'GET', f'/api/suhang/list?class_id={classes[i % len(classes)]}', None),
+            }
+            server = ServerThread(flask_app.app)
+            server.start()
+            print(f'[{count}개 반] 전체 야자 기록 {count * args.scale_per_class}행')
+            run = {'total_rows': count * args.scale_per_class, 'routes': {}, 'queries': {}}
+            try:
+                for key, make_request in routes.items():
+                    r = run_load(server.host, server.port, make_request, args.requests, args.concurrency)
+                    run['routes'][key] = r
+                    print(f"  {key:<30} p50 {r['p50_ms']:>8.2f}ms  p95 {r['p95_ms']:>8.2f}ms  err {r['errors']}")
+            finally:
+                server.stop()
+            run['queries'] = measure_queries(flask_app.DB_PATH, classes, days, args.query_repeat)
+            for name, q in run['queries'].items():
+                print(f"  query {name:<24} median {q['median_us']:>9.1f}us  {'; '.join(q['plan'])}")
+            report['runs'][count] = run
+    finally:
+        db_manager.supabase = original_client
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{time.strftime('%Y%m%d-%H%M%S')}-{args.label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'✅ 결과 저장: {path}')
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+벤치마크 결과 비교
+두 결과 JSON의 라우트별 처리량/지연 시간과 마이크로 벤치마크 변화를 출력합니다.
+
+사용법:
+    python -m benchmarks.compare benchmarks/results/기준.json benchmarks/results/비교.json
+"""
+
+import json
+import sys
+
+ROUTE_METRICS = ['throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms']
+
+
+def _delta(before, after):
+    if not before:
+        return '   n/a'
+    return f'{(after - before) / before * 100:+6.1f}%'
+
+
+def compare(base, head):
+    lines = []
+    for backend, routes in head.get('routes', {}).items():
+        lines.append(f'[{backend}]')
+        for route, metrics in routes.items():
+            old = base.get('routes', {}).get(backend, {}).get(route)
+            if not old:
+                lines.append(f'  {route:<50} (신규)')
+                continue
+            cells = [f"{m} {old[m]:.2f}->{metrics[m]:.2f} ({_delta(old[m], metrics[m])})" for m in ROUTE_METRICS]
+            lines.append(f'  {route:<50} ' + '  '.join(cells))
+    for name, metrics in head.get('micro', {}).items():
+        old = base.get('micro', {}).get(name)
+        if old:
+            lines.append(f"  micro {name:<30} median {old['median_us']:.1f}->{metrics['median_us']:.1f}us "
+                         f"({_delta(old['median_us'], metrics['median_us'])})")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print(__doc__)
+        return 1
+    with open(argv[0], encoding='utf-8') as f:
+        base = json.load(f)
+    with open(argv[1], encoding='utf-8') as f:
+        head = json.load(f)
+    print(compare(base, head))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""
+메모리 기반 Supabase 대체 클라이언트
+DatabaseManager가 사용하는 supabase-py 쿼리 빌더의 부분집합을 흉내 냅니다.
+(table/select/insert/upsert/update/delete, eq/neq/gt/gte/lt/lte/in_/is_, order/limit/range/single)
+"""
+
+import copy
+import threading
+from datetime import datetime, timezone
+
+
+class FakeAPIError(Exception):
+    """postgrest APIError 대용"""
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class InMemoryStore:
+    """테이블별 행 목록을 보관하는 스레드 안전 저장소"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._next_ids = {}
+
+    def _table(self, name):
+        return self._tables.setdefault(name, [])
+
+    def insert_rows(self, name, rows):
+        """행을 추가하고 id/created_at이 채워진 복사본을 반환합니다."""
+        inserted = []
+        with self._lock:
+            table = self._table(name)
+            for row in rows:
+                row = dict(row)
+                if row.get('id') is None:
+                    row['id'] = self._next_ids.get(name, 1)
+                self._next_ids[name] = max(self._next_ids.get(name, 1), row['id'] + 1)
+                row.setdefault('created_at', datetime.now(timezone.utc).isoformat())
+                if name == 'hagteugsa_members':
+                    row.setdefault('joined_at', row['created_at'])
+                table.append(row)
+                inserted.append(dict(row))
+        return inserted
+
+    def upsert_rows(self, name, rows, on_conflict, ignore_duplicates):
+        keys = [k.strip() for k in (on_conflict or 'id').split(',')]
+        result = []
+        new_rows = []
+        with self._lock:
+            table = self._table(name)
+            for row in rows:
+                match = None
+                if all(row.get(k) is not None for k in keys):
+                    for existing in table:
+                        if all(existing.get(k) == row.get(k) for k in keys):
+                            match = existing
+                            break
+                if match is None:
+                    new_rows.append(row)
+                elif not ignore_duplicates:
+                    match.update(row)
+                    result.append(dict(match))
+        return result + self.insert_rows(name, new_rows)
+
+    def snapshot(self, name):
+        with self._lock:
+            return [dict(row) for row in self._table(name)]
+
+    def update_where(self, name, predicate, values):
+        updated = []
+        with self._lock:
+            for row in self._table(name):
+                if predicate(row):
+                    row.update(values)
+                    updated.append(dict(row))
+        return updated
+
+    def delete_where(self, name, predicate):
+        with self._lock:
+            table = self._table(name)
+            deleted = [dict(row) for row in table if predicate(row)]
+            self._tables[name] = [row for row in table if not predicate(row)]
+        return deleted
+
+    def count(self, name):
+        with self._lock:
+            return len(self._table(name))
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self._next_ids.clear()
+
+
+def _split_columns(columns):
+    """'*, rel!inner(a, b)' 형태의 select 문자열을 최상위 쉼표 기준으로 나눕니다."""
+    parts, depth, current = [], 0, ''
+    for ch in columns:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _coerce(current, value):
+    """URL에서 온 문자열 비교값을 컬럼 값의 타입에 맞춥니다."""
+    if isinstance(value, str) and isinstance(current, (int, float)) and not isinstance(current, bool):
+        try:
+            return type(current)(value)
+        except ValueError:
+            return float(value)
+    return value
+
+
+class FakeQuery:
+    def __init__(self, store, table, action='select', payload=None, columns='*',
+                 count=None, on_conflict=None, ignore_duplicates=False):
+        self._store = store
+        self._table = table
+        self._action = action
+        self._payload = payload
+        self._columns = columns
+        self._count = count
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        self._filters = []
+        self._orders = []
+        self._offset = 0
+        self._limit = None
+        self._single = False
+
+    # 필터
+    def _filter(self, column, op):
+        self._filters.append((column, op))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v: v == value or str(v) == str(value))
+
+    def neq(self, column, value):
+        return self._filter(column, lambda v: not (v == value or str(v) == str(value)))
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v is not None and v > _coerce(v, value))
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v: v is not None and v >= _coerce(v, value))
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v: v is not None and v < _coerce(v, value))
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v: v is not None and v <= _coerce(v, value))
+
+    def is_(self, column, value):
+        if str(value).lower() == 'null':
+            return self._filter(column, lambda v: v is None)
+        return self._filter(column, lambda v: str(v).lower() == str(value).lower())
+
+    def in_(self, column, values):
+        values = {str(v) for v in values}
+        return self._filter(column, lambda v: str(v) in values)
+
+    # 정렬/페이지
+    def order(self, column, *, desc=False, nullsfirst=None, foreign_table=None):
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, size, *, foreign_table=None):
+        self._limit = size
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    def _matches(self, row):
+        return all(op(row.get(column)) for column, op in self._filters)
+
+    def _project(self, rows):
+        parts = _split_columns(self._columns or '*')
+        plain = [p for p in parts if '(' not in p]
+        embeds = []
+        for embed in (p for p in parts if '(' in p):
+            rel, inner_cols = embed.split('(', 1)
+            inner = rel.endswith('!inner')
+            rel = rel.replace('!inner', '').strip()
+            inner_cols = [c.strip() for c in inner_cols.rstrip(')').split(',')]
+            # 자식 테이블의 '<부모테이블>_id' 컬럼을 외래키로 간주합니다.
+            children_by_parent = {}
+            for child in self._store.snapshot(rel):
+                item = child if '*' in inner_cols else {c: child.get(c) for c in inner_cols}
+                children_by_parent.setdefault(child.get(f'{self._table}_id'), []).append(item)
+            embeds.append((rel, inner, children_by_parent))
+        result = []
+        for row in rows:
+            if '*' in plain:
+                item = dict(row)
+            else:
+                item = {p: row.get(p) for p in plain}
+            keep = True
+            for rel, inner, children_by_parent in embeds:
+                children = children_by_parent.get(row.get('id'), [])
+                if inner and not children:
+                    keep = False
+                item[rel] = children
+            if keep:
+                result.append(item)
+        return result
+
+    def execute(self):
+        if self._action == 'insert':
+            rows = self._payload if isinstance(self._payload, list) else [self._payload]
+            return FakeResponse(self._store.insert_rows(self._table, rows))
+        if self._action == 'upsert':
+            rows = self._payload if isinstance(self._payload, list) else [self._payload]
+            return FakeResponse(self._store.upsert_rows(self._table, rows, self._on_conflict, self._ignore_duplicates))
+        if self._action == 'update':
+            return FakeResponse(self._store.update_where(self._table, self._matches, self._payload))
+        if self._action == 'delete':
+            return FakeResponse(self._store.delete_where(self._table, self._matches))
+
+        rows = [row for row in self._store.snapshot(self._table) if self._matches(row)]
+        for column, desc in reversed(self._orders):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        total = len(rows)
+        rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        data = self._project(rows)
+        if self._single:
+            if len(data) != 1:
+                raise FakeAPIError('JSON object requested, multiple (or no) rows returned')
+            data = data[0]
+        return FakeResponse(copy.deepcopy(data), total if self._count else None)
+
+
+class FakeTable:
+    def __init__(self, store, name):
+        self._store = store
+        self._name = name
+
+    def select(self, *columns, count=None, head=None):
+        return FakeQuery(self._store, self._name, 'select', columns=','.join(columns) or '*', count=count)
+
+    def insert(self, json, *, count=None, returning=None, upsert=False, default_to_null=True):
+        return FakeQuery(self._store, self._name, 'insert', payload=json)
+
+    def upsert(self, json, *, count=None, returning=None, ignore_duplicates=False,
+               on_conflict='', default_to_null=True):
+        return FakeQuery(self._store, self._name, 'upsert', payload=json,
+                         on_conflict=on_conflict, ignore_duplicates=ignore_duplicates)
+
+    def update(self, json, *, count=None, returning=None):
+        return FakeQuery(self._store, self._name, 'update', payload=json)
+
+    def delete(self, *, count=None, returning=None):
+        return FakeQuery(self._store, self._name, 'delete')
+
+
+class FakeSupabaseClient:
+    """supabase.Client 대신 DatabaseManager.supabase에 주입하는 클라이언트"""
+
+    def __init__(self, store=None):
+        self.store = store or InMemoryStore()
+
+    def table(self, name):
+        return FakeTable(self.store, name)
+
+    from_ = table
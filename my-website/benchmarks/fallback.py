@@ -0,0 +1,146 @@
+"""
+느리거나 불안정한 Supabase에서의 라우트별 꼬리 지연 측정
+PostgREST 호환 서버(postgrest_stub)에 실제 supabase-py 클라이언트를 연결하고
+장애 프로필별로 모든 /api/* 라우트를 부하 테스트합니다.
+
+사용법 (my-website 디렉터리에서):
+    python -m benchmarks.fallback --scale 1000 --requests 100
+    python -m benchmarks.fallback --profiles slow,flaky --routes /api/yaja
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.postgrest_stub import STUB_KEY, PostgrestStubServer, StubSettings
+from benchmarks.run import RESULTS_DIR, git_commit, prepare_environment, run_routes
+
+# 이름 -> 주입 설정
+PROFILES = {
+    'healthy': {'latency_ms': 0, 'jitter_ms': 0, 'error_rate': 0.0},
+    'slow': {'latency_ms': 150, 'jitter_ms': 50, 'error_rate': 0.0},
+    'jittery': {'latency_ms': 20, 'jitter_ms': 200, 'error_rate': 0.0},
+    'flaky': {'latency_ms': 30, 'jitter_ms': 20, 'error_rate': 0.2},
+    'down': {'latency_ms': 0, 'jitter_ms': 0, 'error_rate': 1.0},
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Supabase 장애 프로필별 폴백 경로 지연 측정')
+    parser.add_argument('--scale', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100, help='라우트별 요청 수')
+    parser.add_argument('--profiles', default=','.join(PROFILES), help=f'쉼표 구분 ({", ".join(PROFILES)})')
+    parser.add_argument('--row-cap', type=int, default=None, help='stub select 응답 최대 행 수')
+    parser.add_argument('--routes', default='', help='이 문자열을 포함하는 라우트만 실행')
+    parser.add_argument('--drain-timeout', type=float, default=30.0, help='프로필 종료 후 아웃박스 대기 시간(초)')
+    parser.add_argument('--label', default='fallback')
+    parser.add_argument('--output', default=RESULTS_DIR)
+    return parser.parse_args(argv)
+
+
+def wait_for_outbox(replayer, timeout):
+    """부하 종료 후 아웃박스가 비워질 때까지 기다리며 걸린 시간을 기록합니다."""
+    started = time.perf_counter()
+    stats = replayer.stats()
+    while stats['queue_depth'] and time.perf_counter() - started < timeout:
+        replayer.notify()
+        time.sleep(0.1)
+        stats = replayer.stats()
+    stats['drain_seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiles = [p.strip() for p in args.profiles.split(',') if p.strip()]
+    unknown = [p for p in profiles if p not in PROFILES]
+    if unknown:
+        raise SystemExit(f'알 수 없는 프로필: {unknown}')
+
+    try:
+        from supabase import create_client
+    except ImportError:
+        raise SystemExit('supabase 패키지가 필요합니다: pip install supabase')
+
+    prepare_environment(tempfile.mkdtemp(prefix='my-website-fallback-'))
+
+    import flask_app
+    from database import db_manager
+    from benchmarks.loadgen import ServerThread
+    from benchmarks.scenarios import build_scenarios
+    from benchmarks.seed import generate_dataset, seed_sqlite, seed_store
+
+    dataset = generate_dataset(args.scale, args.seed)
+    scenarios = build_scenarios(dataset)
+    stub = PostgrestStubServer(settings=StubSettings(row_cap=args.row_cap, seed=args.seed)).start()
+    original_client = db_manager.supabase
+    db_manager.supabase = create_client(stub.url, STUB_KEY)
+    flask_app.outbox_replayer.prepare()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'seed': args.seed,
+            'concurrency': args.concurrency,
+            'requests_per_route': args.requests,
+            'row_cap': args.row_cap
+        },
+        'profiles': {}
+    }
+    try:
+        for name in profiles:
+            seed_sqlite(flask_app.DB_PATH, dataset)
+            seed_store(stub.store, dataset)
+            flask_app.read_replica.reset()
+            flask_app.stats_cache.clear()
+            flask_app.suhang_index.invalidate()
+            # 실행 중인 서버처럼 복제본을 미리 채웁니다 (장애 프로필에서는 실패 후 기존 데이터로 응답).
+            if flask_app.read_replica.is_active():
+                try:
+                    flask_app.read_replica.sync_now()
+                except Exception:
+                    pass
+            stub.settings.update(PROFILES[name])
+            stub.stats.reset()
+            server = ServerThread(flask_app.app)
+            server.start()
+            print(f'[{name}] {stub.settings.as_dict()}')
+            try:
+                routes = run_routes(server.host, server.port, scenarios, args)
+            finally:
+                server.stop()
+            outbox = wait_for_outbox(flask_app.outbox_replayer, args.drain_timeout)
+            print(f"  outbox: {outbox}")
+            replica = flask_app.read_replica.stats()
+            print(f"  replica: {replica}")
+            report['profiles'][name] = {
+                'settings': stub.settings.as_dict(),
+                'routes': routes,
+                'outbox': outbox,
+                'replica': replica,
+                'upstream': stub.stats.as_dict()
+            }
+    finally:
+        db_manager.supabase = original_client
+        stub.stop()
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{time.strftime('%Y%m%d-%H%M%S')}-{args.label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'✅ 결과 저장: {path}')
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+동시 부하 생성기
+Flask 앱을 스레드 기반 WSGI 서버로 띄우고 여러 워커 스레드에서 요청을 보내
+처리량과 지연 시간 분포(p50/p95/p99)를 측정합니다.
+"""
+
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+
+class ServerThread(threading.Thread):
+    """앱을 임의 포트의 멀티스레드 서버로 실행합니다."""
+
+    def __init__(self, app, host='127.0.0.1', port=0):
+        super().__init__(daemon=True)
+        self.server = make_server(host, port, app, threaded=True)
+        self.host = host
+        self.port = self.server.server_port
+
+    def run(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def percentile(sorted_values, pct):
+    """정렬된 값 목록에서 nearest-rank 백분위수를 구합니다."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, errors, status_counts, wall_time):
+    values = sorted(latencies)
+    total = len(values)
+    return {
+        'requests': total,
+        'errors': errors,
+        'status': status_counts,
+        'wall_time_s': round(wall_time, 4),
+        'throughput_rps': round(total / wall_time, 2) if wall_time > 0 else 0.0,
+        'mean_ms': round(sum(values) / total * 1000, 3) if total else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if total else 0.0
+    }
+
+
+def _send(conn, method, path, body):
+    headers = {'Connection': 'close'}
+    payload = None
+    if body is not None:
+        payload = json.dumps(body).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def run_load(host, port, make_request, total_requests, concurrency, timeout=30):
+    """
+    make_request(i) -> (method, path, body) 로 만든 요청을 total_requests번 보냅니다.
+
+    Returns:
+        summarize() 결과 딕셔너리
+    """
+    latencies = []
+    status_counts = {}
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def worker():
+        nonlocal errors
+        local_latencies, local_status, local_errors = [], {}, 0
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            method, path, body = make_request(i)
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+            started = time.perf_counter()
+            try:
+                status = _send(conn, method, path, body)
+            except Exception:
+                local_errors += 1
+                continue
+            finally:
+                conn.close()
+            local_latencies.append(time.perf_counter() - started)
+            local_status[status] = local_status.get(status, 0) + 1
+            if status >= 500:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+            for status, count in local_status.items():
+                status_counts[str(status)] = status_counts.get(str(status), 0) + count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall_time = time.perf_counter() - started
+    return summarize(latencies, errors, status_counts, wall_time)
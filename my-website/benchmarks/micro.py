@@ -0,0 +1,128 @@
+"""
+마이크로 벤치마크
+통계 집계(build_yaja_statistics)와 급식 파싱·조회 함수를 단독으로 측정합니다.
+"""
+
+import os
+import timeit
+from datetime import datetime
+
+import pandas as pd
+
+from meal_parser import parse_menu_items
+from yaja_stats import build_yaja_statistics
+
+_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEAL_CSV_PATH = os.path.join(_root_dir, 'src', 'food_calender.csv')
+
+
+def _measure(func, number, repeat):
+    timings = timeit.repeat(func, number=number, repeat=repeat)
+    per_call = sorted(t / number for t in timings)
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min_us': round(per_call[0] * 1e6, 3),
+        'median_us': round(per_call[len(per_call) // 2] * 1e6, 3),
+        'max_us': round(per_call[-1] * 1e6, 3)
+    }
+
+
+def run_micro(dataset, repeat=5):
+    results = {}
+
+    rows = [(r['date'], r['period'], r['reason'], r['student_name']) for r in dataset['yaja_students']]
+    number = max(1, 20000 // max(1, len(rows)))
+    results['build_yaja_statistics'] = dict(_measure(lambda: build_yaja_statistics(rows), number, repeat), rows=len(rows))
+    # 통계 페이지가 요청하는 일 단위만 집계할 때
+    results['build_yaja_statistics[day]'] = dict(
+        _measure(lambda: build_yaja_statistics(rows, {'day'}), number, repeat), rows=len(rows))
+    # 차시별 통계만 요청할 때 (fields=period_stats)
+    results['build_yaja_statistics[period_stats]'] = dict(
+        _measure(lambda: build_yaja_statistics(rows, fields={'period_stats'}), number, repeat), rows=len(rows))
+
+    menus = [str(v) for v in pd.read_csv(MEAL_CSV_PATH, encoding='utf-8')['요리명']]
+    results['parse_menu_items'] = dict(
+        _measure(lambda: [parse_menu_items(m) for m in menus], 200, repeat), menus=len(menus))
+
+    # 요청마다 실행되는 CSV 급식 경로 전체 (pandas 로딩 포함)
+    from flask_app import fallback_csv_meal_data
+    results['fallback_csv_meal_data'] = _measure(fallback_csv_meal_data, 20, repeat)
+
+    # 미리 파싱한 급식 저장소에서 CSV의 첫 주를 읽는 경로
+    from flask_app import process_meal_data
+    first_day = datetime.strptime(str(pd.read_csv(MEAL_CSV_PATH, encoding='utf-8')['급식일자'].min()), '%Y%m%d').date()
+    results['process_meal_data[store]'] = _measure(lambda: process_meal_data(first_day), 200, repeat)
+
+    # 영양 행렬의 기간 집계 (행렬은 첫 호출에서 만들어짐)
+    from flask_app import nutrition_matrix
+    nutrition_matrix.ensure_built()
+    results['nutrition_matrix.summarize[week]'] = dict(
+        _measure(lambda: nutrition_matrix.summarize(granularity='week'), 1000, repeat),
+        days=nutrition_matrix.stats()['days'])
+
+    # 알레르기 비트마스크 인덱스로 안전한 날 찾기
+    from flask_app import allergen_index
+    allergen_index.ensure_built()
+    results['allergen_index.safe_days'] = dict(
+        _measure(lambda: allergen_index.safe_days([5, 6]), 1000, repeat), days=allergen_index.stats()['days'])
+
+    # 요청마다 실행되는 요청 제한 검사 (클라이언트 1000개를 돌아가며, 제한에 걸리지 않는 예산)
+    import tempfile
+    from ratelimit import RateLimiter
+    clients = [f'10.0.{i // 256}.{i % 256}' for i in range(1000)]
+    counter = iter(range(10 ** 9))
+    memory_limiter = RateLimiter(default=(1e6, 1e6))
+    results['rate_limiter.check[memory]'] = _measure(
+        lambda: memory_limiter.check(clients[next(counter) % 1000], '/api/yaja/statistics'), 100000, repeat)
+    shared_limiter = RateLimiter(default=(1e6, 1e6), shared_path=os.path.join(tempfile.mkdtemp(), 'ratelimit.db'))
+    results['rate_limiter.check[sqlite]'] = _measure(
+        lambda: shared_limiter.check(clients[next(counter) % 1000], '/api/yaja/statistics'), 10000, repeat)
+
+    # 추적 오버헤드: 추적하지 않는 요청(기본)과 추적 중인 요청에서의 SQLite execute
+    import sqlite3
+    from tracing import tracer
+    plain = sqlite3.connect(':memory:')
+    traced_conn = tracer.connect(':memory:')
+    results['sqlite.execute[plain]'] = _measure(lambda: plain.execute('SELECT 1').fetchone(), 100000, repeat)
+    results['sqlite.execute[traced, idle]'] = _measure(lambda: traced_conn.execute('SELECT 1').fetchone(), 100000, repeat)
+    saved = tracer.enabled, tracer.sample_rate, tracer.path
+    if tracer._listener is None:
+        tracer.path = os.path.join(tempfile.mkdtemp(), 'spans.ndjson')
+    tracer.enabled, tracer.sample_rate = True, 1.0
+    root, token = tracer.start_trace('micro', 'micro')
+    try:
+        results['sqlite.execute[traced, recording]'] = _measure(
+            lambda: traced_conn.execute('SELECT 1').fetchone(), 10000, repeat)
+    finally:
+        tracer.end(root, token)
+        tracer.stop()
+        tracer.enabled, tracer.sample_rate, tracer.path = saved
+
+    # 학기 통계 응답의 JSON 인코딩·디코딩 (표준 json provider와 orjson provider)
+    from flask.json.provider import DefaultJSONProvider
+    from flask_app import app
+    from json_provider import FastJSONProvider
+    payload = {'success': True, 'data': build_yaja_statistics(rows)}
+    std_json, fast_json = DefaultJSONProvider(app), FastJSONProvider(app)
+    body = std_json.dumps(payload)
+    results['json.dumps[stats, json]'] = dict(_measure(lambda: std_json.dumps(payload), 20, repeat), bytes=len(body))
+    results[f'json.dumps[stats, {fast_json.backend}]'] = dict(
+        _measure(lambda: fast_json.dumps(payload), 20, repeat), bytes=len(fast_json.dumps(payload).encode('utf-8')))
+    results['json.loads[stats, json]'] = _measure(lambda: std_json.loads(body), 20, repeat)
+    results[f'json.loads[stats, {fast_json.backend}]'] = _measure(lambda: fast_json.loads(body), 20, repeat)
+
+    # 야자 추가 본문 검사: 스키마와 이전의 get/all 검사
+    import schemas
+    yaja_body = {'date': '2025-03-04', 'periods': ['1', '2'], 'student_name': '홍길동',
+                 'student_code': 'S0001', 'student_number': '10101', 'reason': '학원'}
+
+    def check_manually(data):
+        fields = [data.get(name) for name in ('date', 'periods', 'student_name', 'student_code',
+                                              'student_number', 'reason')]
+        if not all(fields):
+            raise ValueError
+        return fields
+    results['request_body[get/all]'] = _measure(lambda: check_manually(yaja_body), 100000, repeat)
+    results['request_body[schema]'] = _measure(lambda: schemas.YAJA_ADD.parse(yaja_body), 100000, repeat)
+    return results
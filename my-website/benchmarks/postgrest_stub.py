@@ -0,0 +1,322 @@
+"""
+지연/장애 주입이 가능한 로컬 PostgREST 호환 서버
+DatabaseManager가 사용하는 부분집합(select/insert/upsert/update/delete,
+eq/neq/gt/gte/lt/lte/in/is, order, limit/offset/Range, single, count=exact)을
+InMemoryStore 위에서 처리하여 실제 supabase-py 클라이언트가 그대로 접속할 수 있습니다.
+
+사용법 (my-website 디렉터리에서):
+    python -m benchmarks.postgrest_stub --port 54321 --latency-ms 80 --jitter-ms 40 --error-rate 0.1
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=stub.stub.stub python flask_app.py
+
+실행 중 설정 변경/통계:
+    POST /__stub__/config  {"latency_ms": 200, "error_rate": 0.5}
+    GET  /__stub__/stats
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from benchmarks.fake_supabase import FakeAPIError, FakeTable, InMemoryStore
+
+# 테스트용 JWT 형태의 더미 키 (구버전 supabase-py는 키 형식을 검사합니다)
+STUB_KEY = 'stub.stub.stub'
+
+_FILTER_OPS = ('eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'in', 'is')
+_RESERVED_PARAMS = ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns')
+
+
+class StubSettings:
+    """장애 주입 설정 (실행 중 변경 가능)"""
+
+    FIELDS = ('latency_ms', 'jitter_ms', 'error_rate', 'error_status', 'row_cap')
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_status=503, row_cap=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.row_cap = row_cap
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def update(self, values):
+        with self._lock:
+            for key in self.FIELDS:
+                if key in values:
+                    setattr(self, key, values[key])
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    def sample_delay(self):
+        """기본 지연 + 지수분포 지터(평균 jitter_ms)를 초 단위로 반환합니다."""
+        with self._lock:
+            delay = self.latency_ms
+            if self.jitter_ms > 0:
+                delay += self._rng.expovariate(1.0 / self.jitter_ms)
+            return delay / 1000.0
+
+    def should_fail(self):
+        with self._lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+
+class StubStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.injected_errors = 0
+            self.truncated = 0
+
+    def record(self, key, failed=False, truncated=False):
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.injected_errors += int(failed)
+            self.truncated += int(truncated)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'total_requests': sum(self.requests.values()),
+                'injected_errors': self.injected_errors,
+                'truncated_responses': self.truncated
+            }
+
+
+def _parse_value(raw):
+    return raw[1:-1] if len(raw) >= 2 and raw[0] == raw[-1] == '"' else raw
+
+
+def apply_filters(query, params):
+    """'col=op.value' 형태의 쿼리 파라미터를 FakeQuery 필터로 적용합니다."""
+    for column, expr in params:
+        if column in _RESERVED_PARAMS:
+            continue
+        op, _, raw = expr.partition('.')
+        if op not in _FILTER_OPS:
+            raise FakeAPIError(f'지원하지 않는 연산자: {op}')
+        if op == 'in':
+            values = [_parse_value(v) for v in raw.strip('()').split(',') if v]
+            query = query.in_(column, values)
+        elif op == 'is':
+            query = query.is_(column, raw)
+        else:
+            query = getattr(query, op)(column, _parse_value(raw))
+    return query
+
+
+def apply_order(query, order_param):
+    for item in order_param.split(','):
+        parts = item.split('.')
+        query = query.order(parts[0], desc='desc' in parts[1:])
+    return query
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'PostgRESTStub/1.0'
+    # keep-alive 연결에서 헤더/본문 분할 전송 시 Nagle + delayed ACK(~40ms) 지연을 막습니다.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    # 공통 응답
+    def _send_json(self, status, body, headers=None):
+        payload = b'' if body is None else json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return None
+        raw = self.rfile.read(length)
+        return json.loads(raw) if raw.strip() else None
+
+    def _prefer(self):
+        prefer = {}
+        for item in (self.headers.get('Prefer') or '').split(','):
+            key, _, value = item.strip().partition('=')
+            if key:
+                prefer[key] = value
+        return prefer
+
+    def _control(self, path):
+        if path == '/__stub__/config':
+            if self.command == 'POST':
+                self.server.settings.update(self._read_body() or {})
+            return self._send_json(200, self.server.settings.as_dict())
+        if path == '/__stub__/stats':
+            return self._send_json(200, self.server.stats.as_dict())
+        return self._send_json(404, {'message': 'not found'})
+
+    def _handle(self):
+        url = urlsplit(self.path)
+        if url.path.startswith('/__stub__/'):
+            return self._control(url.path)
+        if not url.path.startswith('/rest/v1/'):
+            return self._send_json(404, {'message': 'not found'})
+
+        table = url.path[len('/rest/v1/'):].strip('/')
+        settings, stats = self.server.settings, self.server.stats
+        body = self._read_body() if self.command in ('POST', 'PATCH', 'DELETE') else None
+        key = f'{self.command} {table}'
+
+        delay = settings.sample_delay()
+        if delay > 0:
+            time.sleep(delay)
+        if settings.should_fail():
+            stats.record(key, failed=True)
+            return self._send_json(settings.error_status, {
+                'code': 'PGRST000', 'message': 'stub injected error', 'details': None, 'hint': None
+            })
+
+        params = parse_qsl(url.query, keep_blank_values=True)
+        named = dict(params)
+        prefer = self._prefer()
+        minimal = prefer.get('return') == 'minimal'
+        builder = FakeTable(self.server.store, table)
+        try:
+            if self.command == 'GET':
+                return self._select(builder, params, named, prefer, key)
+            if self.command == 'POST':
+                if 'resolution' in prefer or 'on_conflict' in named:
+                    query = builder.upsert(body, on_conflict=named.get('on_conflict', ''),
+                                           ignore_duplicates=prefer.get('resolution') == 'ignore-duplicates')
+                else:
+                    query = builder.insert(body)
+                status = 201
+            elif self.command == 'PATCH':
+                query = apply_filters(builder.update(body), params)
+                status = 200
+            elif self.command == 'DELETE':
+                query = apply_filters(builder.delete(), params)
+                status = 200
+            else:
+                return self._send_json(405, {'message': 'method not allowed'})
+            data = query.execute().data
+            stats.record(key)
+            if minimal:
+                return self._send_json(204 if status == 200 else status, None)
+            return self._send_json(status, data)
+        except FakeAPIError as e:
+            stats.record(key)
+            return self._send_json(400, {'code': 'PGRST100', 'message': str(e), 'details': None, 'hint': None})
+
+    def _select(self, builder, params, named, prefer, key):
+        settings, stats = self.server.settings, self.server.stats
+        query = apply_filters(builder.select(named.get('select', '*'), count=prefer.get('count')), params)
+        if named.get('order'):
+            query = apply_order(query, named['order'])
+
+        offset = int(named.get('offset', 0))
+        limit = int(named['limit']) if 'limit' in named else None
+        range_header = self.headers.get('Range')
+        if range_header and '-' in range_header:
+            start, _, end = range_header.partition('-')
+            offset = int(start)
+            limit = int(end) - offset + 1 if end else None
+        # PostgREST의 db-max-rows 처럼 응답 행 수를 제한합니다.
+        truncated = False
+        if settings.row_cap is not None and (limit is None or limit > settings.row_cap):
+            limit = settings.row_cap
+            truncated = True
+        query = query.range(offset, offset + limit - 1) if limit is not None else query.range(offset, 10 ** 12)
+
+        single = 'vnd.pgrst.object' in (self.headers.get('Accept') or '')
+        if single:
+            query = query.single()
+        try:
+            response = query.execute()
+        except FakeAPIError as e:
+            stats.record(key)
+            return self._send_json(406, {'code': 'PGRST116', 'message': str(e), 'details': None, 'hint': None})
+        stats.record(key, truncated=truncated)
+        data = response.data
+        returned = 1 if single else len(data)
+        total = response.count if response.count is not None else '*'
+        content_range = f'{offset}-{offset + returned - 1}/{total}' if returned else f'*/{total}'
+        return self._send_json(200, data, {'Content-Range': content_range})
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PATCH = _handle
+    do_DELETE = _handle
+
+
+class PostgrestStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, store=None, settings=None):
+        super().__init__((host, port), StubRequestHandler)
+        self.store = store or InMemoryStore()
+        self.settings = settings or StubSettings()
+        self.stats = StubStats()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """백그라운드 스레드에서 서버를 시작합니다."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='지연/장애 주입 PostgREST 호환 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='모든 요청의 기본 지연')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='지수분포 추가 지연의 평균')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='오류 응답 비율 (0~1)')
+    parser.add_argument('--error-status', type=int, default=503, help='주입 오류의 HTTP 상태 코드')
+    parser.add_argument('--row-cap', type=int, default=None, help='select 응답 최대 행 수')
+    parser.add_argument('--seed-scale', type=int, default=0, help='0보다 크면 합성 데이터를 적재')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    settings = StubSettings(args.latency_ms, args.jitter_ms, args.error_rate,
+                            args.error_status, args.row_cap, args.seed)
+    server = PostgrestStubServer(args.host, args.port, settings=settings)
+    if args.seed_scale > 0:
+        from benchmarks.seed import generate_dataset, seed_store
+        seed_store(server.store, generate_dataset(args.seed_scale, args.seed))
+    print(f'PostgREST stub: {server.url} (key: {STUB_KEY}) {settings.as_dict()}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+API 부하 테스트 + 마이크로 벤치마크 실행기
+
+사용법 (my-website 디렉터리에서):
+    python -m benchmarks.run --scale 2000 --concurrency 8 --requests 200
+    python -m benchmarks.run --backend supabase --routes yaja
+    python -m benchmarks.compare benchmarks/results/A.json benchmarks/results/B.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.loadgen import ServerThread, run_load
+
+_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(_root_dir, 'benchmarks', 'results')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='my-website API 벤치마크')
+    parser.add_argument('--scale', type=int, default=1000, help='야자 기록 행 수 (다른 테이블은 비례)')
+    parser.add_argument('--seed', type=int, default=42, help='합성 데이터 난수 시드')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 워커 수')
+    parser.add_argument('--requests', type=int, default=200, help='라우트별 요청 수')
+    parser.add_argument('--backend', choices=['sqlite', 'supabase', 'both'], default='both',
+                        help='sqlite: Supabase 미연결 / supabase: 메모리 Supabase 대체 클라이언트')
+    parser.add_argument('--routes', default='', help='이 문자열을 포함하는 라우트만 실행')
+    parser.add_argument('--skip-micro', action='store_true', help='마이크로 벤치마크 생략')
+    parser.add_argument('--label', default='', help='결과 파일 이름에 붙일 라벨')
+    parser.add_argument('--output', default=RESULTS_DIR, help='결과 JSON 저장 디렉터리')
+    return parser.parse_args(argv)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=_root_dir,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def prepare_environment(workdir):
+    """flask_app 임포트 전에 SQLite 경로를 임시 디렉터리로 돌립니다."""
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # 부하 생성기는 한 IP에서 요청하므로 요청 제한을 끔
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+    if _root_dir not in sys.path:
+        sys.path.insert(0, _root_dir)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+
+def run_routes(host, port, scenarios, args):
+    results = {}
+    for key, make_request in scenarios:
+        if args.routes and args.routes not in key:
+            continue
+        results[key] = run_load(host, port, make_request, args.requests, args.concurrency)
+        r = results[key]
+        print(f"  {key:<50} {r['throughput_rps']:>9.1f} req/s  "
+              f"p50 {r['p50_ms']:>8.2f}ms  p95 {r['p95_ms']:>8.2f}ms  p99 {r['p99_ms']:>8.2f}ms  "
+              f"err {r['errors']}")
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='my-website-bench-')
+    prepare_environment(workdir)
+
+    import flask_app
+    from database import db_manager
+    from benchmarks.fake_supabase import FakeSupabaseClient, InMemoryStore
+    from benchmarks.micro import run_micro
+    from benchmarks.scenarios import api_routes, build_scenarios
+    from benchmarks.seed import generate_dataset, seed_sqlite, seed_store
+
+    dataset = generate_dataset(args.scale, args.seed)
+    scenarios = build_scenarios(dataset)
+    covered = {key for key, _ in scenarios}
+    uncovered = sorted(api_routes(flask_app.app) - covered)
+    if uncovered:
+        print(f'⚠️ 시나리오가 없는 라우트: {uncovered}')
+
+    backends = ['sqlite', 'supabase'] if args.backend == 'both' else [args.backend]
+    original_client = db_manager.supabase
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'seed': args.seed,
+            'concurrency': args.concurrency,
+            'requests_per_route': args.requests,
+            'rows': {t: len(dataset[t]) for t in ('yaja_students', 'hagteugsa', 'hagteugsa_members', 'suhang')}
+        },
+        'uncovered_routes': uncovered,
+        'routes': {},
+        'micro': {}
+    }
+
+    try:
+        for backend in backends:
+            seed_sqlite(flask_app.DB_PATH, dataset)
+            if backend == 'supabase':
+                store = InMemoryStore()
+                seed_store(store, dataset)
+                db_manager.supabase = FakeSupabaseClient(store)
+            else:
+                db_manager.supabase = None
+            # 서버 시작 때처럼 쓰기 전에 로컬 id 순서를 Supabase 뒤로 맞춥니다.
+            flask_app.outbox_replayer.prepare()
+            flask_app.read_replica.reset()
+            flask_app.stats_cache.clear()
+            flask_app.suhang_index.invalidate()
+            # 실행 중인 서버처럼 복제본을 미리 채웁니다 (장애 프로필에서는 실패 후 기존 데이터로 응답).
+            if flask_app.read_replica.is_active():
+                try:
+                    flask_app.read_replica.sync_now()
+                except Exception:
+                    pass
+            server = ServerThread(flask_app.app)
+            server.start()
+            print(f'[{backend}] scale={args.scale} concurrency={args.concurrency} requests={args.requests}')
+            try:
+                report['routes'][backend] = run_routes(server.host, server.port, scenarios, args)
+            finally:
+                server.stop()
+    finally:
+        db_manager.supabase = original_client
+
+    if not args.skip_micro:
+        report['micro'] = run_micro(dataset)
+        for name, r in report['micro'].items():
+            print(f"  micro {name:<30} median {r['median_us']:>12.1f}us  min {r['min_us']:>12.1f}us")
+
+    os.makedirs(args.output, exist_ok=True)
+    label = f'-{args.label}' if args.label else ''
+    path = os.path.join(args.output, f"{time.strftime('%Y%m%d-%H%M%S')}{label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'✅ 결과 저장: {path}')
+    return report
+
+
+if __name__ == '__main__':
+    main()
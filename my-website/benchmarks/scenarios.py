@@ -0,0 +1,105 @@
+"""
+API 라우트별 부하 시나리오
+각 시나리오는 (METHOD, 규칙) 키와 요청 번호 -> (method, path, body) 함수를 가집니다.
+읽기 -> 쓰기 -> 삭제 순서로 실행해 삭제가 읽기 결과에 영향을 주지 않도록 합니다.
+"""
+
+import itertools
+
+
+def build_scenarios(dataset):
+    days = dataset['days']
+    roster = dataset['roster']
+    users = dataset['users']
+    hagteugsa_count = len(dataset['hagteugsa'])
+    yaja_count = len(dataset['yaja_students'])
+    suhang_count = len(dataset['suhang'])
+    signup_ids = itertools.count()
+
+    def student(i):
+        return roster[i % len(roster)]
+
+    def yaja_add(i):
+        number, name, code = student(i)
+        return 'POST', '/api/yaja/add', {
+            'date': days[i % len(days)],
+            'periods': [1, 2],
+            'student_name': name,
+            'student_code': code,
+            'student_number': number,
+            'reason': '학원'
+        }
+
+    def hagteugsa_create(i):
+        _, name, code = student(i)
+        return 'POST', '/api/hagteugsa/create', {
+            'title': f'부하 학특사 {i}',
+            'description': '부하 테스트',
+            'max_members': 5,
+            'creator_name': name,
+            'creator_code': code
+        }
+
+    def hagteugsa_join(i):
+        _, name, code = student(i)
+        return 'POST', '/api/hagteugsa/join', {
+            'hagteugsa_id': i % hagteugsa_count + 1,
+            'member_name': name,
+            'member_code': code
+        }
+
+    def suhang_add(i):
+        _, name, code = student(i)
+        return 'POST', '/api/suhang/add', {
+            'subject': '수학',
+            'title': f'부하 수행평가 {i}',
+            'deadline': days[i % len(days)],
+            'description': '부하 테스트',
+            'creator_name': name,
+            'creator_code': code
+        }
+
+    def signup(i):
+        n = next(signup_ids)
+        return 'POST', '/api/signup', {'id': f'load{n}', 'name': f'부하{n}', 'password': 'pw'}
+
+    def login(i):
+        user = users[i % len(users)]
+        return 'POST', '/api/login', {'id': user['id'], 'password': user['password']}
+
+    # 순서가 곧 실행 순서입니다.
+    return [
+        ('GET /api/yaja/list/<date>', lambda i: ('GET', f'/api/yaja/list/{days[i % len(days)]}', None)),
+        ('GET /api/yaja/statistics', lambda i: ('GET', f'/api/yaja/statistics?start_date={days[0]}&end_date={days[-1]}', None)),
+        ('GET /api/hagteugsa/list', lambda i: ('GET', '/api/hagteugsa/list', None)),
+        ('GET /api/suhang/list', lambda i: ('GET', '/api/suhang/list', None)),
+        ('GET /api/suhang/upcoming', lambda i: ('GET', '/api/suhang/upcoming?days=14', None)),
+        ('GET /api/meal', lambda i: ('GET', '/api/meal', None)),
+        ('GET /api/meal/nutrition', lambda i: ('GET', '/api/meal/nutrition?granularity=week', None)),
+        ('GET /api/meal/safe-days', lambda i: ('GET', f'/api/meal/safe-days?allergens={i % 19 + 1}', None)),
+        ('GET /api/dashboard', lambda i: ('GET', '/api/dashboard', None)),
+        ('GET /api/classes', lambda i: ('GET', '/api/classes', None)),
+        ('GET /api/roster', lambda i: ('GET', f"/api/roster?class_id={dataset['class_id']}", None)),
+        ('GET /api/metrics', lambda i: ('GET', '/api/metrics', None)),
+        ('POST /api/login', login),
+        ('POST /api/signup', signup),
+        ('POST /api/yaja/add', yaja_add),
+        ('POST /api/hagteugsa/create', hagteugsa_create),
+        ('POST /api/hagteugsa/join', hagteugsa_join),
+        ('POST /api/suhang/add', suhang_add),
+        # 삭제는 시드된 id를 앞에서부터 소비합니다 (소진 후에는 404 경로를 측정).
+        ('DELETE /api/yaja/delete/<int:student_id>', lambda i: ('DELETE', f'/api/yaja/delete/{i % yaja_count + 1}', None)),
+        ('DELETE /api/hagteugsa/delete/<int:hagteugsa_id>', lambda i: ('DELETE', f'/api/hagteugsa/delete/{i % hagteugsa_count + 1}', None)),
+        ('DELETE /api/suhang/delete/<int:suhang_id>', lambda i: ('DELETE', f'/api/suhang/delete/{i % suhang_count + 1}', None)),
+    ]
+
+
+def api_routes(app):
+    """앱에 등록된 /api/* 라우트를 'METHOD 규칙' 문자열 집합으로 반환합니다."""
+    routes = set()
+    for rule in app.url_map.iter_rules():
+        if not rule.rule.startswith('/api/'):
+            continue
+        for method in rule.methods - {'HEAD', 'OPTIONS'}:
+            routes.add(f'{method} {rule.rule}')
+    return routes
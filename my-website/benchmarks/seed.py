@@ -0,0 +1,178 @@
+"""
+벤치마크용 합성 데이터 생성
+같은 seed와 scale이면 항상 같은 데이터를 만들어 실행 간 비교가 가능하도록 합니다.
+"""
+
+import csv
+import os
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from werkzeug.security import generate_password_hash
+
+_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROSTER_PATH = os.path.join(_root_dir, 'src', '1-5_student_numbers.csv')
+
+REASONS = ['병원', '학원', '가정사', '기타']
+SUBJECTS = ['국어', '수학', '영어', '과학', '사회', '정보']
+
+# 로그인 벤치마크용 계정 (비밀번호 해시는 비용이 크므로 소수만 생성)
+USER_COUNT = 10
+
+
+def load_roster():
+    """학생 명단 CSV를 (학번, 이름, 학생코드) 목록으로 읽습니다."""
+    roster = []
+    with open(ROSTER_PATH, encoding='utf-8-sig') as f:
+        for row in csv.reader(f):
+            if len(row) >= 3 and row[0].isdigit():
+                roster.append((row[0], row[1], row[2]))
+    return roster
+
+
+def school_days(start, count):
+    """start부터 평일만 count개 반환합니다."""
+    days = []
+    current = start
+    while len(days) < count:
+        if current.weekday() < 5:
+            days.append(current.isoformat())
+        current += timedelta(days=1)
+    return days
+
+
+def generate_dataset(scale=1000, seed=42, start=date(2025, 3, 3), class_id='1-5', hagteugsa_id_start=1):
+    """
+    scale에 비례하는 합성 데이터를 생성합니다.
+
+    Args:
+        scale: 야자 불참 기록(행) 수
+        seed: 난수 시드
+        start: 첫 등교일
+        class_id: 모든 행에 붙일 반
+        hagteugsa_id_start: 여러 반을 한 DB에 넣을 때 겹치지 않도록 쓰는 학특사 첫 id
+    """
+    rng = random.Random(seed)
+    roster = load_roster()
+    # 하루 평균 약 10행(학생 4~5명 x 1~3차시)이 되도록 날짜 수를 정합니다.
+    days = school_days(start, max(1, scale // 10))
+
+    yaja_students = []
+    # 같은 날·차시·학생은 한 행만 (yaja_students 고유 인덱스)
+    taken = set()
+    while len(yaja_students) < scale:
+        day = rng.choice(days)
+        number, name, code = rng.choice(roster)
+        reason = rng.choice(REASONS)
+        for period in sorted(rng.sample([1, 2, 3], rng.randint(1, 3))):
+            if len(yaja_students) >= scale:
+                break
+            if (day, period, code) in taken:
+                continue
+            taken.add((day, period, code))
+            yaja_students.append({
+                'date': day,
+                'period': period,
+                'student_name': name,
+                'student_code': code,
+                'student_number': number,
+                'reason': reason,
+                'class_id': class_id
+            })
+
+    hagteugsa, hagteugsa_members = [], []
+    for i in range(max(1, scale // 50)):
+        number, name, code = rng.choice(roster)
+        max_members = rng.randint(3, 8)
+        hagteugsa_id = hagteugsa_id_start + i
+        hagteugsa.append({
+            'id': hagteugsa_id,
+            'title': f'학특사 {i + 1}',
+            'description': f'벤치마크용 학급특색사업 {i + 1}',
+            'max_members': max_members,
+            'creator_name': name,
+            'creator_code': code,
+            'class_id': class_id
+        })
+        members = rng.sample(roster, rng.randint(1, max_members))
+        if (number, name, code) not in members:
+            members[0] = (number, name, code)
+        for _, member_name, member_code in members:
+            hagteugsa_members.append({
+                'hagteugsa_id': hagteugsa_id,
+                'member_name': member_name,
+                'member_code': member_code,
+                'class_id': class_id
+            })
+
+    suhang = []
+    for i in range(max(1, scale // 20)):
+        _, name, code = rng.choice(roster)
+        deadline = date.fromisoformat(rng.choice(days)) + timedelta(days=rng.randint(0, 14))
+        suhang.append({
+            'subject': rng.choice(SUBJECTS),
+            'title': f'수행평가 {i + 1}',
+            'deadline': deadline.isoformat(),
+            'description': f'벤치마크용 수행평가 {i + 1}',
+            'creator_name': name,
+            'creator_code': code,
+            'class_id': class_id
+        })
+
+    users = [
+        {'id': f'bench{i}', 'name': f'벤치{i}', 'password': f'pw{i}'}
+        for i in range(USER_COUNT)
+    ]
+
+    return {
+        'class_id': class_id,
+        'days': days,
+        'roster': roster,
+        'users': users,
+        'yaja_students': yaja_students,
+        'hagteugsa': hagteugsa,
+        'hagteugsa_members': hagteugsa_members,
+        'suhang': suhang
+    }
+
+
+def seed_sqlite(db_path, dataset):
+    """init_db()로 만들어진 SQLite 파일에 데이터를 채웁니다."""
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    existing = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table in ('users', 'yaja_students', 'hagteugsa_members', 'hagteugsa', 'suhang', 'outbox'):
+        if table in existing:
+            c.execute(f'DELETE FROM {table}')
+    # 저장소와 같은 id(1부터)를 쓰도록 AUTOINCREMENT 카운터도 초기화합니다.
+    c.execute('DELETE FROM sqlite_sequence')
+    c.executemany('INSERT INTO users (id, name, password) VALUES (?, ?, ?)',
+                  [(u['id'], u['name'], generate_password_hash(u['password'])) for u in dataset['users']])
+    insert_dataset(c, dataset)
+    conn.commit()
+    conn.close()
+
+
+def insert_dataset(cursor, dataset):
+    """비어 있지 않은 DB에 한 반의 데이터를 추가합니다 (여러 반 벤치마크용)."""
+    cursor.executemany('''INSERT INTO yaja_students
+                          (date, period, student_name, student_code, student_number, reason, class_id)
+                          VALUES (:date, :period, :student_name, :student_code, :student_number, :reason, :class_id)''',
+                       dataset['yaja_students'])
+    cursor.executemany('''INSERT INTO hagteugsa (id, title, description, max_members, creator_name, creator_code, class_id)
+                          VALUES (:id, :title, :description, :max_members, :creator_name, :creator_code, :class_id)''',
+                       dataset['hagteugsa'])
+    cursor.executemany('''INSERT INTO hagteugsa_members (hagteugsa_id, member_name, member_code, class_id)
+                          VALUES (:hagteugsa_id, :member_name, :member_code, :class_id)''',
+                       dataset['hagteugsa_members'])
+    cursor.executemany('''INSERT INTO suhang (subject, title, deadline, description, creator_name, creator_code, class_id)
+                          VALUES (:subject, :title, :deadline, :description, :creator_name, :creator_code, :class_id)''',
+                       dataset['suhang'])
+
+
+def seed_store(store, dataset):
+    """메모리 Supabase 저장소(InMemoryStore)에 데이터를 채웁니다."""
+    store.clear()
+    for table in ('yaja_students', 'hagteugsa', 'hagteugsa_members', 'suhang'):
+        store.insert_rows(table, dataset[table])
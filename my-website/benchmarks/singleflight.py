@@ -0,0 +1,178 @@
+"""
+동시 조회 합치기(singleflight) 확인
+조회 시간처럼 여러 스레드가 같은 순간에 같은 DatabaseManager 조회를 호출할 때
+Supabase(메모리 대체 클라이언트)로 나가는 요청 수를 singleflight 사용/미사용으로 비교합니다.
+사용 시에는 동시 호출 수와 관계없이 한 번 분량의 요청만 나가야 하며, 아니면 종료 코드 1로 끝납니다.
+
+사용법 (my-website 디렉터리에서):
+    python -m benchmarks.singleflight --concurrency 1,8,32,64 --latency-ms 50
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.run import RESULTS_DIR, git_commit, prepare_environment
+
+
+class CountingQuery:
+    """쿼리 빌더를 감싸 execute() 횟수를 세고 네트워크 지연을 흉내 냅니다."""
+
+    def __init__(self, query, client):
+        self._query = query
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == 'execute':
+            def execute():
+                with self._client.lock:
+                    self._client.calls += 1
+                time.sleep(self._client.latency)
+                return attr()
+            return execute
+        if callable(attr):
+            def chained(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                return CountingQuery(result, self._client) if result is self._query else result
+            return chained
+        return attr
+
+
+class CountingTable:
+    def __init__(self, table, client):
+        self._table = table
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._table, name)
+        return lambda *args, **kwargs: CountingQuery(attr(*args, **kwargs), self._client)
+
+
+class CountingClient:
+    def __init__(self, client, latency):
+        self._client = client
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return CountingTable(self._client.table(name), self)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='동시 조회 합치기(singleflight) 전후 Supabase 요청 수 비교')
+    parser.add_argument('--scale', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--concurrency', default='1,8,32,64', help='동시 호출 수 (쉼표 구분)')
+    parser.add_argument('--rounds', type=int, default=5, help='동시 호출 묶음 반복 횟수')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Supabase 요청 한 번의 지연')
+    parser.add_argument('--label', default='singleflight')
+    parser.add_argument('--output', default=RESULTS_DIR)
+    return parser.parse_args(argv)
+
+
+def run_round(func, concurrency):
+    """concurrency개 스레드가 동시에 func를 호출하고 결과 목록을 반환합니다."""
+    barrier = threading.Barrier(concurrency)
+    results = [None] * concurrency
+
+    def worker(i):
+        barrier.wait()
+        results[i] = func()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    prepare_environment(tempfile.mkdtemp(prefix='my-website-singleflight-'))
+
+    from database import db_manager
+    from singleflight import SingleFlight
+    from benchmarks.fake_supabase import FakeSupabaseClient, InMemoryStore
+    from benchmarks.seed import generate_dataset, seed_store
+
+    dataset = generate_dataset(args.scale, args.seed)
+    store = InMemoryStore()
+    seed_store(store, dataset)
+    client = CountingClient(FakeSupabaseClient(store), args.latency_ms / 1000)
+    day = dataset['yaja_students'][0]['date']
+    class_id = dataset['class_id']
+    reads = {
+        'get_yaja_students': lambda: db_manager.get_yaja_students(day, class_id),
+        'get_yaja_statistics': lambda: db_manager.get_yaja_statistics(None, None, class_id),
+        'get_hagteugsa_list': lambda: db_manager.get_hagteugsa_list(class_id),
+        'get_suhang_list': lambda: db_manager.get_suhang_list(class_id),
+    }
+    levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+
+    original_client, original_flight = db_manager.supabase, db_manager.singleflight
+    db_manager.supabase = client
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'rounds': args.rounds,
+            'latency_ms': args.latency_ms
+        },
+        'reads': {}
+    }
+    failures = []
+    try:
+        for name, read in reads.items():
+            # 한 번 호출에 필요한 요청 수 (학특사 목록은 학특사마다 멤버 조회)
+            client.calls = 0
+            expected = read()
+            per_call = client.calls
+            report['reads'][name] = {'upstream_per_call': per_call, 'levels': {}}
+            for concurrency in levels:
+                row = {}
+                for mode in ('off', 'on'):
+                    db_manager.singleflight = SingleFlight() if mode == 'on' else None
+                    client.calls = 0
+                    started = time.perf_counter()
+                    for _ in range(args.rounds):
+                        results = run_round(read, concurrency)
+                        if any(result != expected for result in results):
+                            failures.append(f'{name} c={concurrency} {mode}: 결과가 다름')
+                    row[mode] = {
+                        'upstream_calls': client.calls,
+                        'per_round': client.calls / args.rounds,
+                        'seconds': round(time.perf_counter() - started, 3)
+                    }
+                if row['on']['upstream_calls'] != per_call * args.rounds:
+                    failures.append(f"{name} c={concurrency}: 요청 {row['on']['upstream_calls']}회 "
+                                    f"(기대 {per_call * args.rounds}회)")
+                report['reads'][name]['levels'][concurrency] = row
+                print(f"{name:<20} c={concurrency:<3} upstream/round off {row['off']['per_round']:>7.1f}  "
+                      f"on {row['on']['per_round']:>5.1f}")
+    finally:
+        db_manager.supabase = original_client
+        db_manager.singleflight = original_flight
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{time.strftime('%Y%m%d-%H%M%S')}-{args.label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'✅ 결과 저장: {path}')
+    if failures:
+        print('❌ ' + '\n❌ '.join(failures))
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+반(class_id) 단위 분리
+한 배포에서 여러 반을 서비스하기 위해 요청의 반을 확인하고 반별 학생 명단을 읽습니다.
+반 명단은 src/<반>_student_numbers.csv (예: src/1-5_student_numbers.csv) 에 둡니다.
+"""
+
+import csv
+import os
+import re
+import threading
+
+from flask import request
+
+from config import Config
+
+_root_dir = os.path.dirname(os.path.abspath(__file__))
+ROSTER_DIR = os.path.join(_root_dir, 'src')
+
+DEFAULT_CLASS_ID = Config.DEFAULT_CLASS_ID
+# '학년-반' 형식 (예: 1-5, 2-11)
+CLASS_ID_PATTERN = re.compile(r'^[1-9]-[1-9][0-9]?$')
+
+# 반별 명단 캐시: {class_id: (파일 수정 시각, 명단)}
+_roster_cache = {}
+_roster_lock = threading.Lock()
+
+
+class InvalidClassId(ValueError):
+    """class_id 형식이 잘못되었을 때 발생합니다. flask_app에서 400으로 응답합니다."""
+
+
+def resolve_class_id(value):
+    """값이 없으면 기본 반을, 형식이 맞으면 그대로 반환합니다."""
+    if value is None or value == '':
+        return DEFAULT_CLASS_ID
+    value = str(value).strip()
+    if not CLASS_ID_PATTERN.match(value):
+        raise InvalidClassId(f'잘못된 반 정보입니다: {value}')
+    return value
+
+
+def request_class_id():
+    """쿼리 문자열 또는 JSON 본문의 class_id를 읽습니다."""
+    value = request.args.get('class_id')
+    if value is None and request.is_json:
+        value = (request.get_json(silent=True) or {}).get('class_id')
+    return resolve_class_id(value)
+
+
+def roster_path(class_id):
+    return os.path.join(ROSTER_DIR, f'{class_id}_student_numbers.csv')
+
+
+def load_roster(class_id):
+    """
+    반 명단을 읽습니다. 파일이 바뀌지 않았으면 캐시를 사용합니다.
+
+    Returns:
+        [{'studentNumber', 'name', 'code'}] 목록, 명단 파일이 없으면 None
+    """
+    path = roster_path(class_id)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _roster_lock:
+        cached = _roster_cache.get(class_id)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    roster = []
+    with open(path, encoding='utf-8-sig') as f:
+        for row in csv.reader(f):
+            # 첫 줄(빈 칸)과 헤더(학번,이름,학생코드)는 건너뜀
+            if len(row) >= 3 and row[0].strip().isdigit():
+                roster.append({'studentNumber': row[0].strip(), 'name': row[1].strip(), 'code': row[2].strip()})
+    with _roster_lock:
+        _roster_cache[class_id] = (mtime, roster)
+    return roster
+
+
+def available_classes():
+    """명단 파일이 있는 반 목록을 반환합니다."""
+    classes = []
+    for name in os.listdir(ROSTER_DIR):
+        if name.endswith('_student_numbers.csv'):
+            class_id = name[:-len('_student_numbers.csv')]
+            if CLASS_ID_PATTERN.match(class_id):
+                classes.append(class_id)
+    return sorted(classes, key=lambda c: tuple(int(part) for part in c.split('-')))
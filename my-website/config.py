@@ -7,9 +7,113 @@ class Config:
     # Supabase 설정
     SUPABASE_URL = os.getenv('SUPABASE_URL', 'your_supabase_project_url')
     SUPABASE_KEY = os.getenv('SUPABASE_KEY', 'your_supabase_anon_key')
+    # Supabase HTTP 연결 풀 (모든 스레드가 공유, HTTP/2는 h2 패키지가 있을 때만)
+    SUPABASE_POOL_SIZE = int(os.getenv('SUPABASE_POOL_SIZE', '20'))
+    SUPABASE_KEEPALIVE = int(os.getenv('SUPABASE_KEEPALIVE', '10'))
+    SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv('SUPABASE_KEEPALIVE_EXPIRY', '30'))
+    SUPABASE_HTTP2 = os.getenv('SUPABASE_HTTP2', 'true').lower() == 'true'
+    # 타임아웃 (초): 요청 처리 중 호출은 READ, 백그라운드 동기화(복제본)는 SYNC
+    SUPABASE_CONNECT_TIMEOUT = float(os.getenv('SUPABASE_CONNECT_TIMEOUT', '3'))
+    SUPABASE_READ_TIMEOUT = float(os.getenv('SUPABASE_READ_TIMEOUT', '10'))
+    SUPABASE_SYNC_TIMEOUT = float(os.getenv('SUPABASE_SYNC_TIMEOUT', '30'))
     
     # Flask 설정
     SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
+
+    # 로그 설정 (큐에 넣고 백그라운드 스레드가 출력)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json 또는 text
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    # 성공(2xx·3xx) 요청 로그와 httpx 요청 로그를 남길 비율, 오류·느린 요청은 항상 남김
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+    LOG_SLOW_MS = float(os.getenv('LOG_SLOW_MS', '500'))
     
     # 데이터베이스 설정
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///users.db')
+    # SQLite 파일 경로 (DATABASE_URL에서 추출)
+    SQLITE_PATH = DATABASE_URL[len('sqlite:///'):] if DATABASE_URL.startswith('sqlite:///') else 'users.db'
+    
+    # 반 설정 (class_id가 없는 요청과 기존 데이터에 쓰이는 반)
+    DEFAULT_CLASS_ID = os.getenv('DEFAULT_CLASS_ID', '1-5')
+    
+    # Write-behind 아웃박스 설정 (SQLite 커밋 후 Supabase로 비동기 전송)
+    OUTBOX_ENABLED = os.getenv('OUTBOX_ENABLED', 'true').lower() == 'true'
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '100'))
+    OUTBOX_INTERVAL = float(os.getenv('OUTBOX_INTERVAL', '1.0'))
+    OUTBOX_MAX_BACKOFF = float(os.getenv('OUTBOX_MAX_BACKOFF', '300'))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '50'))
+
+    # 로컬 읽기 복제본 설정 (읽기 API를 SQLite에서 처리하고 Supabase 변경분을 주기적으로 가져옴)
+    REPLICA_ENABLED = os.getenv('REPLICA_ENABLED', 'true').lower() == 'true'
+    REPLICA_INTERVAL = float(os.getenv('REPLICA_INTERVAL', '5.0'))
+    REPLICA_MAX_STALENESS = float(os.getenv('REPLICA_MAX_STALENESS', '30.0'))
+    REPLICA_RECONCILE_EVERY = int(os.getenv('REPLICA_RECONCILE_EVERY', '12'))
+    REPLICA_PAGE_SIZE = int(os.getenv('REPLICA_PAGE_SIZE', '1000'))
+    
+    # 야자 통계 캐시 크기 (0이면 사용 안 함)
+    STATS_CACHE_SIZE = int(os.getenv('STATS_CACHE_SIZE', '128'))
+
+    # 멱등 키 응답 캐시 (재시도된 POST를 처음 응답으로 답함, 0이면 사용 안 함)
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '1024'))
+    IDEMPOTENCY_TTL = float(os.getenv('IDEMPOTENCY_TTL', '3600'))
+
+    # 클라이언트(세션 쿠키, 없으면 IP)별 요청 제한: 'rate/burst' = 초당 rate개, 최대 burst개 연속
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_DEFAULT = os.getenv('RATE_LIMIT_DEFAULT', '10/30')
+    # 라우트별 예산 ('규칙=rate/burst'를 쉼표로 연결), Supabase로 이어지는 읽기 API를 더 좁게 제한
+    RATE_LIMITS = os.getenv('RATE_LIMITS', ','.join([
+        '/api/yaja/list/<date>=2/20',
+        '/api/yaja/statistics=1/10',
+        '/api/hagteugsa/list=2/20',
+        '/api/suhang/list=2/20',
+        '/api/dashboard=2/20'
+    ]))
+    # 여러 워커가 버킷을 공유할 SQLite 파일 (비우면 프로세스 메모리)
+    RATE_LIMIT_SHARED_PATH = os.getenv('RATE_LIMIT_SHARED_PATH', '')
+    # 앞단 프록시 수 (Koyeb 등 프록시 뒤에서는 1, X-Forwarded-For에서 클라이언트 IP를 읽음)
+    RATE_LIMIT_PROXY_HOPS = int(os.getenv('RATE_LIMIT_PROXY_HOPS', '0'))
+    # 세션 쿠키가 없는 요청(첫 요청, 쿠키를 보내지 않는 클라이언트)은 IP로 세고, 한 IP(학교 NAT·프록시)를
+    # 이만큼의 클라이언트가 함께 쓴다고 보고 예산을 늘림 (조회 시간에 한 반이 동시에 처음 열어도 429가 나지 않게)
+    RATE_LIMIT_IP_CLIENTS = int(os.getenv('RATE_LIMIT_IP_CLIENTS', '40'))
+
+    # 급식 저장소 (NEIS/CSV 급식을 파싱해 저장하는 SQLite 파일, 기본: 메인 DB와 같은 디렉터리)
+    MEAL_DB_PATH = os.getenv('MEAL_DB_PATH', os.path.join(os.path.dirname(SQLITE_PATH), 'meals.db'))
+    # NEIS 오픈API (키가 없으면 food_calender.csv만 사용)
+    NEIS_API_KEY = os.getenv('NEIS_API_KEY', '')
+    NEIS_OFFICE_CODE = os.getenv('NEIS_OFFICE_CODE', 'G10')     # 대전광역시교육청
+    NEIS_SCHOOL_CODE = os.getenv('NEIS_SCHOOL_CODE', '7430048')  # 대전대신고등학교
+
+    # 지난 학기 보관 (오래된 야자 기록·수행평가를 옮겨 두는 SQLite 파일, 기본: 메인 DB와 같은 디렉터리)
+    ARCHIVE_DB_PATH = os.getenv('ARCHIVE_DB_PATH', os.path.join(os.path.dirname(SQLITE_PATH), 'archive.db'))
+    # 오늘에서 이 일수 전이 속한 학기보다 앞선 학기를 보관
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '180'))
+    # 서버 안에서 보관을 실행하는 주기(초, 0이면 python archive.py로만 실행)
+    ARCHIVE_INTERVAL = float(os.getenv('ARCHIVE_INTERVAL', '0'))
+
+    # users.db 온라인 백업 (스냅숏 디렉터리, 기본: DB 옆 backups/)
+    BACKUP_DIR = os.getenv('BACKUP_DIR', os.path.join(os.path.dirname(SQLITE_PATH), 'backups'))
+    # 서버 안에서 백업하는 주기(초, 0이면 python backup.py로만 실행)
+    BACKUP_INTERVAL = float(os.getenv('BACKUP_INTERVAL', '0'))
+    BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', '14'))
+    # backup: 온라인 백업 API로 BACKUP_PAGES 페이지씩, 단계 사이 BACKUP_SLEEP_MS 쉼 / vacuum: VACUUM INTO
+    BACKUP_MODE = os.getenv('BACKUP_MODE', 'backup')
+    BACKUP_PAGES = int(os.getenv('BACKUP_PAGES', '256'))
+    BACKUP_SLEEP_MS = float(os.getenv('BACKUP_SLEEP_MS', '5'))
+
+    # 관리자 API(/api/admin/*)와 프로파일 요청 헤더에 쓰는 토큰 (비우면 관리자 API 사용 안 함)
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+    # 요청 추적 span (NDJSON 파일, python tracing.py로 Chrome trace 변환)
+    TRACE_ENABLED = os.getenv('TRACE_ENABLED', 'false').lower() == 'true'
+    TRACE_PATH = os.getenv('TRACE_PATH', os.path.join(os.path.dirname(SQLITE_PATH), 'traces', 'spans.ndjson'))
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '1.0'))
+    TRACE_MAX_BYTES = int(os.getenv('TRACE_MAX_BYTES', str(10 * 1024 * 1024)))
+    TRACE_BACKUPS = int(os.getenv('TRACE_BACKUPS', '3'))
+
+    # 요청 프로파일링 (X-Profile: 1과 X-Admin-Token을 보낸 요청, 또는 PROFILE_SAMPLE_RATE 비율의 요청)
+    PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'false').lower() == 'true'
+    PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(os.path.dirname(SQLITE_PATH), 'profiles'))
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_MODE = os.getenv('PROFILE_MODE', 'sample')  # sample(collapsed stack) 또는 cprofile(.prof)
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '100'))
@@ -0,0 +1,97 @@
+"""
+첫 화면 대시보드
+오늘 급식, 오늘 야자 명단, 마감 임박 수행평가, 학특사 정원 현황을 서버에서 동시에 읽어
+한 번의 응답으로 돌려줍니다. 섹션마다 로더(class_id -> 딕셔너리)와 캐시 시간(max-age)을 가집니다.
+
+- 한 섹션이 실패해도 나머지는 응답하고, 실패한 섹션은 {'error': 메시지}로 표시합니다.
+- 섹션별 max-age는 Section-Max-Age 헤더로, 응답 전체의 Cache-Control은 가장 짧은 max-age로 정합니다.
+  클라이언트는 만료된 섹션만 ?sections=로 다시 요청할 수 있습니다.
+"""
+
+import contextvars
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def parse_sections(value, available):
+    """
+    'meal,yaja' 같은 쿼리 값을 섹션 목록으로 바꿉니다 (값이 없으면 전체, 순서는 등록 순서).
+
+    Raises:
+        ValueError: 알 수 없는 섹션이 포함된 경우
+    """
+    if not value:
+        return list(available)
+    parts = {part.strip() for part in value.split(',') if part.strip()}
+    if not parts or parts - set(available):
+        raise ValueError(f"sections는 {', '.join(available)} 중에서 선택하세요.")
+    return [name for name in available if name in parts]
+
+
+class Dashboard:
+    def __init__(self, max_workers=4):
+        # 이름 -> (로더, max-age 초 또는 max-age를 돌려주는 함수)
+        self.sections = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dashboard')
+        self.builds = 0
+        self.errors = {}
+        self.last_ms = {}
+
+    def register(self, name, loader, max_age):
+        self.sections[name] = (loader, max_age)
+
+    def _load(self, name, class_id):
+        loader, _ = self.sections[name]
+        started = time.perf_counter()
+        try:
+            return loader(class_id)
+        except Exception as e:
+            logger.error('대시보드 %s 섹션 실패: %s', name, e)
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return {'error': str(e)}
+        finally:
+            self.last_ms[name] = round((time.perf_counter() - started) * 1000, 3)
+
+    def max_age(self, name):
+        max_age = self.sections[name][1]
+        return int(max_age() if callable(max_age) else max_age)
+
+    def build(self, class_id, names):
+        """
+        섹션들을 동시에 읽습니다.
+
+        Returns:
+            ({섹션: 데이터}, {섹션: max-age})
+        """
+        # 요청 로그 컨텍스트(요청 ID, Supabase 호출 수)를 섹션 작업에도 이어 줌
+        futures = {name: self._executor.submit(contextvars.copy_context().run, self._load, name, class_id)
+                   for name in names}
+        data = {name: future.result() for name, future in futures.items()}
+        # 실패한 섹션은 캐시하지 않음
+        max_ages = {name: 0 if 'error' in data[name] else self.max_age(name) for name in names}
+        self.builds += 1
+        return data, max_ages
+
+    @staticmethod
+    def etag(body):
+        return hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+
+    @staticmethod
+    def cache_headers(max_ages):
+        return {
+            'Cache-Control': f"private, max-age={min(max_ages.values(), default=0)}",
+            'Section-Max-Age': ', '.join(f'{name}={age}' for name, age in max_ages.items())
+        }
+
+    # 메트릭
+    def stats(self):
+        return {
+            'sections': {name: self.max_age(name) for name in self.sections},
+            'builds': self.builds,
+            'errors': dict(self.errors),
+            'last_ms': dict(self.last_ms)
+        }
@@ -8,11 +8,23 @@ except ImportError:
         create_client = None
         Client = None
 
+try:
+    # httpx_client 옵션은 supabase 2.x 이후에만 있음
+    from supabase import ClientOptions
+except ImportError:
+    ClientOptions = None
+
+import os
+import threading
+
 from config import Config
+from http_pool import PooledHTTP, call_timeout
+from singleflight import SingleFlight, coalesced
+from tracing import tracer
+from yaja_stats import FIELDS, GRANULARITIES, build_student_history, build_yaja_statistics
 import logging
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
+# 로깅 설정은 logs.setup_logging (flask_app 시작 시)
 logger = logging.getLogger(__name__)
 
 class DatabaseManager:
@@ -40,7 +52,7 @@ class DatabaseManager:
             self.supabase.table('hagteugsa_members').insert(member_data).execute()
             return {'success': True, 'id': hagteugsa_id}
         except Exception as e:
-            logger.error(f"학특사 생성 실패: {e}")
+            logger.error('학특사 생성 실패: %s', e)
             return {'success': False, 'msg': str(e)}
 
     def get_hagteugsa_list(self):
@@ -66,7 +78,7 @@ class DatabaseManager:
                 })
             return {'success': True, 'data': hagteugsa_list}
         except Exception as e:
-            logger.error(f"학특사 목록 조회 실패: {e}")
+            logger.error('학특사 목록 조회 실패: %s', e)
             return {'success': False, 'msg': str(e)}
 
     def join_hagteugsa(self, hagteugsa_id, member_name, member_code):
@@ -96,7 +108,7 @@ class DatabaseManager:
             self.supabase.table('hagteugsa_members').insert(member_data).execute()
             return {'success': True}
         except Exception as e:
-            logger.error(f"학특사 참여 실패: {e}")
+            logger.error('학특사 참여 실패: %s', e)
             return {'success': False, 'msg': str(e)}
 
     def delete_hagteugsa(self, hagteugsa_id):
@@ -112,7 +124,7 @@ class DatabaseManager:
                 return {'success': False, 'msg': '해당 학특사를 찾을 수 없습니다.'}
             return {'success': True}
         except Exception as e:
-            logger.error(f"학특사 삭제 실패: {e}")
+            logger.error('학특사 삭제 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     def add_suhang(self, subject, title, deadline, description, creator_name, creator_code):
         """수행평가를 추가합니다."""
@@ -130,7 +142,7 @@ class DatabaseManager:
             self.supabase.table('suhang').insert(data).execute()
             return {'success': True, 'msg': '수행평가가 성공적으로 추가되었습니다.'}
         except Exception as e:
-            logger.error(f"수행평가 추가 실패: {e}")
+            logger.error('수행평가 추가 실패: %s', e)
             return {'success': False, 'msg': str(e)}
 
     def get_suhang_list(self):
@@ -153,7 +165,7 @@ class DatabaseManager:
                 })
             return {'success': True, 'data': suhang_list}
         except Exception as e:
-            logger.error(f"수행평가 목록 조회 실패: {e}")
+            logger.error('수행평가 목록 조회 실패: %s', e)
             return {'success': False, 'msg': str(e)}
 
     def delete_suhang(self, suhang_id):
@@ -166,21 +178,81 @@ class DatabaseManager:
                 return {'success': False, 'msg': '해당 수행평가를 찾을 수 없습니다.'}
             return {'success': True, 'msg': '수행평가가 성공적으로 삭제되었습니다.'}
         except Exception as e:
-            logger.error(f"수행평가 삭제 실패: {e}")
+            logger.error('수행평가 삭제 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     def __init__(self):
+        # 같은 인자의 동시 조회는 Supabase에 한 번만 요청
+        self.singleflight = SingleFlight()
+        # 모든 스레드가 공유하는 HTTP 연결 풀
+        self.http = PooledHTTP(pool_size=Config.SUPABASE_POOL_SIZE,
+                               keepalive=Config.SUPABASE_KEEPALIVE,
+                               keepalive_expiry=Config.SUPABASE_KEEPALIVE_EXPIRY,
+                               connect_timeout=Config.SUPABASE_CONNECT_TIMEOUT,
+                               read_timeout=Config.SUPABASE_READ_TIMEOUT,
+                               http2=Config.SUPABASE_HTTP2)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._client = None
         if create_client is None:
             logger.warning("Supabase module not available. Using SQLite fallback.")
-            self.supabase = None
             return
-            
+        self._client = self._connect()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connect(self):
+        """공유 연결 풀을 쓰는 Supabase 클라이언트를 만듭니다. 실패하면 None."""
         try:
-            self.supabase: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+            options = None
+            if ClientOptions is not None and self.http.available:
+                try:
+                    options = ClientOptions(httpx_client=self.http.client())
+                except TypeError:
+                    logger.warning("이 supabase 버전은 httpx_client 옵션이 없어 기본 연결을 사용합니다.")
+            if options is not None:
+                client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY, options=options)
+            else:
+                client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
             logger.info("Supabase 연결 성공")
+            return client
         except Exception as e:
-            logger.error(f"Supabase 연결 실패: {e}")
-            self.supabase = None
-    
+            logger.error('Supabase 연결 실패: %s', e)
+            return None
+
+    def _after_fork(self):
+        # 자식 프로세스: 부모의 락·소켓을 버리고 처음 쓸 때 다시 연결
+        self._lock = threading.Lock()
+        self.http.after_fork()
+
+    @property
+    def supabase(self):
+        """
+        Supabase 클라이언트. 여러 스레드가 함께 써도 되며(요청마다 새 쿼리 빌더, 공유 풀은 스레드 안전),
+        fork된 워커에서는 처음 접근할 때 그 프로세스의 풀로 다시 만듭니다.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    if self._client is not None:
+                        self._client = self._connect()
+                    self._pid = os.getpid()
+        return self._client
+
+    @supabase.setter
+    def supabase(self, client):
+        # 벤치마크에서 대체 클라이언트를 넣거나 끌 때 사용
+        with self._lock:
+            self._client = client
+            self._pid = os.getpid()
+
+    def timeout(self, seconds):
+        """with 블록 안의 Supabase 요청 타임아웃(초)을 바꿉니다. 예: with db_manager.timeout(30): ..."""
+        return call_timeout(seconds)
+
+    def close(self):
+        """연결 풀을 닫습니다 (프로세스 종료 시)."""
+        self.http.close()
+
     def is_connected(self):
         return self.supabase is not None
     
@@ -205,7 +277,7 @@ class DatabaseManager:
             
             return True
         except Exception as e:
-            logger.error(f"테이블 생성 실패: {e}")
+            logger.error('테이블 생성 실패: %s', e)
             return False
     
     # 야자 관리 함수들
@@ -229,10 +301,11 @@ class DatabaseManager:
             
             return {'success': True}
         except Exception as e:
-            logger.error(f"야자 학생 추가 실패: {e}")
+            logger.error('야자 학생 추가 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
-    def get_yaja_students(self, date):
+    @coalesced
+    def get_yaja_students(self, date, class_id=Config.DEFAULT_CLASS_ID):
         """특정 날짜의 야자 학생 목록을 조회합니다."""
         if not self.is_connected():
             return {'success': False, 'msg': '데이터베이스 연결 실패'}
@@ -240,6 +313,7 @@ class DatabaseManager:
         try:
             response = self.supabase.table('yaja_students')\
                 .select('*')\
+                .eq('class_id', class_id)\
                 .eq('date', date)\
                 .order('period')\
                 .order('student_name')\
@@ -259,10 +333,10 @@ class DatabaseManager:
             
             return {'success': True, 'data': students}
         except Exception as e:
-            logger.error(f"야자 학생 조회 실패: {e}")
+            logger.error('야자 학생 조회 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
-    def delete_yaja_student(self, student_id):
+    def delete_yaja_student(self, student_id, class_id=Config.DEFAULT_CLASS_ID):
         """야자 학생을 삭제합니다."""
         if not self.is_connected():
             return {'success': False, 'msg': '데이터베이스 연결 실패'}
@@ -271,6 +345,7 @@ class DatabaseManager:
             response = self.supabase.table('yaja_students')\
                 .delete()\
                 .eq('id', student_id)\
+                .eq('class_id', class_id)\
                 .execute()
             
             if not response.data:
@@ -278,16 +353,20 @@ class DatabaseManager:
             
             return {'success': True}
         except Exception as e:
-            logger.error(f"야자 학생 삭제 실패: {e}")
+            logger.error('야자 학생 삭제 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
-    def get_yaja_statistics(self, start_date=None, end_date=None):
-        """야자 통계를 조회합니다."""
+    @coalesced
+    def get_yaja_statistics(self, start_date=None, end_date=None, class_id=Config.DEFAULT_CLASS_ID,
+                            granularity=GRANULARITIES, fields=FIELDS, columnar=False):
+        """야자 통계를 조회합니다. 집계는 SQLite 경로와 같은 build_yaja_statistics를 사용합니다."""
         if not self.is_connected():
             return {'success': False, 'msg': '데이터베이스 연결 실패'}
         
         try:
-            query = self.supabase.table('yaja_students').select('*')
+            query = self.supabase.table('yaja_students')\
+                .select('date, period, reason, student_name')\
+                .eq('class_id', class_id)
             
             if start_date:
                 query = query.gte('date', start_date)
@@ -296,53 +375,37 @@ class DatabaseManager:
             
             response = query.execute()
             
-            # 통계 데이터 처리
-            stats = {
-                'total_absences': len(response.data),
-                'daily_stats': {},
-                'weekly_stats': {},
-                'reason_stats': {},
-                'student_stats': {},
-                'period_stats': {1: 0, 2: 0, 3: 0},
-                'student_details': {}
-            }
-            for row in response.data:
-                date = row['date']
-                period = row['period']
-                reason = row['reason']
-                student_name = row['student_name']
-                # 일별 통계
-                if date not in stats['daily_stats']:
-                    stats['daily_stats'][date] = 0
-                stats['daily_stats'][date] += 1
-                # 차시별 통계
-                stats['period_stats'][period] += 1
-                # 사유별 통계
-                if reason not in stats['reason_stats']:
-                    stats['reason_stats'][reason] = 0
-                stats['reason_stats'][reason] += 1
-                # 학생별 통계
-                if student_name not in stats['student_stats']:
-                    stats['student_stats'][student_name] = 0
-                stats['student_stats'][student_name] += 1
-                # 학생별 상세 통계
-                if student_name not in stats['student_details']:
-                    stats['student_details'][student_name] = {
-                        'total': 0,
-                        'periods': {1: 0, 2: 0, 3: 0},
-                        'reasons': {}
-                    }
-                stats['student_details'][student_name]['total'] += 1
-                if period in stats['student_details'][student_name]['periods']:
-                    stats['student_details'][student_name]['periods'][period] += 1
-                else:
-                    stats['student_details'][student_name]['periods'][period] = 1
-                if reason not in stats['student_details'][student_name]['reasons']:
-                    stats['student_details'][student_name]['reasons'][reason] = 0
-                stats['student_details'][student_name]['reasons'][reason] += 1
-            return {'success': True, 'data': stats}
+            rows = [(row['date'], row['period'], row['reason'], row['student_name']) for row in response.data]
+            return {'success': True, 'data': build_yaja_statistics(rows, granularity, fields=fields, columnar=columnar)}
         except Exception as e:
-            logger.error(f"야자 통계 조회 실패: {e}")
+            logger.error('야자 통계 조회 실패: %s', e)
+            return {'success': False, 'msg': str(e)}
+    
+    @coalesced
+    def get_yaja_student_history(self, student_code, start_date=None, end_date=None,
+                                 class_id=Config.DEFAULT_CLASS_ID):
+        """학생 한 명의 야자 기록을 (class_id, student_code, date) 인덱스 범위로 조회합니다."""
+        if not self.is_connected():
+            return {'success': False, 'msg': '데이터베이스 연결 실패'}
+        
+        try:
+            query = self.supabase.table('yaja_students')\
+                .select('date, period, reason, student_name, student_number')\
+                .eq('class_id', class_id)\
+                .eq('student_code', student_code)
+            
+            if start_date:
+                query = query.gte('date', start_date)
+            if end_date:
+                query = query.lte('date', end_date)
+            
+            response = query.order('date').order('period').execute()
+            
+            rows = [(row['date'], row['period'], row['reason'], row['student_name'], row['student_number'])
+                    for row in response.data]
+            return {'success': True, 'data': build_student_history(rows)}
+        except Exception as e:
+            logger.error('학생 야자 기록 조회 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
     # 학급특색사업 함수들
@@ -375,10 +438,11 @@ class DatabaseManager:
             
             return {'success': True, 'id': hagteugsa_id}
         except Exception as e:
-            logger.error(f"학특사 생성 실패: {e}")
+            logger.error('학특사 생성 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
-    def get_hagteugsa_list(self):
+    @coalesced
+    def get_hagteugsa_list(self, class_id=Config.DEFAULT_CLASS_ID):
         """학급특색사업 목록을 조회합니다."""
         if not self.is_connected():
             return {'success': False, 'msg': '데이터베이스 연결 실패'}
@@ -387,6 +451,7 @@ class DatabaseManager:
             # 학특사 목록과 각각의 멤버 수 조회
             response = self.supabase.table('hagteugsa')\
                 .select('*, hagteugsa_members!inner(member_name)')\
+                .eq('class_id', class_id)\
                 .order('created_at', desc=True)\
                 .execute()
             
@@ -413,10 +478,10 @@ class DatabaseManager:
             
             return {'success': True, 'data': hagteugsa_list}
         except Exception as e:
-            logger.error(f"학특사 목록 조회 실패: {e}")
+            logger.error('학특사 목록 조회 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
-    def join_hagteugsa(self, hagteugsa_id, member_name, member_code):
+    def join_hagteugsa(self, hagteugsa_id, member_name, member_code, class_id=Config.DEFAULT_CLASS_ID):
         """학급특색사업에 참여합니다."""
         if not self.is_connected():
             return {'success': False, 'msg': '데이터베이스 연결 실패'}
@@ -426,6 +491,7 @@ class DatabaseManager:
             hagteugsa_response = self.supabase.table('hagteugsa')\
                 .select('max_members')\
                 .eq('id', hagteugsa_id)\
+                .eq('class_id', class_id)\
                 .execute()
             
             if not hagteugsa_response.data:
@@ -455,20 +521,30 @@ class DatabaseManager:
             self.supabase.table('hagteugsa_members').insert({
                 'hagteugsa_id': hagteugsa_id,
                 'member_name': member_name,
-                'member_code': member_code
+                'member_code': member_code,
+                'class_id': class_id
             }).execute()
             
             return {'success': True}
         except Exception as e:
-            logger.error(f"학특사 참여 실패: {e}")
+            logger.error('학특사 참여 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
-    def delete_hagteugsa(self, hagteugsa_id):
+    def delete_hagteugsa(self, hagteugsa_id, class_id=Config.DEFAULT_CLASS_ID):
         """학급특색사업을 삭제합니다."""
         if not self.is_connected():
             return {'success': False, 'msg': '데이터베이스 연결 실패'}
         
         try:
+            # 다른 반의 학특사는 삭제하지 않음
+            owned = self.supabase.table('hagteugsa')\
+                .select('id')\
+                .eq('id', hagteugsa_id)\
+                .eq('class_id', class_id)\
+                .execute()
+            if not owned.data:
+                return {'success': False, 'msg': '해당 학특사를 찾을 수 없습니다.'}
+            
             # 멤버 먼저 삭제
             self.supabase.table('hagteugsa_members')\
                 .delete()\
@@ -486,7 +562,7 @@ class DatabaseManager:
             
             return {'success': True}
         except Exception as e:
-            logger.error(f"학특사 삭제 실패: {e}")
+            logger.error('학특사 삭제 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
     # 수행평가 함수들
@@ -510,10 +586,11 @@ class DatabaseManager:
             
             return {'success': True, 'msg': '수행평가가 성공적으로 추가되었습니다.'}
         except Exception as e:
-            logger.error(f"수행평가 추가 실패: {e}")
+            logger.error('수행평가 추가 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
-    def get_suhang_list(self):
+    @coalesced
+    def get_suhang_list(self, class_id=Config.DEFAULT_CLASS_ID):
         """수행평가 목록을 조회합니다."""
         if not self.is_connected():
             return {'success': False, 'msg': '데이터베이스 연결 실패'}
@@ -521,7 +598,8 @@ class DatabaseManager:
         try:
             response = self.supabase.table('suhang')\
                 .select('*')\
-                .order('deadline', asc=True)\
+                .eq('class_id', class_id)\
+                .order('deadline')\
                 .execute()
             
             suhang_list = []
@@ -539,10 +617,10 @@ class DatabaseManager:
             
             return {'success': True, 'data': suhang_list}
         except Exception as e:
-            logger.error(f"수행평가 목록 조회 실패: {e}")
+            logger.error('수행평가 목록 조회 실패: %s', e)
             return {'success': False, 'msg': str(e)}
     
-    def delete_suhang(self, suhang_id):
+    def delete_suhang(self, suhang_id, class_id=Config.DEFAULT_CLASS_ID):
         """수행평가를 삭제합니다."""
         if not self.is_connected():
             return {'success': False, 'msg': '데이터베이스 연결 실패'}
@@ -551,6 +629,7 @@ class DatabaseManager:
             response = self.supabase.table('suhang')\
                 .delete()\
                 .eq('id', suhang_id)\
+                .eq('class_id', class_id)\
                 .execute()
             
             if not response.data:
@@ -558,8 +637,11 @@ class DatabaseManager:
             
             return {'success': True, 'msg': '수행평가가 성공적으로 삭제되었습니다.'}
         except Exception as e:
-            logger.error(f"수행평가 삭제 실패: {e}")
+            logger.error('수행평가 삭제 실패: %s', e)
             return {'success': False, 'msg': str(e)}
 
+# 요청 추적 중이면 Supabase 조회·쓰기마다 span
+tracer.instrument(DatabaseManager, 'supabase', exclude=('is_connected', 'timeout', 'close'))
+
 # 전역 데이터베이스 매니저 인스턴스
 db_manager = DatabaseManager()
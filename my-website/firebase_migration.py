@@ -6,8 +6,13 @@ Firebase 데이터 마이그레이션 및 동기화 스크립트
 import os
 import sqlite3
 import json
+import logging
 from datetime import datetime
 
+from logs import setup_logging
+
+logger = logging.getLogger(__name__)
+
 try:
     import firebase_admin
     from firebase_admin import credentials, db
@@ -89,8 +94,9 @@ class FirebaseMigration:
                 ref.push(data)
                 migrated_count += 1
                 
-                if migrated_count % 10 == 0:
-                    print(f"진행 중... {migrated_count}/{len(rows)}")
+                # 진행 상황은 10% 단위로만 (레코드마다 콘솔에 쓰면 전송보다 느려짐)
+                if migrated_count % max(1, len(rows) // 10) == 0:
+                    logger.info('진행 중... %d/%d', migrated_count, len(rows))
             
             print(f"✅ 마이그레이션 완료! {migrated_count}개의 레코드를 이전했습니다.")
             
@@ -146,8 +152,9 @@ class FirebaseMigration:
                 ref.push(data)
                 migrated_count += 1
                 
-                if migrated_count % 10 == 0:
-                    print(f"진행 중... {migrated_count}/{len(records)}")
+                # 진행 상황은 10% 단위로만 (레코드마다 콘솔에 쓰면 전송보다 느려짐)
+                if migrated_count % max(1, len(records) // 10) == 0:
+                    logger.info('진행 중... %d/%d', migrated_count, len(records))
             
             print(f"✅ 마이그레이션 완료! {migrated_count}개의 레코드를 이전했습니다.")
             
@@ -228,6 +235,7 @@ class FirebaseMigration:
 
 def main():
     """메인 실행 함수"""
+    setup_logging(fmt='text', sample_rate=1.0)
     print("=" * 60)
     print("Firebase 야자 데이터 마이그레이션 도구")
     print("=" * 60)
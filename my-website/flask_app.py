@@ -1,22 +1,280 @@
+import hmac
+import logging
 import os
+import re
+import secrets
 import sqlite3
+import tempfile
+import time
+import uuid
 import pandas as pd
-from flask import Flask, jsonify, request
+from flask import Flask, abort, g, jsonify, request, send_file, session
 from datetime import datetime, timedelta
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
-from database import db_manager
 from config import Config
+import logs
+
+# 다른 모듈이 로그를 남기기 전에 큐 기반 로깅을 설정
+log_pipeline = logs.setup_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_QUEUE_SIZE, Config.LOG_SAMPLE_RATE)
+
+from database import db_manager
+from yaja_stats import build_student_history, build_yaja_statistics, parse_fields, parse_format, parse_granularity
+from meal_parser import parse_allergen_codes, parse_menu_items
+from meal_store import MealStore, allergen_mask, fetch_neis_records
+from meal_allergens import AllergenIndex, describe as describe_allergens
+import meal_nutrition
+from outbox import OutboxReplayer, init_outbox
+from replica import ReadReplica
+from stats_cache import StatsCache
+from archive import Archive
+import backup
+from yaja_import import YajaImporter, read_rows
+from idempotency import IdempotencyCache, idempotent
+from dashboard import Dashboard, parse_sections
+from profiler import RequestProfiler
+from json_provider import FastJSONProvider
+import schemas
+from schemas import SchemaError
+from tracing import tracer, traced
+from ratelimit import RateLimiter, parse_limit, parse_rules
+from suhang_index import Deadlines, SuhangIndex, parse_statuses
+from classes import DEFAULT_CLASS_ID, InvalidClassId, available_classes, load_roster, request_class_id
+import metrics
 
 _root_dir = os.path.dirname(os.path.abspath(__file__))
 _static_folder = os.path.join(_root_dir, 'src')
 
 app = Flask(__name__, static_folder=_static_folder, static_url_path='')
+# orjson이 있으면 orjson으로 인코딩 (없으면 표준 json)
+app.json = FastJSONProvider(app)
 app.config.from_object(Config)
+if Config.RATE_LIMIT_PROXY_HOPS:
+    # 프록시 뒤에서는 request.remote_addr가 X-Forwarded-For의 클라이언트 IP가 되도록
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.RATE_LIMIT_PROXY_HOPS)
+
+DB_PATH = Config.SQLITE_PATH
+
+# SQLite에 먼저 커밋한 쓰기를 Supabase로 비동기 반영하는 리플레이어
+outbox_replayer = OutboxReplayer(
+    DB_PATH, db_manager,
+    enabled=Config.OUTBOX_ENABLED,
+    batch_size=Config.OUTBOX_BATCH_SIZE,
+    interval=Config.OUTBOX_INTERVAL,
+    max_backoff=Config.OUTBOX_MAX_BACKOFF,
+    max_attempts=Config.OUTBOX_MAX_ATTEMPTS
+)
+metrics.register('outbox', outbox_replayer.stats)
+metrics.register('singleflight', db_manager.singleflight.stats)
+metrics.register('supabase_http', db_manager.http.stats)
+
+# 야자 통계 응답 캐시 (야자 기록이 바뀐 날짜를 포함하는 기간만 무효화)
+stats_cache = StatsCache(Config.STATS_CACHE_SIZE)
+metrics.register('stats_cache', stats_cache.stats)
+
+def invalidate_yaja_dates(touched):
+    """(class_id, date) 목록에 해당하는 통계 캐시를 지웁니다."""
+    by_class = {}
+    for class_id, date in touched:
+        by_class.setdefault(class_id, set()).add(date)
+    for class_id, dates in by_class.items():
+        stats_cache.invalidate(class_id, dates)
+
+# 클라이언트(세션 쿠키, 없으면 IP)·라우트별 토큰 버킷 요청 제한 (/api/*만)
+rate_limiter = RateLimiter(
+    parse_rules(Config.RATE_LIMITS),
+    default=parse_limit(Config.RATE_LIMIT_DEFAULT) if Config.RATE_LIMIT_DEFAULT else None,
+    shared_path=Config.RATE_LIMIT_SHARED_PATH or None,
+    enabled=Config.RATE_LIMIT_ENABLED
+)
+metrics.register('rate_limit', rate_limiter.stats)
+
+# 요청 로그: 요청 ID를 붙이고 /api 요청마다 한 줄 (성공은 표본만, 오류·느린 요청은 모두)
+access_logger = logging.getLogger('access')
+metrics.register('logging', log_pipeline.stats)
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+@app.before_request
+def begin_request_log():
+    request_id = request.headers.get('X-Request-ID', '')
+    if not _REQUEST_ID_PATTERN.match(request_id):
+        request_id = uuid.uuid4().hex[:16]
+    g.log_started = time.perf_counter()
+    g.log_token = logs.begin_request(
+        request_id=request_id,
+        method=request.method,
+        route=request.url_rule.rule if request.url_rule is not None else request.path
+    )
+
+@app.after_request
+def log_request(response):
+    context = logs.current()
+    if context is None:
+        return response
+    response.headers['X-Request-ID'] = context['request_id']
+    if not request.path.startswith('/api/'):
+        return response
+    duration = (time.perf_counter() - g.log_started) * 1000
+    status = response.status_code
+    # Supabase에 요청을 보냈으면 supabase, 아니면 로컬 SQLite에서 처리
+    logs.annotate(status=status, duration_ms=round(duration, 1),
+                  backend='supabase' if context.get('supabase_calls') else 'sqlite')
+    if status >= 500:
+        level = logging.ERROR
+    elif status >= 400 or duration >= Config.LOG_SLOW_MS:
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+    access_logger.log(level, '%s %s %d %.1fms', request.method, request.path, status, duration,
+                      extra={'sample': level == logging.INFO})
+    return response
+
+@app.teardown_request
+def end_request_log(error=None):
+    token = g.pop('log_token', None)
+    if token is not None:
+        logs.end_request(token)
+
+# 요청 추적: /api 요청마다 루트 span (요청 ID를 trace_id로)
+metrics.register('tracing', tracer.stats)
+
+@app.before_request
+def begin_trace():
+    if not request.path.startswith('/api/'):
+        return None
+    context = logs.current()
+    g.trace_span, g.trace_token = tracer.start_trace(
+        'request', context['request_id'] if context else uuid.uuid4().hex[:16],
+        method=request.method, route=request.url_rule.rule if request.url_rule is not None else request.path)
+    return None
+
+@app.after_request
+def record_trace_status(response):
+    span = g.get('trace_span')
+    if span is not None:
+        span.set(status=response.status_code)
+    return response
+
+@app.teardown_request
+def end_trace(error=None):
+    span = g.pop('trace_span', None)
+    if span is not None:
+        tracer.end(span, g.pop('trace_token', None), error)
+
+# 요청 프로파일러 (기본 꺼짐, 관리자 헤더 또는 표본 요청만)
+profiler = RequestProfiler(
+    Config.PROFILE_DIR,
+    enabled=Config.PROFILE_ENABLED,
+    sample_rate=Config.PROFILE_SAMPLE_RATE,
+    mode=Config.PROFILE_MODE,
+    interval_ms=Config.PROFILE_INTERVAL_MS,
+    keep=Config.PROFILE_KEEP
+)
+metrics.register('profiler', profiler.stats)
+
+def is_admin():
+    """X-Admin-Token이 ADMIN_TOKEN과 같으면 True (ADMIN_TOKEN이 비어 있으면 항상 False)."""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token, Config.ADMIN_TOKEN)
+
+@app.before_request
+def start_profile():
+    if not request.path.startswith('/api/'):
+        return None
+    if profiler.should_profile(request.headers.get('X-Profile') == '1' and is_admin()):
+        g.profile = profiler.start()
+    return None
+
+@app.after_request
+def record_profile_id(response):
+    profile = g.get('profile')
+    if profile is not None:
+        g.profile_status = response.status_code
+        response.headers['X-Profile-Id'] = profile.id
+    return response
+
+@app.teardown_request
+def finish_profile(error=None):
+    # after_request를 건너뛰는 처리되지 않은 예외에서도 샘플러 스레드·cProfile을 멈추고 저장
+    profile = g.pop('profile', None)
+    if profile is not None:
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        profiler.finish(profile, request.method, route, g.pop('profile_status', 500))
+
+@app.before_request
+def limit_request_rate():
+    if not rate_limiter.enabled or request.url_rule is None or not request.path.startswith('/api/'):
+        return None
+    # 학교 NAT·프록시 뒤에서는 한 반 전체가 같은 IP이므로 서명된 세션 쿠키의 id로 클라이언트를 구분
+    # (새 id는 IP 버킷을 거쳐서만 발급되므로 쿠키를 버려도 예산이 늘지 않음)
+    client_id = session.get('client_id')
+    if client_id:
+        retry_after = rate_limiter.check(f'session:{client_id}', request.url_rule.rule)
+    else:
+        session['client_id'] = secrets.token_urlsafe(12)
+        retry_after = rate_limiter.check(f'ip:{request.remote_addr}', request.url_rule.rule,
+                                         clients=Config.RATE_LIMIT_IP_CLIENTS)
+    if retry_after is not None:
+        return {'success': False, 'msg': '요청이 너무 많습니다. 잠시 후 다시 시도하세요.'}, 429, {'Retry-After': str(retry_after)}
+    return None
+
+# 재시도된 POST(야자 추가, 학특사 생성, 수행평가 추가)를 처음 응답으로 답하는 멱등 키 캐시
+idempotency_cache = IdempotencyCache(Config.IDEMPOTENCY_CACHE_SIZE, Config.IDEMPOTENCY_TTL)
+metrics.register('idempotency', idempotency_cache.stats)
+
+# 미리 파싱해 둔 급식 저장소 (/api/meal은 요청마다 CSV·NEIS 문자열을 파싱하지 않음)
+meal_store = MealStore(Config.MEAL_DB_PATH)
+metrics.register('meal_store', meal_store.stats)
+# 급식 영양소 (날짜 x 항목) 행렬, 저장소가 바뀌면 다음 조회 때 다시 만듦
+nutrition_matrix = meal_nutrition.NutritionMatrix(meal_store)
+metrics.register('meal_nutrition', nutrition_matrix.stats)
+# 학년도 전체 메뉴의 알레르기 비트마스크 인덱스
+allergen_index = AllergenIndex(meal_store)
+metrics.register('meal_allergens', allergen_index.stats)
+
+# 반별 수행평가 마감일 인덱스 (추가·삭제 API가 바로 고치고, 복제본 동기화로 바뀐 반은 다시 읽음)
+suhang_index = SuhangIndex(DB_PATH)
+metrics.register('suhang_index', suhang_index.stats)
+
+def invalidate_archived(touched):
+    """보관으로 옮겨진 날짜의 통계 캐시와 반별 수행평가 인덱스를 비웁니다."""
+    invalidate_yaja_dates(touched['yaja_students'])
+    suhang_index.invalidate({key[0] for key in touched['suhang']})
+
+# 지난 학기 야자 기록·수행평가를 옮겨 두는 보관 파일 (조회 범위가 보관 구간을 포함할 때만 함께 읽음)
+archive = Archive(
+    DB_PATH, Config.ARCHIVE_DB_PATH, outbox_replayer,
+    after_days=Config.ARCHIVE_AFTER_DAYS,
+    interval=Config.ARCHIVE_INTERVAL,
+    on_archived=invalidate_archived
+)
+metrics.register('archive', archive.stats)
+
+# users.db 온라인 백업 (BACKUP_INTERVAL이 0이면 python backup.py로만)
+db_backup = backup.from_config(DB_PATH)
+metrics.register('backup', db_backup.stats)
+
+# 읽기 API가 조회하는 SQLite 테이블을 Supabase와 맞추는 복제본
+read_replica = ReadReplica(
+    DB_PATH, db_manager, outbox_replayer,
+    enabled=Config.REPLICA_ENABLED,
+    interval=Config.REPLICA_INTERVAL,
+    max_staleness=Config.REPLICA_MAX_STALENESS,
+    reconcile_every=Config.REPLICA_RECONCILE_EVERY,
+    page_size=Config.REPLICA_PAGE_SIZE,
+    timeout=Config.SUPABASE_SYNC_TIMEOUT,
+    on_yaja_change=invalidate_yaja_dates,
+    on_suhang_change=suhang_index.invalidate,
+    archive=archive
+)
+metrics.register('replica', read_replica.stats)
 
 # DB 초기화 함수 (SQLite용 - 기존 호환성 유지)
 def init_db():
-    conn = sqlite3.connect('users.db')
+    conn = tracer.connect(DB_PATH)
     c = conn.cursor()
+    # 리플레이어와 요청 스레드가 동시에 쓰므로 WAL 모드 사용
+    c.execute('PRAGMA journal_mode=WAL')
     c.execute('''CREATE TABLE IF NOT EXISTS users (
         id TEXT PRIMARY KEY,
         name TEXT NOT NULL,
@@ -32,6 +290,7 @@ def init_db():
         student_code TEXT NOT NULL,
         student_number TEXT NOT NULL,
         reason TEXT NOT NULL,
+        class_id TEXT NOT NULL DEFAULT '1-5',
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )''')
     
@@ -43,6 +302,7 @@ def init_db():
         max_members INTEGER NOT NULL,
         creator_name TEXT NOT NULL,
         creator_code TEXT NOT NULL,
+        class_id TEXT NOT NULL DEFAULT '1-5',
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )''')
     
@@ -52,6 +312,7 @@ def init_db():
         hagteugsa_id INTEGER NOT NULL,
         member_name TEXT NOT NULL,
         member_code TEXT NOT NULL,
+        class_id TEXT NOT NULL DEFAULT '1-5',
         joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         FOREIGN KEY (hagteugsa_id) REFERENCES hagteugsa (id) ON DELETE CASCADE
     )''')
@@ -65,24 +326,70 @@ def init_db():
         description TEXT NOT NULL,
         creator_name TEXT NOT NULL,
         creator_code TEXT NOT NULL,
+        class_id TEXT NOT NULL DEFAULT '1-5',
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )''')
     
+    # 반(class_id) 컬럼이 없던 기존 DB는 컬럼을 추가하고 기존 행은 1-5반으로 둠
+    for table in ('yaja_students', 'hagteugsa', 'hagteugsa_members', 'suhang'):
+        columns = [row[1] for row in c.execute(f'PRAGMA table_info({table})')]
+        if 'class_id' not in columns:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN class_id TEXT NOT NULL DEFAULT '1-5'")
+    
+    # 반별 조회용 인덱스 (class_id 선두)
+    c.execute('CREATE INDEX IF NOT EXISTS idx_yaja_students_class_date ON yaja_students (class_id, date, period)')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_yaja_students_class_student_date
+                 ON yaja_students (class_id, student_code, date, period)''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_hagteugsa_class_created ON hagteugsa (class_id, created_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_hagteugsa_members_class_hagteugsa ON hagteugsa_members (class_id, hagteugsa_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_suhang_class_deadline ON suhang (class_id, deadline)')
+    
+    # Supabase 반영 대기열
+    init_outbox(c)
+    
+    # 같은 날·차시·학생의 야자 기록은 한 행만 (재시도로 생긴 기존 중복은 가장 먼저 들어온 행만 남기고 Supabase에서도 삭제)
+    c.execute('''SELECT id FROM yaja_students WHERE id NOT IN (
+                     SELECT MIN(id) FROM yaja_students GROUP BY class_id, date, period, student_code)''')
+    duplicate_ids = [row[0] for row in c.fetchall()]
+    for duplicate_id in duplicate_ids:
+        c.execute('DELETE FROM yaja_students WHERE id = ?', (duplicate_id,))
+        outbox_replayer.enqueue(c, 'yaja_students', 'delete', {'column': 'id', 'value': duplicate_id})
+    c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_yaja_students_natural_key
+                 ON yaja_students (class_id, date, period, student_code)''')
+    
     conn.commit()
     conn.close()
 
 init_db()
+archive.init()
+archive.start()
+db_backup.start()
+# 요청을 받기 전에 로컬 AUTOINCREMENT를 Supabase의 최대 id 뒤로 맞춤
+outbox_replayer.prepare()
+outbox_replayer.notify()
+# food_calender.csv가 바뀌었을 때만 다시 가져옴
+meal_store.init()
+try:
+    meal_store.ingest_csv(os.path.join(_static_folder, 'food_calender.csv'))
+except OSError:
+    pass
+if read_replica.is_active():
+    read_replica.start()
+
+# 잘못된 class_id는 400으로 응답
+@app.errorhandler(InvalidClassId)
+def handle_invalid_class_id(e):
+    return {'success': False, 'msg': str(e)}, 400
 
 # 회원가입 API
 @app.route('/api/signup', methods=['POST'])
 def signup():
-    data = request.json
-    user_id = data.get('id')
-    name = data.get('name')
-    pw = data.get('password')
-    if not user_id or not name or not pw:
-        return {'success': False, 'msg': '모든 항목을 입력하세요.'}, 400
-    conn = sqlite3.connect('users.db')
+    try:
+        data = schemas.SIGNUP.parse(request.get_json(silent=True))
+    except SchemaError as e:
+        return {'success': False, 'msg': str(e)}, 400
+    user_id, name, pw = data['id'], data['name'], data['password']
+    conn = tracer.connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT id FROM users WHERE id=?', (user_id,))
     if c.fetchone():
@@ -97,12 +404,12 @@ def signup():
 # 로그인 API
 @app.route('/api/login', methods=['POST'])
 def login():
-    data = request.json
-    user_id = data.get('id')
-    pw = data.get('password')
-    if not user_id or not pw:
-        return {'success': False, 'msg': '모든 항목을 입력하세요.'}, 400
-    conn = sqlite3.connect('users.db')
+    try:
+        data = schemas.LOGIN.parse(request.get_json(silent=True))
+    except SchemaError as e:
+        return {'success': False, 'msg': str(e)}, 400
+    user_id, pw = data['id'], data['password']
+    conn = tracer.connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT password, name FROM users WHERE id=?', (user_id,))
     row = c.fetchone()
@@ -111,209 +418,244 @@ def login():
         return {'success': False, 'msg': '아이디 또는 비밀번호가 올바르지 않습니다.'}, 401
     return {'success': True, 'name': row[1]}
 
-# 야자 학생 추가 API (Supabase 우선, 실패 시 SQLite)
+# 야자 학생 추가 API (SQLite에 커밋 후 아웃박스로 Supabase 반영)
 @app.route('/api/yaja/add', methods=['POST'])
+@idempotent(idempotency_cache)
 def add_yaja_student():
+    class_id = request_class_id()
     try:
-        data = request.json
-        date = data.get('date')
-        periods = data.get('periods')  # 배열
-        student_name = data.get('student_name')
-        student_code = data.get('student_code')
-        student_number = data.get('student_number')
-        reason = data.get('reason')
-        
-        if not all([date, periods, student_name, student_code, student_number, reason]):
-            return {'success': False, 'msg': '모든 필드를 입력하세요.'}, 400
-        
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.add_yaja_student(date, periods, student_name, student_code, student_number, reason)
-            if result['success']:
-                return result
+        try:
+            data = schemas.YAJA_ADD.parse(request.get_json(silent=True))
+        except SchemaError as e:
+            return {'success': False, 'msg': str(e)}, 400
+        date = data['date']
+        periods = data['periods']  # 정수 목록
+        student_name = data['student_name']
+        student_code = data['student_code']
+        student_number = data['student_number']
+        reason = data['reason']
         
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
         
-        # 각 차시별로 데이터 삽입
+        # 각 차시별로 데이터 삽입 (이미 등록된 날·차시·학생은 건너뜀)
+        added, duplicates = [], []
         for period in periods:
             c.execute('''INSERT INTO yaja_students 
-                         (date, period, student_name, student_code, student_number, reason)
-                         VALUES (?, ?, ?, ?, ?, ?)''',
-                      (date, period, student_name, student_code, student_number, reason))
+                         (date, period, student_name, student_code, student_number, reason, class_id)
+                         VALUES (?, ?, ?, ?, ?, ?, ?)
+                         ON CONFLICT (class_id, date, period, student_code) DO NOTHING''',
+                      (date, period, student_name, student_code, student_number, reason, class_id))
+            if c.rowcount == 0:
+                duplicates.append(period)
+                continue
+            added.append(period)
+            outbox_replayer.enqueue(c, 'yaja_students', 'upsert', {
+                'id': c.lastrowid,
+                'date': date,
+                'period': period,
+                'student_name': student_name,
+                'student_code': student_code,
+                'student_number': student_number,
+                'reason': reason,
+                'class_id': class_id
+            })
         
         conn.commit()
         conn.close()
+        if added:
+            outbox_replayer.notify()
+            stats_cache.invalidate(class_id, [date])
         
-        return {'success': True}
+        return {'success': True, 'added': added, 'duplicates': duplicates}
     except Exception as e:
         return {'success': False, 'msg': str(e)}, 500
 
-# 야자 학생 목록 조회 API (Supabase 우선, 실패 시 SQLite)
+def load_yaja_roster(class_id, date):
+    """반·날짜의 야자 불참 학생을 차시별({1: [...], 2: [...], 3: [...]})로 읽습니다."""
+    # 복제본을 쓰지 않을 때만 Supabase에 먼저 시도
+    if not read_replica.serves_reads() and db_manager.is_connected():
+        result = db_manager.get_yaja_students(date, class_id)
+        if result['success']:
+            return result['data']
+    
+    # SQLite(로컬 복제본)에서 조회
+    conn = tracer.connect(DB_PATH)
+    c = conn.cursor()
+    
+    c.execute('''SELECT id, period, student_name, student_code, student_number, reason
+                 FROM yaja_students WHERE class_id = ? AND date = ? ORDER BY period, student_name''',
+              (class_id, date))
+    
+    rows = c.fetchall()
+    conn.close()
+    # 보관된 날짜면 보관 파일에서 읽음
+    if archive.covers(date):
+        rows = sorted(rows + archive.yaja_rows(class_id, date), key=lambda row: (row[1], row[2]))
+    
+    # 차시별로 정리
+    students = {1: [], 2: [], 3: []}
+    for row in rows:
+        student_data = {
+            'id': row[0],
+            'name': row[2],
+            'code': row[3],
+            'studentNumber': row[4],
+            'reason': row[5]
+        }
+        students[row[1]].append(student_data)
+    
+    return students
+
+# 야자 학생 목록 조회 API (로컬 복제본 우선, 복제본을 쓰지 않으면 Supabase)
 @app.route('/api/yaja/list/<date>')
 def get_yaja_students(date):
+    class_id = request_class_id()
     try:
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.get_yaja_students(date)
-            if result['success']:
-                return result
-        
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
-        c = conn.cursor()
-        
-        c.execute('''SELECT id, period, student_name, student_code, student_number, reason
-                     FROM yaja_students WHERE date = ? ORDER BY period, student_name''', (date,))
-        
-        rows = c.fetchall()
-        conn.close()
-        
-        # 차시별로 정리
-        students = {1: [], 2: [], 3: []}
-        for row in rows:
-            student_data = {
-                'id': row[0],
-                'name': row[2],
-                'code': row[3],
-                'studentNumber': row[4],
-                'reason': row[5]
-            }
-            students[row[1]].append(student_data)
-        
-        return {'success': True, 'data': students}
+        return {'success': True, 'data': load_yaja_roster(class_id, date)}
     except Exception as e:
         return {'success': False, 'msg': str(e)}, 500
 
-# 야자 학생 삭제 API (Supabase 우선, 실패 시 SQLite)
+# 야자 학생 삭제 API (SQLite에 커밋 후 아웃박스로 Supabase 반영)
 @app.route('/api/yaja/delete/<int:student_id>', methods=['DELETE'])
 def delete_yaja_student(student_id):
+    class_id = request_class_id()
     try:
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.delete_yaja_student(student_id)
-            if result['success']:
-                return result
-        
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
         
-        c.execute('DELETE FROM yaja_students WHERE id = ?', (student_id,))
+        # 통계 캐시 무효화를 위해 삭제할 행의 날짜를 먼저 확인
+        c.execute('SELECT date FROM yaja_students WHERE id = ? AND class_id = ?', (student_id, class_id))
+        row = c.fetchone()
         
-        if c.rowcount == 0:
+        if row is None:
             conn.close()
+            # 지난 학기로 보관된 행이면 보관 파일과 요약에서 지우고 아웃박스로 Supabase 반영
+            archived = archive.delete('yaja_students', student_id, class_id)
+            if archived is not None:
+                stats_cache.invalidate(class_id, [archived['date']])
+                return {'success': True}
+            # 로컬에 없는 행은 아웃박스 도입 전 Supabase에만 기록된 행일 수 있음
+            if db_manager.is_connected():
+                result = db_manager.delete_yaja_student(student_id, class_id)
+                if result['success']:
+                    # 날짜를 알 수 없으므로 반 전체 무효화
+                    stats_cache.invalidate(class_id)
+                    return result
             return {'success': False, 'msg': '해당 학생을 찾을 수 없습니다.'}, 404
         
+        c.execute('DELETE FROM yaja_students WHERE id = ? AND class_id = ?', (student_id, class_id))
+        outbox_replayer.enqueue(c, 'yaja_students', 'delete', {'column': 'id', 'value': student_id})
         conn.commit()
         conn.close()
+        outbox_replayer.notify()
+        stats_cache.invalidate(class_id, [row[0]])
         
         return {'success': True}
     except Exception as e:
         return {'success': False, 'msg': str(e)}, 500
 
-# 야자 통계 API (새로 추가)
+def parse_date_arg(value, name):
+    """쿼리 파라미터의 날짜를 'YYYY-MM-DD'로 맞춥니다 ('2025-3-4'도 허용). 없으면 None, 잘못되면 ValueError."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        raise ValueError(f'{name}은(는) YYYY-MM-DD 형식이어야 합니다.')
+
+# 야자 통계 API (granularity=day,week,month 중 필요한 집계 단위, fields=필요한 섹션만 요청 가능,
+# format=columnar면 일별·학생별 표를 열 배열로 응답)
 @app.route('/api/yaja/statistics')
 def get_yaja_statistics():
+    class_id = request_class_id()
+    try:
+        granularity = parse_granularity(request.args.get('granularity'))
+        fields = parse_fields(request.args.get('fields'))
+        fmt = parse_format(request.args.get('format'))
+        # 캐시 키와 SQLite·보관 조회가 같은 'YYYY-MM-DD' 값을 쓰도록 한 번만 맞춤
+        start_date = parse_date_arg(request.args.get('start_date'), 'start_date')
+        end_date = parse_date_arg(request.args.get('end_date'), 'end_date')
+    except ValueError as e:
+        return {'success': False, 'msg': str(e)}, 400
     try:
-        # 쿼리 파라미터에서 날짜 범위 가져오기
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
         
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.get_yaja_statistics(start_date, end_date)
+        # 복제본을 쓰지 않을 때만 Supabase에 먼저 시도
+        if not read_replica.serves_reads() and db_manager.is_connected():
+            result = db_manager.get_yaja_statistics(start_date, end_date, class_id, granularity, fields,
+                                                    fmt == 'columnar')
             if result['success']:
                 return result
         
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        # 같은 반·기간·집계 단위의 결과가 캐시에 있으면 인코딩된 본문을 그대로 응답
+        cache_key = stats_cache.make_key(class_id, start_date, end_date, granularity, fields, fmt)
+        body = stats_cache.get(cache_key)
+        if body is not None:
+            return app.response_class(body, mimetype='application/json')
+        version = stats_cache.version(class_id)
+        
+        # SQLite(로컬 복제본)에서 조회
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
         query = '''SELECT date, period, reason, student_name 
-                   FROM yaja_students'''
-        params = []
+                   FROM yaja_students WHERE class_id = ?'''
+        params = [class_id]
         if start_date:
-            query += ' WHERE date >= ?'
+            query += ' AND date >= ?'
             params.append(start_date)
-            if end_date:
-                query += ' AND date <= ?'
-                params.append(end_date)
-        elif end_date:
-            query += ' WHERE date <= ?'
+        if end_date:
+            query += ' AND date <= ?'
             params.append(end_date)
         query += ' ORDER BY date, period'
         c.execute(query, params)
         rows = c.fetchall()
         conn.close()
+        # 기간이 보관 구간에 걸치면 날짜+학생 단위 요약을 합침
+        rollups = archive.yaja_rollups(class_id, start_date, end_date) if archive.covers(start_date) else ()
         
-        # 날짜+학생명 단위로 집계
-        stats = {
-            'total_absences': 0,  # 전체 불참(날짜+학생명) 카운트
-            'daily_stats': {},    # 날짜별 불참 학생 수
-            'weekly_stats': {},
-            'reason_stats': {},
-            'student_stats': {},  # 학생별 불참(날짜 단위) 카운트
-            'period_stats': {1: 0, 2: 0, 3: 0},
-            'student_details': {}
-        }
-        # (date, student_name) -> {'periods': set, 'reasons': [사유목록]}
-        day_student_map = {}
-        for row in rows:
-            date = row[0]
-            period = row[1]
-            reason = row[2]
-            student_name = row[3]
-            key = (date, student_name)
-            if key not in day_student_map:
-                day_student_map[key] = {'periods': set(), 'reasons': []}
-            day_student_map[key]['periods'].add(period)
-            day_student_map[key]['reasons'].append(reason)
-            # 차시별 통계(전체)
-            stats['period_stats'][period] += 1
-        # 날짜별 학생 집합, 학생별 날짜 집합, 사유 집계
-        daily_unique_students = {}
-        for (date, student_name), info in day_student_map.items():
-            # 날짜별 유니크 학생
-            if date not in daily_unique_students:
-                daily_unique_students[date] = set()
-            daily_unique_students[date].add(student_name)
-            # 학생별 날짜 카운트
-            if student_name not in stats['student_stats']:
-                stats['student_stats'][student_name] = 0
-            stats['student_stats'][student_name] += 1
-            # 학생별 상세 통계
-            if student_name not in stats['student_details']:
-                stats['student_details'][student_name] = {
-                    'total': 0,
-                    'periods': {1: 0, 2: 0, 3: 0},
-                    'reasons': {}
-                }
-            stats['student_details'][student_name]['total'] += 1
-            for p in info['periods']:
-                stats['student_details'][student_name]['periods'][p] += 1
-            # 대표 사유(가장 많이 나온 사유)
-            from collections import Counter
-            reason_counter = Counter(info['reasons'])
-            top_reason = reason_counter.most_common(1)[0][0] if reason_counter else '-'
-            if top_reason not in stats['student_details'][student_name]['reasons']:
-                stats['student_details'][student_name]['reasons'][top_reason] = 0
-            stats['student_details'][student_name]['reasons'][top_reason] += 1
-            # 전체 사유 통계
-            for r in set(info['reasons']):
-                if r not in stats['reason_stats']:
-                    stats['reason_stats'][r] = 0
-                stats['reason_stats'][r] += 1
-        # 일별 통계(불참 학생 수)
-        for date, students in daily_unique_students.items():
-            stats['daily_stats'][date] = len(students)
-        # 전체 불참(날짜+학생명) 카운트
-        stats['total_absences'] = sum(len(students) for students in daily_unique_students.values())
-        # 일평균 불참: 날짜별 유니크 학생 수의 합 / 날짜 수
-        stats['daily_unique_students'] = {d: list(s) for d, s in daily_unique_students.items()}
-        stats['unique_absence_sum'] = sum(len(s) for s in daily_unique_students.values())
-        stats['unique_absence_avg'] = round(stats['unique_absence_sum'] / len(daily_unique_students), 2) if daily_unique_students else 0
-        return {'success': True, 'data': stats}
+        stats = build_yaja_statistics(rows, granularity, rollups, fields, fmt == 'columnar')
+        body = app.json.dumps({'success': True, 'data': stats}) + '\n'
+        stats_cache.put(cache_key, body, version)
+        return app.response_class(body, mimetype='application/json')
+    except Exception as e:
+        return {'success': False, 'msg': str(e)}, 500
+
+# 학생별 야자 기록 API (반 전체 통계 없이 학생 인덱스 범위 조회만)
+@app.route('/api/yaja/student/<student_code>')
+def get_yaja_student_history(student_code):
+    class_id = request_class_id()
+    try:
+        start_date = parse_date_arg(request.args.get('start') or request.args.get('start_date'), 'start')
+        end_date = parse_date_arg(request.args.get('end') or request.args.get('end_date'), 'end')
+    except ValueError as e:
+        return {'success': False, 'msg': str(e)}, 400
+    try:
+        # 복제본을 쓰지 않을 때만 Supabase에 먼저 시도
+        if not read_replica.serves_reads() and db_manager.is_connected():
+            result = db_manager.get_yaja_student_history(student_code, start_date, end_date, class_id)
+            if result['success']:
+                return result
+        
+        # SQLite(로컬 복제본)에서 (class_id, student_code, date) 인덱스로 조회
+        conn = tracer.connect(DB_PATH)
+        c = conn.cursor()
+        query = '''SELECT date, period, reason, student_name, student_number
+                   FROM yaja_students WHERE class_id = ? AND student_code = ?'''
+        params = [class_id, student_code]
+        if start_date:
+            query += ' AND date >= ?'
+            params.append(start_date)
+        if end_date:
+            query += ' AND date <= ?'
+            params.append(end_date)
+        c.execute(query + ' ORDER BY date, period', params)
+        rows = c.fetchall()
+        conn.close()
+        # 기간이 보관 구간에 걸치면 보관된 기록을 앞에 붙임
+        if archive.covers(start_date):
+            rows = archive.yaja_student_rows(class_id, student_code, start_date, end_date) + rows
+        
+        return {'success': True, 'data': build_student_history(rows)}
     except Exception as e:
         return {'success': False, 'msg': str(e)}, 500
 
@@ -321,33 +663,48 @@ def get_yaja_statistics():
 
 # 학특사 생성 API
 @app.route('/api/hagteugsa/create', methods=['POST'])
+@idempotent(idempotency_cache)
 def create_hagteugsa():
+    class_id = request_class_id()
     try:
-        data = request.json
-        title = data.get('title')
-        description = data.get('description')
-        max_members = data.get('max_members')
-        creator_name = data.get('creator_name')
-        creator_code = data.get('creator_code')
-        if not all([title, description, max_members, creator_name, creator_code]):
-            return {'success': False, 'msg': '모든 필드를 입력하세요.'}, 400
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.create_hagteugsa(title, description, max_members, creator_name, creator_code)
-            if result['success']:
-                return result
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        try:
+            data = schemas.HAGTEUGSA_CREATE.parse(request.get_json(silent=True))
+        except SchemaError as e:
+            return {'success': False, 'msg': str(e)}, 400
+        title = data['title']
+        description = data['description']
+        max_members = data['max_members']
+        creator_name = data['creator_name']
+        creator_code = data['creator_code']
+        # SQLite에 커밋 후 아웃박스로 Supabase 반영
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
-        c.execute('''INSERT INTO hagteugsa (title, description, max_members, creator_name, creator_code)
-                     VALUES (?, ?, ?, ?, ?)''',
-                  (title, description, max_members, creator_name, creator_code))
+        c.execute('''INSERT INTO hagteugsa (title, description, max_members, creator_name, creator_code, class_id)
+                     VALUES (?, ?, ?, ?, ?, ?)''',
+                  (title, description, max_members, creator_name, creator_code, class_id))
         hagteugsa_id = c.lastrowid
-        c.execute('''INSERT INTO hagteugsa_members (hagteugsa_id, member_name, member_code)
-                     VALUES (?, ?, ?)''',
-                  (hagteugsa_id, creator_name, creator_code))
+        outbox_replayer.enqueue(c, 'hagteugsa', 'upsert', {
+            'id': hagteugsa_id,
+            'title': title,
+            'description': description,
+            'max_members': max_members,
+            'creator_name': creator_name,
+            'creator_code': creator_code,
+            'class_id': class_id
+        })
+        c.execute('''INSERT INTO hagteugsa_members (hagteugsa_id, member_name, member_code, class_id)
+                     VALUES (?, ?, ?, ?)''',
+                  (hagteugsa_id, creator_name, creator_code, class_id))
+        outbox_replayer.enqueue(c, 'hagteugsa_members', 'upsert', {
+            'id': c.lastrowid,
+            'hagteugsa_id': hagteugsa_id,
+            'member_name': creator_name,
+            'member_code': creator_code,
+            'class_id': class_id
+        })
         conn.commit()
         conn.close()
+        outbox_replayer.notify()
         return {'success': True, 'id': hagteugsa_id}
     except Exception as e:
         return {'success': False, 'msg': str(e)}, 500
@@ -355,26 +712,27 @@ def create_hagteugsa():
 # 학특사 목록 조회 API
 @app.route('/api/hagteugsa/list')
 def get_hagteugsa_list():
+    class_id = request_class_id()
     try:
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.get_hagteugsa_list()
+        # 복제본을 쓰지 않을 때만 Supabase에 먼저 시도
+        if not read_replica.serves_reads() and db_manager.is_connected():
+            result = db_manager.get_hagteugsa_list(class_id)
             if result['success']:
                 return result
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        # SQLite(로컬 복제본)에서 조회
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
         c.execute('''SELECT h.id, h.title, h.description, h.max_members, h.creator_name,
-                            COUNT(hm.id) as current_members
+                            (SELECT COUNT(*) FROM hagteugsa_members hm
+                             WHERE hm.class_id = h.class_id AND hm.hagteugsa_id = h.id) as current_members
                      FROM hagteugsa h
-                     LEFT JOIN hagteugsa_members hm ON h.id = hm.hagteugsa_id
-                     GROUP BY h.id
-                     ORDER BY h.created_at DESC''')
+                     WHERE h.class_id = ?
+                     ORDER BY h.created_at DESC''', (class_id,))
         rows = c.fetchall()
         hagteugsa_list = []
         for row in rows:
             c.execute('''SELECT member_name FROM hagteugsa_members 
-                         WHERE hagteugsa_id = ? ORDER BY joined_at''', (row[0],))
+                         WHERE class_id = ? AND hagteugsa_id = ? ORDER BY joined_at''', (class_id, row[0]))
             members = [member[0] for member in c.fetchall()]
             hagteugsa_list.append({
                 'id': row[0],
@@ -393,41 +751,52 @@ def get_hagteugsa_list():
 # 학특사 참여 API
 @app.route('/api/hagteugsa/join', methods=['POST'])
 def join_hagteugsa():
+    class_id = request_class_id()
     try:
-        data = request.json
-        hagteugsa_id = data.get('hagteugsa_id')
-        member_name = data.get('member_name')
-        member_code = data.get('member_code')
-        if not all([hagteugsa_id, member_name, member_code]):
-            return {'success': False, 'msg': '모든 필드를 입력하세요.'}, 400
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.join_hagteugsa(hagteugsa_id, member_name, member_code)
-            if result['success']:
-                return result
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        try:
+            data = schemas.HAGTEUGSA_JOIN.parse(request.get_json(silent=True))
+        except SchemaError as e:
+            return {'success': False, 'msg': str(e)}, 400
+        hagteugsa_id = data['hagteugsa_id']
+        member_name = data['member_name']
+        member_code = data['member_code']
+        # SQLite에 커밋 후 아웃박스로 Supabase 반영
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
-        c.execute('SELECT max_members FROM hagteugsa WHERE id = ?', (hagteugsa_id,))
+        c.execute('SELECT max_members FROM hagteugsa WHERE id = ? AND class_id = ?', (hagteugsa_id, class_id))
         hagteugsa = c.fetchone()
         if not hagteugsa:
             conn.close()
+            # 로컬에 없는 학특사는 아웃박스 도입 전 Supabase에만 기록된 것일 수 있음
+            if db_manager.is_connected():
+                result = db_manager.join_hagteugsa(hagteugsa_id, member_name, member_code, class_id)
+                if result['success']:
+                    return result
             return {'success': False, 'msg': '존재하지 않는 학특사입니다.'}, 404
-        c.execute('SELECT COUNT(*) FROM hagteugsa_members WHERE hagteugsa_id = ?', (hagteugsa_id,))
+        c.execute('SELECT COUNT(*) FROM hagteugsa_members WHERE class_id = ? AND hagteugsa_id = ?',
+                  (class_id, hagteugsa_id))
         current_count = c.fetchone()[0]
         if current_count >= hagteugsa[0]:
             conn.close()
             return {'success': False, 'msg': '모집이 마감되었습니다!'}, 400
-        c.execute('SELECT id FROM hagteugsa_members WHERE hagteugsa_id = ? AND member_name = ?', 
-                  (hagteugsa_id, member_name))
+        c.execute('SELECT id FROM hagteugsa_members WHERE class_id = ? AND hagteugsa_id = ? AND member_name = ?', 
+                  (class_id, hagteugsa_id, member_name))
         if c.fetchone():
             conn.close()
             return {'success': False, 'msg': '이미 참여하셨습니다!'}, 400
-        c.execute('''INSERT INTO hagteugsa_members (hagteugsa_id, member_name, member_code)
-                     VALUES (?, ?, ?)''',
-                  (hagteugsa_id, member_name, member_code))
+        c.execute('''INSERT INTO hagteugsa_members (hagteugsa_id, member_name, member_code, class_id)
+                     VALUES (?, ?, ?, ?)''',
+                  (hagteugsa_id, member_name, member_code, class_id))
+        outbox_replayer.enqueue(c, 'hagteugsa_members', 'upsert', {
+            'id': c.lastrowid,
+            'hagteugsa_id': hagteugsa_id,
+            'member_name': member_name,
+            'member_code': member_code,
+            'class_id': class_id
+        })
         conn.commit()
         conn.close()
+        outbox_replayer.notify()
         return {'success': True}
     except Exception as e:
         return {'success': False, 'msg': str(e)}, 500
@@ -435,22 +804,26 @@ def join_hagteugsa():
 # 학특사 삭제 API
 @app.route('/api/hagteugsa/delete/<int:hagteugsa_id>', methods=['DELETE'])
 def delete_hagteugsa(hagteugsa_id):
+    class_id = request_class_id()
     try:
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.delete_hagteugsa(hagteugsa_id)
-            if result['success']:
-                return result
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        # SQLite에 커밋 후 아웃박스로 Supabase 반영
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
-        c.execute('DELETE FROM hagteugsa_members WHERE hagteugsa_id = ?', (hagteugsa_id,))
-        c.execute('DELETE FROM hagteugsa WHERE id = ?', (hagteugsa_id,))
+        c.execute('DELETE FROM hagteugsa WHERE id = ? AND class_id = ?', (hagteugsa_id, class_id))
         if c.rowcount == 0:
             conn.close()
+            # 로컬에 없는 학특사는 아웃박스 도입 전 Supabase에만 기록된 것일 수 있음
+            if db_manager.is_connected():
+                result = db_manager.delete_hagteugsa(hagteugsa_id, class_id)
+                if result['success']:
+                    return result
             return {'success': False, 'msg': '해당 학특사를 찾을 수 없습니다.'}, 404
+        c.execute('DELETE FROM hagteugsa_members WHERE class_id = ? AND hagteugsa_id = ?', (class_id, hagteugsa_id))
+        outbox_replayer.enqueue(c, 'hagteugsa_members', 'delete', {'column': 'hagteugsa_id', 'value': hagteugsa_id})
+        outbox_replayer.enqueue(c, 'hagteugsa', 'delete', {'column': 'id', 'value': hagteugsa_id})
         conn.commit()
         conn.close()
+        outbox_replayer.notify()
         return {'success': True}
     except Exception as e:
         return {'success': False, 'msg': str(e)}, 500
@@ -460,6 +833,7 @@ def index():
     return app.send_static_file('index.html')
 
 # CSV 파일을 사용하는 fallback 함수
+@traced('meal.csv')
 def fallback_csv_meal_data():
     try:
         # CSV 파일 경로
@@ -495,15 +869,7 @@ def fallback_csv_meal_data():
             if not day_data.empty:
                 row = day_data.iloc[0]
                 # 메뉴 처리 (HTML 태그 제거 및 알레르기 정보 제거)
-                menu_raw = str(row['요리명'])
-                menu_items = []
-                for item in menu_raw.replace('<br/>', '\n').split('\n'):
-                    if item.strip():
-                        # 괄호 안의 숫자(알레르기 정보) 제거
-                        import re
-                        clean_item = re.sub(r'\s*\([0-9.,\s]+\)', '', item.strip())
-                        if clean_item:
-                            menu_items.append(clean_item)
+                menu_items = parse_menu_items(str(row['요리명']))
                 
                 # 칼로리 정보 처리
                 calories_raw = str(row['칼로리정보']) if pd.notna(row['칼로리정보']) else ''
@@ -534,145 +900,184 @@ def fallback_csv_meal_data():
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
-# 급식 데이터 처리 함수 (NEIS API 사용)
-def process_meal_data():
+# 저장소의 급식을 요일별 응답 형식으로 변환 (exclude_mask가 있으면 해당 알레르기 메뉴를 따로 표시)
+def build_week_meals(week_start, today, meals, empty_message='급식 정보가 없습니다.', exclude_mask=0):
+    by_date = {meal['date']: meal for meal in meals}
+    weekdays = ['월', '화', '수', '목', '금']
+    meal_list = []
+    for i, day in enumerate(weekdays):
+        day_date = week_start + timedelta(days=i)
+        meal = by_date.get(day_date.isoformat())
+        if meal and meal['dishes']:
+            calories = meal['calories']
+            item = {
+                'day': day,
+                'date': day_date.strftime('%m/%d'),
+                'menu': [dish['name'] for dish in meal['dishes'] if not dish['allergen_mask'] & exclude_mask],
+                'calories': f'{calories:.1f} Kcal' if calories is not None else '칼로리 정보 없음',
+                'isToday': day_date == today
+            }
+            if exclude_mask:
+                item['excludedMenu'] = [dish['name'] for dish in meal['dishes'] if dish['allergen_mask'] & exclude_mask]
+                item['safe'] = not meal['allergen_mask'] & exclude_mask
+            meal_list.append(item)
+        else:
+            meal_list.append({
+                'day': day,
+                'date': day_date.strftime('%m/%d'),
+                'menu': [empty_message],
+                'calories': '',
+                'isToday': day_date == today
+            })
+    return meal_list
+
+# 급식 데이터 처리 함수 (미리 가져온 급식 저장소 사용)
+@traced('meal.process')
+def process_meal_data(target_date=None, exclude=()):
     try:
-        import requests
-        from urllib.parse import quote
+        today = datetime.now().date()
+        target_date = target_date or today
+        # 이번 주(또는 target_date가 속한 주) 월~금
+        week_start = target_date - timedelta(days=target_date.weekday())
+        week_end = week_start + timedelta(days=4)
         
-        # 나이스 API 설정 (대전대신고등학교)
-        # API 키를 여기에 입력하세요 - https://open.neis.go.kr/portal/myPage/actKeyPage.do 에서 발급
-        api_key = "99fa174825f445738a1daa51aa2ccefb"  # 실제 API 키로 교체 필요
+        meals = meal_store.get_meals(week_start, week_end)
+        empty_message = '급식 정보가 없습니다.'
         
-        # API 키가 설정되지 않은 경우에만 CSV 파일 사용
-        if api_key == "99fa174825f445738a1daa51aa2ccefb" or not api_key:
-            return fallback_csv_meal_data()
-            
-        base_url = "https://open.neis.go.kr/hub/mealServiceDietInfo"
-        
-        # 현재 날짜 기준으로 이번 주 데이터 
-        today = datetime.now()
-        week_start = today - timedelta(days=today.weekday())
-        
-        # 요일별 데이터 정리
-        weekdays = ['월', '화', '수', '목', '금']
-        meal_list = []
-        
-        for i, day in enumerate(weekdays):
-            day_date = week_start + timedelta(days=i)
-            
-            # API 파라미터
-            params = {
-                'Key': api_key,
-                'Type': 'json',
-                'pIndex': 1,
-                'pSize': 100,
-                'ATPT_OFCDC_SC_CODE': 'G10',  # 대전광역시교육청
-                'SD_SCHUL_CODE': '7430048',    # 대전대신고등학교
-                'MLSV_YMD': day_date.strftime('%Y%m%d'),
-                'MMEAL_SC_CODE': '2'  # 중식
-            }
-            
+        # 저장소에 없는 주는 NEIS 키가 있을 때 그 주만 가져와 저장
+        # (학년도 전체는 python meal_store.py neis --year YYYY 로 미리 가져옴)
+        if not meals and Config.NEIS_API_KEY:
             try:
-                response = requests.get(base_url, params=params, timeout=5)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if 'mealServiceDietInfo' in data and len(data['mealServiceDietInfo']) > 1:
-                        meal_info = data['mealServiceDietInfo'][1]['row'][0]
-                        
-                        # 메뉴 처리 (알레르기 정보 제거)
-                        menu_raw = meal_info.get('DDISH_NM', '')
-                        menu_items = []
-                        
-                        for item in menu_raw.replace('<br/>', '\n').split('\n'):
-                            if item.strip():
-                                import re
-                                # 괄호 안의 숫자(알레르기 정보) 제거
-                                clean_item = re.sub(r'\s*\([0-9.,\s]+\)', '', item.strip())
-                                if clean_item:
-                                    menu_items.append(clean_item)
-                        
-                        # 칼로리 정보
-                        calories = meal_info.get('CAL_INFO', '칼로리 정보 없음')
-                        
-                        meal_list.append({
-                            'day': day,
-                            'date': day_date.strftime('%m/%d'),
-                            'menu': menu_items,
-                            'calories': calories,
-                            'isToday': day_date.date() == today.date()
-                        })
-                    else:
-                        # API에서 데이터를 찾을 수 없는 경우
-                        meal_list.append({
-                            'day': day,
-                            'date': day_date.strftime('%m/%d'),
-                            'menu': ['급식 정보가 없습니다.'],
-                            'calories': '',
-                            'isToday': day_date.date() == today.date()
-                        })
-                else:
-                    # API 요청 실패
-                    meal_list.append({
-                        'day': day,
-                        'date': day_date.strftime('%m/%d'),
-                        'menu': ['급식 정보를 가져올 수 없습니다.'],
-                        'calories': '',
-                        'isToday': day_date.date() == today.date()
-                    })
-            except requests.RequestException:
-                # 네트워크 오류
-                meal_list.append({
-                    'day': day,
-                    'date': day_date.strftime('%m/%d'),
-                    'menu': ['네트워크 오류로 급식 정보를 가져올 수 없습니다.'],
-                    'calories': '',
-                    'isToday': day_date.date() == today.date()
-                })
+                records = fetch_neis_records(Config.NEIS_API_KEY, week_start, week_end)
+                meal_store.ingest(records, f'neis:{week_start.isoformat()}~{week_end.isoformat()}')
+                meals = meal_store.get_meals(week_start, week_end)
+            except Exception:
+                empty_message = '급식 정보를 가져올 수 없습니다.'
         
-        return {'success': True, 'data': meal_list}
+        data = build_week_meals(week_start, today, meals, empty_message, allergen_mask(exclude))
+        result = {'success': True, 'data': data}
+        if exclude:
+            result['excluded'] = describe_allergens(exclude)
+        return result
     
+    except sqlite3.Error:
+        # 저장소를 읽을 수 없으면 CSV 직접 파싱
+        return fallback_csv_meal_data()
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 # 급식 데이터 API 엔드포인트
+# date=YYYY-MM-DD 이면 그 날짜가 속한 주, exclude=5,6 이면 해당 알레르기 메뉴를 menu에서 빼고 excludedMenu로 표시
 @app.route('/api/meal')
 def get_meal_data():
-    result = process_meal_data()
+    target_date = None
+    try:
+        if request.args.get('date'):
+            target_date = datetime.strptime(request.args['date'], '%Y-%m-%d').date()
+        exclude = parse_allergen_codes(request.args.get('exclude'))
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+    result = process_meal_data(target_date, exclude)
     return jsonify(result)
 
-# 학특사 목록 조회 API (Supabase 우선, 실패 시 SQLite)
-@app.route('/api/hagteugsa/list', methods=['GET'])
+# 알레르기 안전한 날 조회 API (allergens=5,6 필수, month=YYYY-MM 또는 start_date/end_date, 없으면 전체 기간)
+@app.route('/api/meal/safe-days')
+def get_meal_safe_days():
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    try:
+        codes = parse_allergen_codes(request.args.get('allergens'))
+        if not codes:
+            raise ValueError('allergens에 알레르기 번호를 입력하세요.')
+        month = request.args.get('month')
+        if month:
+            first = datetime.strptime(month, '%Y-%m').date()
+            start_date = first.isoformat()
+            end_date = ((first + timedelta(days=31)).replace(day=1) - timedelta(days=1)).isoformat()
+        # np.datetime64는 '2025-3-4'를 받지 않으므로 맞춘 값을 넘김
+        start_date = parse_date_arg(start_date, 'start_date')
+        end_date = parse_date_arg(end_date, 'end_date')
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+    try:
+        return {'success': True, 'data': allergen_index.safe_days(codes, start_date, end_date)}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}, 500
+
+# 급식 영양 분석 API (granularity=week|month|semester, outlier_z=이상치 기준)
+@app.route('/api/meal/nutrition')
+def get_meal_nutrition():
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    try:
+        granularity = meal_nutrition.parse_granularity(request.args.get('granularity'))
+        outlier_z = float(request.args.get('outlier_z', meal_nutrition.DEFAULT_OUTLIER_Z))
+        # np.datetime64는 '2025-3-4'를 받지 않으므로 맞춘 값을 넘김
+        start_date = parse_date_arg(start_date, 'start_date')
+        end_date = parse_date_arg(end_date, 'end_date')
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+    try:
+        data = nutrition_matrix.summarize(start_date, end_date, granularity, outlier_z)
+        return {'success': True, 'data': data}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}, 500
+
+# 수행평가 목록 조회 (복제본을 쓰지 않으면 Supabase, 아니면 마감일 인덱스)
+def query_suhang(class_id, func):
+    if not read_replica.serves_reads() and db_manager.is_connected():
+        result = db_manager.get_suhang_list(class_id)
+        if result['success']:
+            return func(Deadlines(result['data']))
+    return suhang_index.query(class_id, func)
+
+# 수행평가 목록 조회 API
+# 항목마다 서버 날짜 기준 status(urgent/scheduled/done)와 days_left를 포함하며 마감일 순으로 정렬됩니다.
+# status=urgent,scheduled,done 처럼 지정하면 해당 상태만 urgent -> scheduled -> done(최근 마감 순) 순서로 반환합니다.
+@app.route('/api/suhang/list', methods=['GET'])
 def get_suhang_list():
+    class_id = request_class_id()
+    statuses = None
+    if request.args.get('status'):
+        try:
+            statuses = parse_statuses(request.args['status'])
+        except ValueError as e:
+            return {'success': False, 'msg': str(e)}, 400
     try:
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.get_suhang_list()
-            if result['success']:
-                return jsonify(result)
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
-        c = conn.cursor()
-        c.execute('''SELECT id, subject, title, deadline, description, creator_name, creator_code, created_at 
-                     FROM suhang ORDER BY deadline ASC''')
-        suhang_list = []
-        for row in c.fetchall():
-            suhang_list.append({
-                'id': row[0],
-                'subject': row[1],
-                'title': row[2],
-                'deadline': row[3],
-                'description': row[4],
-                'creator_name': row[5],
-                'creator_code': row[6],
-                'created_at': row[7]
-            })
-        conn.close()
+        today = datetime.now().date()
+        if statuses:
+            suhang_list = query_suhang(class_id, lambda deadlines: deadlines.by_status(statuses, today))
+        else:
+            suhang_list = query_suhang(class_id, lambda deadlines: deadlines.in_order(today))
         return jsonify({
             'success': True,
-            'data': suhang_list
+            'data': suhang_list,
+            'today': today.isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'msg': str(e)
+        })
+
+# 마감 임박 수행평가 API (오늘부터 days일 뒤까지, 기본 7일)
+@app.route('/api/suhang/upcoming', methods=['GET'])
+def get_suhang_upcoming():
+    class_id = request_class_id()
+    try:
+        days = int(request.args.get('days', 7))
+        if not 0 <= days <= 366:
+            raise ValueError
+    except ValueError:
+        return {'success': False, 'msg': 'days는 0~366 사이의 정수입니다.'}, 400
+    try:
+        today = datetime.now().date()
+        suhang_list = query_suhang(class_id, lambda deadlines: deadlines.upcoming(days, today))
+        return jsonify({
+            'success': True,
+            'data': suhang_list,
+            'today': today.isoformat(),
+            'days': days
         })
     except Exception as e:
         return jsonify({
@@ -682,68 +1087,98 @@ def get_suhang_list():
 
 # 수행평가 추가 API
 @app.route('/api/suhang/add', methods=['POST'])
+@idempotent(idempotency_cache)
 def add_suhang():
+    class_id = request_class_id()
     try:
-        data = request.json
-        subject = data.get('subject')
-        title = data.get('title')
-        deadline = data.get('deadline')
-        description = data.get('description')
-        creator_name = data.get('creator_name')
-        creator_code = data.get('creator_code')
-        if not all([subject, title, deadline, description, creator_name, creator_code]):
-            return jsonify({
-                'success': False,
-                'msg': '모든 필드를 입력해주세요.'
-            })
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.add_suhang(subject, title, deadline, description, creator_name, creator_code)
-            if result['success']:
-                return jsonify(result)
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        try:
+            data = schemas.SUHANG_ADD.parse(request.get_json(silent=True))
+        except SchemaError as e:
+            return {'success': False, 'msg': str(e)}, 400
+        subject = data['subject']
+        title = data['title']
+        deadline = data['deadline']
+        description = data['description']
+        creator_name = data['creator_name']
+        creator_code = data['creator_code']
+        # SQLite에 커밋 후 아웃박스로 Supabase 반영
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
-        c.execute('''INSERT INTO suhang (subject, title, deadline, description, creator_name, creator_code)
-                     VALUES (?, ?, ?, ?, ?, ?)''',
-                  (subject, title, deadline, description, creator_name, creator_code))
+        c.execute('''INSERT INTO suhang (subject, title, deadline, description, creator_name, creator_code, class_id)
+                     VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                  (subject, title, deadline, description, creator_name, creator_code, class_id))
+        suhang_id = c.lastrowid
+        outbox_replayer.enqueue(c, 'suhang', 'upsert', {
+            'id': suhang_id,
+            'subject': subject,
+            'title': title,
+            'deadline': deadline,
+            'description': description,
+            'creator_name': creator_name,
+            'creator_code': creator_code,
+            'class_id': class_id
+        })
+        c.execute('SELECT created_at FROM suhang WHERE id = ?', (suhang_id,))
+        created_at = c.fetchone()[0]
         conn.commit()
         conn.close()
+        outbox_replayer.notify()
+        suhang_index.add(class_id, {
+            'id': suhang_id,
+            'subject': subject,
+            'title': title,
+            'deadline': deadline,
+            'description': description,
+            'creator_name': creator_name,
+            'creator_code': creator_code,
+            'created_at': created_at
+        })
         return jsonify({
             'success': True,
             'msg': '수행평가가 성공적으로 추가되었습니다.'
         })
     except Exception as e:
+        # 5xx는 멱등 키 캐시에 남지 않으므로 같은 키로 재시도할 수 있음
         return jsonify({
             'success': False,
             'msg': str(e)
-        })
+        }), 500
 
 # 수행평가 삭제 API
 @app.route('/api/suhang/delete/<int:suhang_id>', methods=['DELETE'])
 def delete_suhang(suhang_id):
+    class_id = request_class_id()
     try:
-        # Supabase에 먼저 시도
-        if db_manager.is_connected():
-            result = db_manager.delete_suhang(suhang_id)
-            if result['success']:
-                return jsonify(result)
-        # Supabase 실패 시 SQLite 사용
-        conn = sqlite3.connect('users.db')
+        # SQLite에 커밋 후 아웃박스로 Supabase 반영
+        conn = tracer.connect(DB_PATH)
         c = conn.cursor()
         # 수행평가 존재 확인
-        c.execute('SELECT creator_name, creator_code FROM suhang WHERE id = ?', (suhang_id,))
+        c.execute('SELECT creator_name, creator_code FROM suhang WHERE id = ? AND class_id = ?', (suhang_id, class_id))
         suhang = c.fetchone()
         if not suhang:
             conn.close()
+            # 마감이 지나 보관된 수행평가면 보관 파일에서 지우고 아웃박스로 Supabase 반영
+            if archive.delete('suhang', suhang_id, class_id) is not None:
+                return jsonify({
+                    'success': True,
+                    'msg': '수행평가가 성공적으로 삭제되었습니다.'
+                })
+            # 로컬에 없는 행은 아웃박스 도입 전 Supabase에만 기록된 행일 수 있음
+            if db_manager.is_connected():
+                result = db_manager.delete_suhang(suhang_id, class_id)
+                if result['success']:
+                    return jsonify(result)
             return jsonify({
                 'success': False,
                 'msg': '해당 수행평가를 찾을 수 없습니다.'
             })
         # 수행평가 삭제
         c.execute('DELETE FROM suhang WHERE id = ?', (suhang_id,))
+        outbox_replayer.enqueue(c, 'suhang', 'delete', {'column': 'id', 'value': suhang_id})
         conn.commit()
         conn.close()
+        outbox_replayer.notify()
+        suhang_index.remove(class_id, suhang_id)
         return jsonify({
             'success': True,
             'msg': '수행평가가 성공적으로 삭제되었습니다.'
@@ -754,6 +1189,158 @@ def delete_suhang(suhang_id):
             'msg': str(e)
         })
 
+# 첫 화면 대시보드 섹션 (반 -> 딕셔너리, 대시보드 스레드에서 동시에 실행)
+DASHBOARD_SUHANG_DAYS = 7
+
+def seconds_until_midnight():
+    now = datetime.now()
+    return int((datetime.combine(now.date() + timedelta(days=1), datetime.min.time()) - now).total_seconds())
+
+@traced('meal.today')
+def load_today_meal(class_id):
+    today = datetime.now().date()
+    result = process_meal_data(today)
+    if not result.get('success'):
+        return {'error': result.get('error', '급식 정보를 가져올 수 없습니다.')}
+    meal = next((item for item in result['data'] if item['isToday']), None)
+    # 주말에는 오늘 항목이 없음
+    return {'date': today.isoformat(), 'menu': meal['menu'] if meal else [], 'calories': meal['calories'] if meal else ''}
+
+def load_today_yaja(class_id):
+    today = datetime.now().date().isoformat()
+    roster = load_yaja_roster(class_id, today)
+    return {'date': today, 'periods': roster, 'count': len({s['code'] for students in roster.values() for s in students})}
+
+def load_upcoming_suhang(class_id):
+    today = datetime.now().date()
+    items = query_suhang(class_id, lambda deadlines: deadlines.upcoming(DASHBOARD_SUHANG_DAYS, today))
+    return {
+        'days': DASHBOARD_SUHANG_DAYS,
+        'items': [{key: item[key] for key in ('id', 'subject', 'title', 'deadline', 'status', 'days_left')} for item in items]
+    }
+
+def summarize_hagteugsa(rows):
+    items = [{'id': hid, 'title': title, 'max_members': max_members, 'current_members': current,
+              'open': current < max_members} for hid, title, max_members, current in rows]
+    return {
+        'count': len(items),
+        'open': sum(item['open'] for item in items),
+        'members': sum(item['current_members'] for item in items),
+        'capacity': sum(item['max_members'] for item in items),
+        'items': items
+    }
+
+def load_hagteugsa_capacity(class_id):
+    """학특사별 인원/정원과 전체 요약 (설명·참여자 이름은 제외)."""
+    if not read_replica.serves_reads() and db_manager.is_connected():
+        result = db_manager.get_hagteugsa_list(class_id)
+        if result['success']:
+            rows = [(h['id'], h['title'], h['max_members'], h['current_members']) for h in result['data']]
+            return summarize_hagteugsa(rows)
+    conn = tracer.connect(DB_PATH)
+    try:
+        rows = conn.execute('''SELECT h.id, h.title, h.max_members, COUNT(hm.id)
+                               FROM hagteugsa h
+                               LEFT JOIN hagteugsa_members hm ON hm.class_id = h.class_id AND hm.hagteugsa_id = h.id
+                               WHERE h.class_id = ?
+                               GROUP BY h.id
+                               ORDER BY h.created_at DESC''', (class_id,)).fetchall()
+    finally:
+        conn.close()
+    return summarize_hagteugsa(rows)
+
+dashboard = Dashboard()
+# 섹션별 캐시 시간(초): 급식은 자정까지(최대 1시간), 야자 명단은 수시로 바뀜
+dashboard.register('meal', load_today_meal, lambda: min(3600, seconds_until_midnight()))
+dashboard.register('yaja', load_today_yaja, 10)
+dashboard.register('suhang', load_upcoming_suhang, lambda: min(60, seconds_until_midnight()))
+dashboard.register('hagteugsa', load_hagteugsa_capacity, 30)
+metrics.register('dashboard', dashboard.stats)
+
+# 대시보드 API (sections=meal,yaja,suhang,hagteugsa 중 일부만 요청 가능)
+# 섹션별 max-age는 Section-Max-Age 헤더, ETag가 같으면 304
+@app.route('/api/dashboard')
+def get_dashboard():
+    class_id = request_class_id()
+    try:
+        names = parse_sections(request.args.get('sections'), dashboard.sections)
+    except ValueError as e:
+        return {'success': False, 'msg': str(e)}, 400
+    data, max_ages = dashboard.build(class_id, names)
+    body = app.json.dumps({'success': True, 'class_id': class_id, 'data': data}) + '\n'
+    response = app.response_class(body, mimetype='application/json')
+    response.headers.update(dashboard.cache_headers(max_ages))
+    response.set_etag(dashboard.etag(body))
+    return response.make_conditional(request)
+
+# 반 목록 API (명단 파일이 있는 반)
+@app.route('/api/classes')
+def get_classes():
+    return {'success': True, 'data': available_classes(), 'default': DEFAULT_CLASS_ID}
+
+# 반 명단 API
+@app.route('/api/roster')
+def get_roster():
+    class_id = request_class_id()
+    roster = load_roster(class_id)
+    if roster is None:
+        return {'success': False, 'msg': '해당 반의 명단이 없습니다.'}, 404
+    return {'success': True, 'data': roster}
+
+# 메트릭 API (아웃박스 대기열 길이/지연 등)
+@app.route('/api/metrics')
+def get_metrics():
+    return jsonify(metrics.snapshot())
+
+@app.route('/api/admin/import/yaja', methods=['POST'])
+def import_yaja_records():
+    """
+    CSV/XLSX 야자 기록을 일괄로 가져옵니다 (multipart 'file', ?class_id=&dry_run=1, 폼 'sheet').
+    통계 캐시는 끝난 뒤 추가된 날짜만 한 번 비우고, Supabase는 아웃박스가 배치로 보냅니다.
+    """
+    if not is_admin():
+        abort(404)
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return {'success': False, 'msg': 'file을 첨부하세요.'}, 400
+    class_id = request_class_id()
+    roster = load_roster(class_id)
+    if roster is None:
+        return {'success': False, 'msg': f'{class_id}반 명단 파일이 없습니다.'}, 400
+    extension = os.path.splitext(upload.filename)[1].lower()
+    fd, path = tempfile.mkstemp(suffix=extension)
+    os.close(fd)
+    try:
+        upload.save(path)
+        importer = YajaImporter(DB_PATH, outbox_replayer, class_id, roster, archive=archive,
+                                on_imported=invalidate_yaja_dates)
+        report = importer.run(read_rows(path, request.form.get('sheet')), dry_run=request.args.get('dry_run') == '1')
+    except (ValueError, ImportError, UnicodeDecodeError) as e:
+        return {'success': False, 'msg': str(e)}, 400
+    finally:
+        os.remove(path)
+    if report['inserted']:
+        outbox_replayer.notify()
+    return {'success': True, 'data': report}
+
+@app.route('/api/admin/profiles')
+def list_profiles():
+    """최근 프로파일을 느린 순으로 반환합니다. ?route=/api/yaja/statistics&limit=20"""
+    if not is_admin():
+        abort(404)
+    limit = request.args.get('limit', 20, type=int)
+    return {'success': True, 'profiles': profiler.slowest(limit, request.args.get('route'))}
+
+@app.route('/api/admin/profiles/<profile_id>')
+def download_profile(profile_id):
+    """프로파일 파일(.collapsed 또는 .prof)을 내려받습니다."""
+    if not is_admin():
+        abort(404)
+    path = profiler.path(profile_id)
+    if path is None or not os.path.exists(path):
+        abort(404)
+    return send_file(os.path.abspath(path), as_attachment=True)
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
     app.run(debug=False, host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Supabase HTTP 연결 풀
+supabase-py가 클라이언트마다 만드는 httpx.Client 대신, 풀 크기·keep-alive·타임아웃을 정한
+httpx.Client 하나를 모든 스레드가 함께 씁니다 (httpx.Client는 스레드 안전).
+
+- h2 패키지가 있으면 HTTP/2로 연결 하나에 요청을 여러 개 싣습니다.
+- fork된 자식 프로세스는 부모의 소켓을 쓰지 않도록 풀을 버리고 처음 쓸 때 새로 만듭니다.
+- call_timeout()으로 현재 스레드(컨텍스트)에서 나가는 요청의 타임아웃만 바꿀 수 있습니다.
+- 새로 연 연결 수와 요청 수를 세어 연결 재사용률을 메트릭으로 보여 줍니다.
+"""
+
+import contextlib
+import contextvars
+import os
+import threading
+
+import logs
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (httpx의 http2=True에 필요)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 현재 컨텍스트에서 쓸 타임아웃 (None이면 풀 기본값)
+_call_timeout = contextvars.ContextVar('supabase_call_timeout', default=None)
+
+
+@contextlib.contextmanager
+def call_timeout(seconds):
+    """with 블록 안에서 나가는 Supabase 요청의 타임아웃(초)을 바꿉니다."""
+    token = _call_timeout.set(seconds)
+    try:
+        yield
+    finally:
+        _call_timeout.reset(token)
+
+
+class PooledHTTP:
+    def __init__(self, pool_size=20, keepalive=10, keepalive_expiry=30.0,
+                 connect_timeout=3.0, read_timeout=10.0, http2=True):
+        """
+        Args:
+            pool_size: 동시에 열 수 있는 최대 연결 수 (넘으면 connect_timeout 동안 기다림)
+            keepalive: 요청 사이에 열어 둘 유휴 연결 수
+            keepalive_expiry: 유휴 연결을 닫기까지의 초
+            connect_timeout: 연결·풀 대기 타임아웃 (초)
+            read_timeout: 응답 읽기·쓰기 타임아웃 (초)
+            http2: h2 패키지가 있을 때 HTTP/2 사용
+        """
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.http2_responses = 0
+        self.forks = 0
+
+    @property
+    def available(self):
+        return httpx is not None
+
+    def timeout(self, seconds=None):
+        """읽기 타임아웃이 seconds인 httpx.Timeout (연결·풀 대기는 connect_timeout)."""
+        read = self.read_timeout if seconds is None else seconds
+        return httpx.Timeout(read, connect=min(self.connect_timeout, read), pool=self.connect_timeout)
+
+    def client(self):
+        """공유 httpx.Client를 반환합니다. fork된 뒤 처음 호출되면 새로 만듭니다."""
+        if self._pid != os.getpid():
+            self.after_fork()
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build()
+                client = self._client
+        return client
+
+    def _build(self):
+        limits = httpx.Limits(max_connections=self.pool_size,
+                              max_keepalive_connections=self.keepalive,
+                              keepalive_expiry=self.keepalive_expiry)
+        return httpx.Client(limits=limits, timeout=self.timeout(), http2=self.http2,
+                            follow_redirects=True,
+                            event_hooks={'request': [self._on_request], 'response': [self._on_response]})
+
+    def after_fork(self):
+        """
+        fork된 자식에서 호출합니다. 부모와 공유하는 소켓을 닫으면 부모의 연결까지 끊기므로
+        닫지 않고 버리기만 합니다. 부모가 fork 순간 잡고 있던 락도 새로 만들고, 메트릭은 0부터 셉니다.
+        """
+        self._client = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.http2_responses = 0
+        self.forks += 1
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and self._pid == os.getpid():
+            client.close()
+
+    # 요청 훅
+    def _on_request(self, request):
+        seconds = _call_timeout.get()
+        if seconds is not None:
+            request.extensions['timeout'] = self.timeout(seconds).as_dict()
+        # httpcore trace로 새 연결을 연 요청만 셈 (나머지는 풀에서 재사용)
+        request.extensions['trace'] = self._trace
+        logs.incr('supabase_calls')
+        with self._stats_lock:
+            self.requests += 1
+
+    def _on_response(self, response):
+        if response.http_version == 'HTTP/2':
+            with self._stats_lock:
+                self.http2_responses += 1
+
+    def _trace(self, event, info):
+        if event == 'connection.connect_tcp.complete':
+            with self._stats_lock:
+                self.connections_opened += 1
+
+    # 메트릭
+    def stats(self):
+        with self._stats_lock:
+            requests, opened = self.requests, self.connections_opened
+            http2_responses = self.http2_responses
+        return {
+            'http2': self.http2,
+            'pool_size': self.pool_size,
+            'keepalive': self.keepalive,
+            'connect_timeout': self.connect_timeout,
+            'read_timeout': self.read_timeout,
+            'requests': requests,
+            'connections_opened': opened,
+            'reuse_ratio': round(1 - opened / requests, 4) if requests else None,
+            'http2_responses': http2_responses,
+            'forks': self.forks
+        }
@@ -0,0 +1,148 @@
+"""
+멱등 키(Idempotency-Key) 응답 캐시
+학교 와이파이가 끊겼다가 재시도된 POST 요청(야자 추가, 학특사 생성, 수행평가 추가)을
+처음 요청의 응답으로 다시 답해 SQLite·Supabase에 같은 행이 두 번 쓰이지 않도록 합니다.
+
+- 키는 (경로, Idempotency-Key 헤더)이며, 요청 본문이 다르면 422로 거절합니다.
+- 처음 요청이 아직 처리 중이면 409로 응답합니다 (클라이언트가 잠시 후 재시도).
+- 5xx 응답은 저장하지 않으므로 같은 키로 다시 시도할 수 있습니다.
+- 항목은 TTL이 지나거나 최대 개수를 넘으면 오래된 것부터 지웁니다 (프로세스 메모리, 재시작 시 초기화).
+"""
+
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+# 처리 중 표시
+_IN_FLIGHT = object()
+
+
+def request_fingerprint():
+    """쿼리 문자열과 본문으로 요청 지문을 만듭니다 (같은 키로 다른 요청을 보냈는지 확인용)."""
+    digest = hashlib.sha256(request.query_string)
+    digest.update(b'\0')
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+class IdempotencyCache:
+    def __init__(self, maxsize=1024, ttl=86400.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (만료 시각, 지문, 응답 또는 _IN_FLIGHT)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.replays = 0
+        self.conflicts = 0
+        self.evictions = 0
+
+    def _expire(self, now):
+        # 삽입 순서 = 만료 순서 (TTL이 모두 같음)
+        while self._entries:
+            key, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now and len(self._entries) <= self.maxsize:
+                break
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def begin(self, key, fingerprint):
+        """
+        처리를 시작합니다.
+
+        Returns:
+            ('new', None): 처음 보는 키, 처리 후 finish() 또는 abort() 호출
+            ('replay', 응답): 저장된 (status, content_type, body)
+            ('in_flight', None) / ('mismatch', None)
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = (now + self.ttl, fingerprint, _IN_FLIGHT)
+                self._expire(now)
+                return 'new', None
+            _, stored_fingerprint, response = entry
+            if stored_fingerprint != fingerprint:
+                self.conflicts += 1
+                return 'mismatch', None
+            if response is _IN_FLIGHT:
+                self.conflicts += 1
+                return 'in_flight', None
+            self.replays += 1
+            return 'replay', response
+
+    def finish(self, key, response):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], entry[1], response)
+
+    def abort(self, key):
+        """저장하지 않을 응답(5xx, 예외)이면 키를 지워 재시도를 허용합니다."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # 메트릭
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'replays': self.replays,
+                'conflicts': self.conflicts,
+                'evictions': self.evictions
+            }
+
+
+def idempotent(cache):
+    """
+    Idempotency-Key 헤더가 있는 요청의 응답을 저장하고, 같은 키의 재시도에는 저장된 응답을 돌려주는 데코레이터.
+    헤더가 없으면 그대로 실행합니다. maxsize가 0이면 사용하지 않습니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            idempotency_key = request.headers.get(HEADER)
+            if not idempotency_key or cache.maxsize <= 0:
+                return func(*args, **kwargs)
+            if len(idempotency_key) > MAX_KEY_LENGTH:
+                return {'success': False, 'msg': f'{HEADER}는 {MAX_KEY_LENGTH}자 이하여야 합니다.'}, 400
+
+            key = (request.path, idempotency_key)
+            state, stored = cache.begin(key, request_fingerprint())
+            if state == 'mismatch':
+                return {'success': False, 'msg': f'같은 {HEADER}로 다른 요청을 보냈습니다.'}, 422
+            if state == 'in_flight':
+                return {'success': False, 'msg': '같은 요청을 처리하는 중입니다. 잠시 후 다시 시도하세요.'}, 409, {'Retry-After': '1'}
+            if state == 'replay':
+                status, content_type, body = stored
+                response = current_app.response_class(body, status=status, content_type=content_type)
+                response.headers[REPLAYED_HEADER] = 'true'
+                return response
+
+            try:
+                response = current_app.make_response(func(*args, **kwargs))
+            except Exception:
+                cache.abort(key)
+                raise
+            if response.status_code >= 500 or response.is_streamed:
+                cache.abort(key)
+            else:
+                cache.finish(key, (response.status_code, response.content_type, response.get_data()))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+"""
+빠른 JSON 인코딩
+학기 단위 야자 통계(student_details, daily_unique_students)처럼 큰 응답의 인코딩 시간을 줄이기 위해
+orjson이 설치되어 있으면 Flask의 JSON provider를 orjson으로 바꿉니다. 없으면 표준 json을 그대로 씁니다.
+
+- 키 정렬, 정수 키(차시별 명단 {1: [...]}), 날짜·Decimal 등 Flask 기본 변환은 기존과 같게 맞춥니다.
+- 한글을 \\uXXXX로 바꾸지 않고 UTF-8로 보내므로 응답이 더 작습니다.
+- 인코딩은 json.encode span으로 기록합니다.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+from tracing import tracer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    @property
+    def backend(self):
+        return 'orjson' if orjson is not None else 'json'
+
+    def _options(self, indent=False):
+        # datetime·date는 Flask 기본 변환(HTTP 날짜 형식)을 거치도록 default로 넘김
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, indent=False):
+        with tracer.span('json.encode'):
+            return orjson.dumps(obj, default=self.default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs):
+        # 표준 json 전용 인자(cls 등)가 오면 기본 provider로
+        if orjson is None or set(kwargs) - {'indent', 'separators', 'sort_keys', 'ensure_ascii'}:
+            with tracer.span('json.encode'):
+                return super().dumps(obj, **kwargs)
+        return self._encode(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
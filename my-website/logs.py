@@ -0,0 +1,219 @@
+"""
+비동기 구조화 로깅
+요청 스레드는 로그 레코드를 큐에 넣기만 하고, 백그라운드 스레드(QueueListener)가 JSON 한 줄로 써서
+Supabase가 느릴 때 쏟아지는 오류 로그가 응답 지연에 더해지지 않게 합니다.
+
+- 큐가 가득 차면 기다리지 않고 버리며 버린 수를 메트릭으로 셉니다.
+- 요청마다 request_id, route, method, status, backend, duration_ms를 컨텍스트에 두고
+  그 요청 중에 남긴 모든 로그에 붙입니다.
+- 성공 요청 로그와 httpx 요청 로그처럼 양이 많은 INFO 로그는 sample_rate 비율만 남깁니다.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+# 현재 요청의 로그 필드 (요청 안에서 도는 스레드풀 작업에도 복사되도록 딕셔너리를 공유)
+_context = contextvars.ContextVar('request_log_context', default=None)
+
+CONTEXT_FIELDS = ('request_id', 'method', 'route', 'status', 'backend', 'duration_ms', 'supabase_calls')
+# 레코드 기본 속성 (extra로 넘긴 필드만 골라 내기 위함)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'sample'}
+
+# 항상 표본 추출하는 로거 (요청마다 한 줄씩 남기는 라이브러리 로그)
+SAMPLED_LOGGERS = ('httpx', 'werkzeug')
+
+
+def begin_request(**fields):
+    """요청 시작 시 로그 컨텍스트를 만들고, 끝낼 때 넘길 토큰을 반환합니다."""
+    return _context.set(dict(fields))
+
+
+def end_request(token):
+    _context.reset(token)
+
+
+def current():
+    """현재 요청의 로그 필드 (요청 밖이면 None)."""
+    return _context.get()
+
+
+def annotate(**fields):
+    """현재 요청의 로그 필드를 추가·변경합니다 (요청 밖이면 무시)."""
+    context = _context.get()
+    if context is not None:
+        context.update(fields)
+
+
+def incr(field, value=1):
+    """현재 요청의 카운터 필드(예: supabase_calls)를 증가시킵니다."""
+    context = _context.get()
+    if context is not None:
+        context[field] = context.get(field, 0) + value
+
+
+class JsonFormatter(logging.Formatter):
+    """레코드를 JSON 한 줄로 만듭니다. 요청 필드와 extra 필드를 함께 씁니다."""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_') and value is not None:
+                entry[key] = value
+        exc_text = record.exc_text or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc_text:
+            entry['exc'] = exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """로컬 개발용: 기존 basicConfig 형식 뒤에 요청 ID를 붙입니다."""
+
+    def __init__(self):
+        super().__init__('%(levelname)s:%(name)s:%(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        request_id = getattr(record, 'request_id', None)
+        return f'{line} [{request_id}]' if request_id else line
+
+
+class SamplingFilter(logging.Filter):
+    """sample=True인 레코드와 SAMPLED_LOGGERS의 INFO 이하 레코드를 rate 비율만 통과시킵니다."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        if not (getattr(record, 'sample', False) or record.name.split('.')[0] in SAMPLED_LOGGERS):
+            return True
+        if self.rate >= 1 or random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    로그를 남긴 스레드에서 요청 필드를 레코드에 옮기고 큐에 넣습니다.
+    포맷·JSON 변환·출력은 리스너 스레드가 합니다.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.queued = 0
+        self.dropped = 0
+
+    def prepare(self, record):
+        context = _context.get()
+        if context:
+            for key in CONTEXT_FIELDS:
+                if key in context and not hasattr(record, key):
+                    setattr(record, key, context[key])
+        # 인자는 이 스레드에서 문자열로 합치고(다른 스레드에서 바뀔 수 있음), 예외는 텍스트로
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self.queued += 1
+        except queue.Full:
+            # 출력이 밀리면 요청 스레드를 막지 않고 버림
+            self.dropped += 1
+
+
+class LogPipeline:
+    def __init__(self, level='INFO', fmt='json', queue_size=10000, sample_rate=0.1, stream=None):
+        self.level = level
+        self.fmt = fmt
+        self.sample_rate = sample_rate
+        self.queue = queue.Queue(queue_size)
+        self.handler = ContextQueueHandler(self.queue)
+        self.sampler = SamplingFilter(sample_rate)
+        self.handler.addFilter(self.sampler)
+        self.output = logging.StreamHandler(stream or sys.stderr)
+        self.output.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+        self.listener = None
+
+    def start(self):
+        self.listener = logging.handlers.QueueListener(self.queue, self.output, respect_handler_level=False)
+        self.listener.start()
+
+    def stop(self):
+        """남은 로그를 모두 쓰고 리스너를 멈춥니다."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _after_fork(self):
+        # fork된 자식에는 리스너 스레드가 없으므로 새로 시작
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.handler.queue = self.queue
+        self.listener = None
+        self.start()
+
+    # 메트릭
+    def stats(self):
+        return {
+            'format': self.fmt,
+            'level': self.level,
+            'queued': self.handler.queued,
+            'pending': self.queue.qsize(),
+            'dropped': self.handler.dropped,
+            'sample_rate': self.sample_rate,
+            'sampled_out': self.sampler.sampled_out
+        }
+
+
+_pipeline = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level='INFO', fmt='json', queue_size=10000, sample_rate=0.1):
+    """
+    루트 로거를 큐 핸들러 하나로 바꿉니다. 여러 번 호출해도 처음 한 번만 설정합니다.
+
+    Args:
+        level: 루트 로그 레벨
+        fmt: 'json'(한 줄 JSON) 또는 'text'
+        queue_size: 출력 대기 큐 크기 (가득 차면 버림)
+        sample_rate: 성공 요청·httpx INFO 로그를 남길 비율 (0~1)
+    """
+    global _pipeline
+    with _setup_lock:
+        if _pipeline is not None:
+            return _pipeline
+        pipeline = LogPipeline(level, fmt, queue_size, sample_rate)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(pipeline.handler)
+        root.setLevel(level)
+        pipeline.start()
+        atexit.register(pipeline.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=pipeline._after_fork)
+        _pipeline = pipeline
+        return pipeline
@@ -0,0 +1,109 @@
+"""
+급식 알레르기 인덱스
+급식 저장소의 메뉴별 알레르기 비트마스크(번호 n -> 1 << n)를 학년도 전체에 대해 NumPy 배열로 만들어 두고,
+"알레르기 X가 없는 날" 같은 질의를 문자열 검색 없이 비트 연산으로 답합니다.
+저장소 내용이 바뀌면(meal_store.version(), 다른 프로세스의 가져오기 포함) 다음 조회 때 인덱스를 다시 만듭니다.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from meal_parser import ALLERGENS
+from meal_store import LUNCH, allergen_mask
+
+
+def describe(codes):
+    """알레르기 번호 목록을 [{'code', 'name'}] 목록으로 바꿉니다."""
+    return [{'code': code, 'name': ALLERGENS[code]} for code in codes]
+
+
+class AllergenIndex:
+    def __init__(self, meal_store, meal_code=LUNCH):
+        self.meal_store = meal_store
+        self.meal_code = meal_code
+        self._lock = threading.Lock()
+        self._version = None
+        self.builds = 0
+        self.build_ms = None
+        self._index = self._build([])
+
+    @staticmethod
+    def _build(rows):
+        """메뉴 행(날짜순)으로 날짜별·메뉴별 비트마스크 배열을 만듭니다."""
+        dish_dates = np.array([row[0] for row in rows], dtype='datetime64[D]')
+        dish_masks = np.array([row[2] for row in rows], dtype=np.int64)
+        if len(rows):
+            # 날짜가 바뀌는 위치가 각 날짜의 첫 메뉴, 날짜 마스크는 그날 메뉴 마스크의 OR
+            starts = np.flatnonzero(np.concatenate(([True], dish_dates[1:] != dish_dates[:-1])))
+            day_masks = np.bitwise_or.reduceat(dish_masks, starts)
+        else:
+            starts = day_masks = np.array([], dtype=np.int64)
+        return {
+            'dates': dish_dates[starts],
+            'day_masks': day_masks,
+            'dish_starts': starts,
+            'dish_masks': dish_masks,
+            'dish_names': [row[1] for row in rows]
+        }
+
+    def ensure_built(self):
+        """저장소가 바뀌었으면 인덱스를 다시 만듭니다."""
+        version = self.meal_store.version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            started = time.perf_counter()
+            self._index = self._build(self.meal_store.dish_rows(self.meal_code))
+            self.build_ms = (time.perf_counter() - started) * 1000
+            self.builds += 1
+            self._version = version
+
+    def safe_days(self, codes, start_date=None, end_date=None):
+        """
+        기간 중 주어진 알레르기가 하나도 없는 날과 있는 날(해당 메뉴 포함)을 반환합니다.
+
+        Args:
+            codes: 알레르기 번호 목록
+            start_date, end_date: 'YYYY-MM-DD' (없으면 저장된 전체 기간)
+        """
+        self.ensure_built()
+        index = self._index
+        dates, day_masks = index['dates'], index['day_masks']
+        mask = allergen_mask(codes)
+        lo = int(np.searchsorted(dates, np.datetime64(start_date, 'D'), 'left')) if start_date else 0
+        hi = int(np.searchsorted(dates, np.datetime64(end_date, 'D'), 'right')) if end_date else len(dates)
+        hi = max(lo, hi)
+
+        hit = (day_masks[lo:hi] & mask) != 0
+        date_strs = np.datetime_as_string(dates[lo:hi]).tolist()
+        unsafe = []
+        if hit.any():
+            # 기간 내 메뉴 전체를 한 번에 비트 연산하고, 걸린 메뉴를 날짜별로 묶음
+            starts, dish_masks, names = index['dish_starts'], index['dish_masks'], index['dish_names']
+            first = int(starts[lo])
+            last = int(starts[hi]) if hi < len(starts) else len(dish_masks)
+            dish_hits = np.flatnonzero(dish_masks[first:last] & mask) + first
+            dish_days = np.searchsorted(starts, dish_hits, 'right') - 1 - lo
+            for day, dish in zip(dish_days.tolist(), dish_hits.tolist()):
+                if not unsafe or unsafe[-1]['date'] != date_strs[day]:
+                    unsafe.append({'date': date_strs[day], 'dishes': []})
+                unsafe[-1]['dishes'].append(names[dish])
+        return {
+            'allergens': describe(codes),
+            'days': hi - lo,
+            'safe_days': [date_strs[i] for i in np.flatnonzero(~hit).tolist()],
+            'unsafe_days': unsafe
+        }
+
+    # 메트릭
+    def stats(self):
+        return {
+            'days': int(len(self._index['dates'])),
+            'dishes': len(self._index['dish_names']),
+            'builds': self.builds,
+            'build_ms': round(self.build_ms, 3) if self.build_ms is not None else None
+        }
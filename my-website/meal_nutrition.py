@@ -0,0 +1,193 @@
+"""
+급식 영양 분석
+급식 저장소의 칼로리·영양소를 (날짜 x 항목) NumPy 행렬로 한 번 만들어 두고,
+기간별 평균·최댓값과 이상치를 벡터 연산으로 계산합니다.
+저장소 내용이 바뀌면(meal_store.version(), 다른 프로세스의 가져오기 포함) 다음 조회 때 행렬을 다시 만듭니다.
+
+이상치는 항목별 중앙값과 MAD(중앙값 절대 편차)로 구한 robust z 점수가
+기준값(기본 3.5)보다 큰 날입니다. 평균·표준편차와 달리 이상치 자체에 끌려가지 않습니다.
+"""
+
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from meal_store import LUNCH, NUTRIENT_FIELDS
+from yaja_stats import month_key, semester_key, week_key
+
+FIELDS = ('calories',) + NUTRIENT_FIELDS
+GRANULARITIES = ('week', 'month', 'semester')
+DEFAULT_OUTLIER_Z = 3.5
+# 정규분포에서 MAD를 표준편차로 환산하는 계수
+_MAD_SCALE = 1.4826
+
+
+PERIOD_KEYS = {'week': week_key, 'month': month_key, 'semester': semester_key}
+
+
+def parse_granularity(value):
+    """
+    집계 단위를 확인합니다. 값이 없으면 'week'입니다.
+
+    Raises:
+        ValueError: 알 수 없는 단위인 경우
+    """
+    if not value:
+        return 'week'
+    if value not in GRANULARITIES:
+        raise ValueError(f"granularity는 {', '.join(GRANULARITIES)} 중에서 선택하세요.")
+    return value
+
+
+def _to_dicts(matrix):
+    """(행 x 항목) 배열을 행마다 {항목: 값} 딕셔너리로 바꿉니다 (NaN은 None). 변환은 배열 단위로 한 번만 합니다."""
+    rounded = np.round(matrix, 2).astype(object)
+    rounded[np.isnan(matrix)] = None
+    return [dict(zip(FIELDS, row)) for row in rounded.tolist()]
+
+
+class NutritionMatrix:
+    def __init__(self, meal_store, meal_code=LUNCH):
+        self.meal_store = meal_store
+        self.meal_code = meal_code
+        self._lock = threading.Lock()
+        self._version = None
+        self.builds = 0
+        self.build_ms = None
+        self._matrix = self._build([])
+
+    @staticmethod
+    def _build(rows):
+        """저장소 행으로 행렬과 파생 배열을 만듭니다. 조회 중 교체되어도 섞이지 않도록 한 딕셔너리로 반환합니다."""
+        date_strs = [row[0] for row in rows]
+        # None(영양정보 없음)은 NaN으로 저장
+        values = np.array([row[1:] for row in rows], dtype=float).reshape(len(rows), len(FIELDS))
+        # 집계 단위별로 날짜마다 그룹 번호를 매겨 둠 (날짜순이므로 같은 그룹은 연속)
+        groups, labels = {}, {}
+        for granularity, key_func in PERIOD_KEYS.items():
+            keys = [key_func(d) for d in date_strs]
+            change = np.array([i > 0 and keys[i] != keys[i - 1] for i in range(len(keys))], dtype=bool)
+            groups[granularity] = np.cumsum(change)
+            labels[granularity] = [k for i, k in enumerate(keys) if i == 0 or change[i]]
+        z = np.zeros_like(values)
+        if len(rows):
+            with warnings.catch_warnings():
+                # 값이 하나도 없는 항목은 NaN 중앙값
+                warnings.simplefilter('ignore', RuntimeWarning)
+                median = np.nanmedian(values, axis=0)
+                mad = np.nanmedian(np.abs(values - median), axis=0) * _MAD_SCALE
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z = (values - median) / mad
+            z = np.where(np.isfinite(z), z, 0.0)
+        return {
+            'date_strs': date_strs,
+            'dates': np.array(date_strs, dtype='datetime64[D]'),
+            'values': values,
+            'z': z,
+            'groups': groups,
+            'labels': labels
+        }
+
+    def ensure_built(self):
+        """저장소가 바뀌었으면 행렬을 다시 만듭니다."""
+        version = self.meal_store.version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            started = time.perf_counter()
+            self._matrix = self._build(self.meal_store.nutrition_rows(self.meal_code))
+            self.build_ms = (time.perf_counter() - started) * 1000
+            self.builds += 1
+            self._version = version
+
+    def summarize(self, start_date=None, end_date=None, granularity='week', outlier_z=DEFAULT_OUTLIER_Z):
+        """
+        기간의 영양 통계를 계산합니다.
+
+        Args:
+            start_date, end_date: 'YYYY-MM-DD' (없으면 저장된 전체 기간)
+            granularity: week, month, semester 중 하나
+            outlier_z: 이상치로 표시할 robust z 점수 기준
+
+        Returns:
+            summary(기간 전체 평균·최댓값·최댓값 날짜), periods(단위별 평균·최댓값), outliers
+        """
+        self.ensure_built()
+        # 다시 만들어져도 이번 계산은 같은 행렬을 사용
+        m = self._matrix
+        dates, values, z, date_strs = m['dates'], m['values'], m['z'], m['date_strs']
+        groups, labels = m['groups'][granularity], m['labels'][granularity]
+        lo = int(np.searchsorted(dates, np.datetime64(start_date, 'D'), 'left')) if start_date else 0
+        hi = int(np.searchsorted(dates, np.datetime64(end_date, 'D'), 'right')) if end_date else len(dates)
+        hi = max(lo, hi)
+        result = {
+            'start_date': date_strs[lo] if hi > lo else start_date,
+            'end_date': date_strs[hi - 1] if hi > lo else end_date,
+            'days': hi - lo,
+            'granularity': granularity,
+            'outlier_z': outlier_z,
+            'fields': list(FIELDS),
+            'summary': {},
+            'periods': [],
+            'outliers': []
+        }
+        if hi == lo:
+            return result
+
+        block = values[lo:hi]
+        valid = ~np.isnan(block)
+        filled = np.where(valid, block, 0.0)
+        counts = valid.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg = np.where(counts > 0, filled.sum(axis=0) / counts, np.nan)
+        peak_index = np.where(valid, block, -np.inf).argmax(axis=0)
+        peak = np.where(counts > 0, block[peak_index, np.arange(len(FIELDS))], np.nan)
+        avg_dict, peak_dict = _to_dicts(np.vstack((avg, peak)))
+        result['summary'] = {
+            field: {
+                'avg': avg_dict[field],
+                'max': peak_dict[field],
+                'max_date': date_strs[lo + index] if count else None
+            }
+            for field, index, count in zip(FIELDS, peak_index.tolist(), counts.tolist())
+        }
+
+        # 그룹 경계마다 reduceat으로 합계·개수·최댓값을 한 번에 계산
+        block_groups = groups[lo:hi]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(block_groups)) + 1))
+        sums = np.add.reduceat(filled, starts, axis=0)
+        group_counts = np.add.reduceat(valid.astype(np.int64), starts, axis=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            peaks = np.fmax.reduceat(block, starts, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = np.where(group_counts > 0, sums / group_counts, np.nan)
+        days = np.diff(np.append(starts, hi - lo))
+        result['periods'] = [
+            {'period': labels[group], 'days': count, 'avg': avg_row, 'max': max_row}
+            for group, count, avg_row, max_row in zip(block_groups[starts].tolist(), days.tolist(),
+                                                      _to_dicts(means), _to_dicts(peaks))
+        ]
+
+        block_z = z[lo:hi]
+        rows, cols = np.nonzero(np.abs(block_z) > outlier_z)
+        result['outliers'] = [
+            {'date': date_strs[lo + r], 'field': FIELDS[c], 'value': value, 'z': score}
+            for r, c, value, score in zip(rows.tolist(), cols.tolist(),
+                                          np.round(block[rows, cols], 2).tolist(),
+                                          np.round(block_z[rows, cols], 2).tolist())
+        ]
+        return result
+
+    # 메트릭
+    def stats(self):
+        return {
+            'days': len(self._matrix['date_strs']),
+            'fields': len(FIELDS),
+            'builds': self.builds,
+            'build_ms': round(self.build_ms, 3) if self.build_ms is not None else None
+        }
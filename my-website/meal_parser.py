@@ -0,0 +1,110 @@
+"""
+급식 데이터 파싱 모듈
+NEIS/CSV 급식 문자열(요리명, 칼로리정보, 영양정보)을 화면용·저장용 데이터로 변환합니다.
+"""
+
+import re
+
+# 괄호 안의 숫자(알레르기 정보)
+_ALLERGEN_PATTERN = re.compile(r'\s*\([0-9.,\s]+\)')
+_ALLERGEN_CODES_PATTERN = re.compile(r'\(([0-9.,\s]+)\)')
+_NUMBER_PATTERN = re.compile(r'-?[0-9]+(?:\.[0-9]+)?')
+
+# 영양정보 항목 이름 -> 저장 컬럼 이름 (NEIS 표기 순서)
+NUTRIENTS = (
+    ('탄수화물(g)', 'carbohydrate_g'),
+    ('단백질(g)', 'protein_g'),
+    ('지방(g)', 'fat_g'),
+    ('비타민A(R.E)', 'vitamin_a_re'),
+    ('티아민(mg)', 'thiamin_mg'),
+    ('리보플라빈(mg)', 'riboflavin_mg'),
+    ('비타민C(mg)', 'vitamin_c_mg'),
+    ('칼슘(mg)', 'calcium_mg'),
+    ('철분(mg)', 'iron_mg'),
+)
+NUTRIENT_COLUMNS = {label: column for label, column in NUTRIENTS}
+
+# 식품의약품안전처 알레르기 유발 식품 표시 번호
+ALLERGENS = {
+    1: '난류', 2: '우유', 3: '메밀', 4: '땅콩', 5: '대두', 6: '밀', 7: '고등어', 8: '게', 9: '새우',
+    10: '돼지고기', 11: '복숭아', 12: '토마토', 13: '아황산류', 14: '호두', 15: '닭고기', 16: '쇠고기',
+    17: '오징어', 18: '조개류', 19: '잣',
+}
+
+
+def _split_lines(raw):
+    if not raw or raw == 'nan':
+        return []
+    return [line.strip() for line in str(raw).replace('<br/>', '\n').split('\n') if line.strip()]
+
+
+def parse_menu_items(menu_raw):
+    """요리명 문자열에서 HTML 태그와 알레르기 정보를 제거한 메뉴 목록을 반환합니다."""
+    menu_items = []
+    for item in menu_raw.replace('<br/>', '\n').split('\n'):
+        if item.strip():
+            clean_item = _ALLERGEN_PATTERN.sub('', item.strip())
+            if clean_item:
+                menu_items.append(clean_item)
+    return menu_items
+
+
+def parse_dishes(menu_raw):
+    """
+    요리명 문자열을 (메뉴 이름, 알레르기 번호 목록) 목록으로 변환합니다.
+
+    예: '소고기미역국 (5.6.16)' -> ('소고기미역국', [5, 6, 16])
+    """
+    dishes = []
+    for item in _split_lines(menu_raw):
+        name = _ALLERGEN_PATTERN.sub('', item).strip()
+        if not name:
+            continue
+        codes = set()
+        for group in _ALLERGEN_CODES_PATTERN.findall(item):
+            codes.update(int(code) for code in re.split(r'[.,\s]+', group) if code.isdigit())
+        dishes.append((name, sorted(codes)))
+    return dishes
+
+
+def parse_calories(calories_raw):
+    """'1377.9 Kcal' 형식의 칼로리정보를 숫자로 변환합니다. 값이 없으면 None을 반환합니다."""
+    if calories_raw is None:
+        return None
+    match = _NUMBER_PATTERN.search(str(calories_raw))
+    return float(match.group()) if match else None
+
+
+def parse_nutrients(nutrients_raw):
+    """
+    '탄수화물(g) : 173.7<br/>단백질(g) : 50.3...' 형식의 영양정보를 변환합니다.
+
+    Returns:
+        {저장 컬럼 이름: 값} 딕셔너리 (알 수 없는 항목은 무시)
+    """
+    nutrients = {}
+    for line in _split_lines(nutrients_raw):
+        label, _, value = line.partition(':')
+        column = NUTRIENT_COLUMNS.get(label.strip())
+        match = _NUMBER_PATTERN.search(value)
+        if column and match:
+            nutrients[column] = float(match.group())
+    return nutrients
+
+
+def parse_allergen_codes(value):
+    """
+    '5,6' 같은 쿼리 값을 알레르기 번호 목록으로 바꿉니다.
+
+    Raises:
+        ValueError: 숫자가 아니거나 알 수 없는 번호가 포함된 경우
+    """
+    codes = set()
+    for part in str(value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit() or int(part) not in ALLERGENS:
+            raise ValueError(f'알레르기 번호는 1~{max(ALLERGENS)} 사이의 숫자입니다: {part}')
+        codes.add(int(part))
+    return sorted(codes)
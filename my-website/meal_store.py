@@ -0,0 +1,328 @@
+"""
+급식 저장소
+NEIS 급식 정보(또는 food_calender.csv)를 학년도 단위로 미리 가져와 파싱한 뒤
+SQLite 파일에 숫자형 컬럼으로 저장합니다. /api/meal과 날짜 조회는 이 저장소만 읽습니다.
+
+- meals: 날짜·식사코드별 칼로리와 영양소(컬럼당 한 항목), 알레르기 비트마스크
+- meal_dishes: 메뉴별 이름과 알레르기 비트마스크 (알레르기 번호 n -> 1 << n)
+- meal_sources: 가져온 원본(CSV 경로, NEIS 기간)과 시각 (CSV가 바뀌지 않았으면 다시 읽지 않음)
+- meal_version: 가져오기마다 같은 트랜잭션에서 1씩 올리는 버전 (CLI나 다른 워커가 가져와도
+  실행 중인 서버의 영양 행렬·알레르기 인덱스가 다음 조회 때 다시 만들어짐)
+
+사용법 (my-website 디렉터리에서):
+    python meal_store.py csv src/food_calender.csv
+    python meal_store.py neis --year 2025        # NEIS_API_KEY 필요
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from config import Config
+from meal_parser import NUTRIENTS, parse_calories, parse_dishes, parse_nutrients
+from tracing import tracer, traced
+
+logger = logging.getLogger(__name__)
+
+NUTRIENT_FIELDS = tuple(column for _, column in NUTRIENTS)
+LUNCH = 2  # 식사코드: 1 조식, 2 중식, 3 석식
+
+NEIS_URL = 'https://open.neis.go.kr/hub/mealServiceDietInfo'
+NEIS_PAGE_SIZE = 1000
+
+# CSV 헤더 -> NEIS 응답 필드
+CSV_FIELDS = {
+    '급식일자': 'MLSV_YMD',
+    '식사코드': 'MMEAL_SC_CODE',
+    '요리명': 'DDISH_NM',
+    '칼로리정보': 'CAL_INFO',
+    '영양정보': 'NTR_INFO',
+}
+
+
+def allergen_mask(codes):
+    """알레르기 번호 목록을 정수 비트마스크로 변환합니다."""
+    mask = 0
+    for code in codes:
+        mask |= 1 << code
+    return mask
+
+
+def mask_codes(mask):
+    """비트마스크를 알레르기 번호 목록으로 되돌립니다."""
+    return [code for code in range(mask.bit_length()) if mask >> code & 1]
+
+
+def school_year_range(year):
+    """학년도(3월 1일 ~ 다음 해 2월 말일)의 시작일과 종료일을 반환합니다."""
+    return date(year, 3, 1), date(year + 1, 3, 1) - timedelta(days=1)
+
+
+def _iso_date(ymd):
+    ymd = str(ymd).strip()
+    return f'{ymd[:4]}-{ymd[4:6]}-{ymd[6:8]}'
+
+
+def parse_meal_record(record):
+    """NEIS 응답 행(또는 같은 필드로 바꾼 CSV 행)을 저장용 딕셔너리로 변환합니다."""
+    dishes = parse_dishes(record.get('DDISH_NM') or '')
+    meal = {
+        'meal_date': _iso_date(record['MLSV_YMD']),
+        'meal_code': int(float(record.get('MMEAL_SC_CODE') or LUNCH)),
+        'calories': parse_calories(record.get('CAL_INFO')),
+        'dishes': [(name, allergen_mask(codes)) for name, codes in dishes],
+    }
+    nutrients = parse_nutrients(record.get('NTR_INFO'))
+    for column in NUTRIENT_FIELDS:
+        meal[column] = nutrients.get(column)
+    meal['allergen_mask'] = 0
+    for _, mask in meal['dishes']:
+        meal['allergen_mask'] |= mask
+    return meal
+
+
+def read_csv_records(path):
+    """food_calender.csv를 NEIS 필드 이름의 행 목록으로 읽습니다."""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return [{field: row.get(header) for header, field in CSV_FIELDS.items()}
+                for row in csv.DictReader(f) if row.get('급식일자')]
+
+
+@traced('meal.fetch_neis')
+def fetch_neis_records(api_key, start, end, session=None):
+    """NEIS 급식식단정보를 기간 단위로 페이지를 넘기며 가져옵니다."""
+    import requests
+
+    http = session or requests
+    records = []
+    page = 1
+    while True:
+        params = {
+            'Key': api_key,
+            'Type': 'json',
+            'pIndex': page,
+            'pSize': NEIS_PAGE_SIZE,
+            'ATPT_OFCDC_SC_CODE': Config.NEIS_OFFICE_CODE,
+            'SD_SCHUL_CODE': Config.NEIS_SCHOOL_CODE,
+            'MLSV_FROM_YMD': start.strftime('%Y%m%d'),
+            'MLSV_TO_YMD': end.strftime('%Y%m%d'),
+        }
+        response = http.get(NEIS_URL, params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        if 'mealServiceDietInfo' not in data:
+            # 해당 기간에 데이터가 없으면 RESULT만 옴 (INFO-200)
+            return records
+        head, body = data['mealServiceDietInfo'][0]['head'], data['mealServiceDietInfo'][1]
+        total = head[0]['list_total_count']
+        records.extend(body['row'])
+        if len(records) >= total or not body['row']:
+            return records
+        page += 1
+
+
+class MealStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init(self):
+        nutrient_columns = ''.join(f'{column} REAL, ' for column in NUTRIENT_FIELDS)
+        conn = self._connect()
+        try:
+            conn.executescript(f'''
+                CREATE TABLE IF NOT EXISTS meals (
+                    meal_date TEXT NOT NULL,
+                    meal_code INTEGER NOT NULL,
+                    calories REAL,
+                    {nutrient_columns}
+                    allergen_mask INTEGER NOT NULL DEFAULT 0,
+                    source TEXT,
+                    PRIMARY KEY (meal_date, meal_code)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS meal_dishes (
+                    meal_date TEXT NOT NULL,
+                    meal_code INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    allergen_mask INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (meal_date, meal_code, position)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS meal_sources (
+                    source TEXT PRIMARY KEY,
+                    mtime REAL,
+                    meals INTEGER NOT NULL,
+                    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS meal_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO meal_version (id, version) VALUES (1, 0);
+            ''')
+        finally:
+            conn.close()
+
+    # 가져오기
+    def ingest(self, records, source, mtime=None):
+        """
+        급식 행을 파싱해 저장합니다. 같은 날짜·식사코드의 기존 데이터는 교체합니다.
+
+        Returns:
+            저장한 급식(날짜·식사코드) 수
+        """
+        meals = [parse_meal_record(record) for record in records]
+        columns = ('meal_date', 'meal_code', 'calories') + NUTRIENT_FIELDS + ('allergen_mask',)
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(f'''INSERT OR REPLACE INTO meals ({', '.join(columns)}, source)
+                                         VALUES ({', '.join('?' * len(columns))}, ?)''',
+                                     [tuple(meal[c] for c in columns) + (source,) for meal in meals])
+                    conn.executemany('DELETE FROM meal_dishes WHERE meal_date = ? AND meal_code = ?',
+                                     [(meal['meal_date'], meal['meal_code']) for meal in meals])
+                    conn.executemany('''INSERT INTO meal_dishes (meal_date, meal_code, position, name, allergen_mask)
+                                        VALUES (?, ?, ?, ?, ?)''',
+                                     [(meal['meal_date'], meal['meal_code'], position, name, mask)
+                                      for meal in meals for position, (name, mask) in enumerate(meal['dishes'])])
+                    conn.execute('INSERT OR REPLACE INTO meal_sources (source, mtime, meals) VALUES (?, ?, ?)',
+                                 (source, mtime, len(meals)))
+                    conn.execute('UPDATE meal_version SET version = version + 1 WHERE id = 1')
+            finally:
+                conn.close()
+        return len(meals)
+
+    def version(self):
+        """
+        저장 내용의 버전 (파생 데이터의 갱신 판단용). 파일에 저장하므로
+        다른 프로세스(CLI, 다른 워커)의 가져오기도 반영됩니다.
+        """
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT version FROM meal_version WHERE id = 1').fetchone()[0]
+        finally:
+            conn.close()
+
+    def ingest_csv(self, path, force=False):
+        """CSV 파일을 가져옵니다. 마지막으로 가져온 뒤 바뀌지 않았으면 건너뛰고 None을 반환합니다."""
+        mtime = os.path.getmtime(path)
+        source = f'csv:{os.path.abspath(path)}'
+        if not force:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT mtime FROM meal_sources WHERE source = ?', (source,)).fetchone()
+            finally:
+                conn.close()
+            if row and row[0] == mtime:
+                return None
+        return self.ingest(read_csv_records(path), source, mtime)
+
+    def prefetch_year(self, year, api_key=None, session=None):
+        """NEIS에서 한 학년도 전체 급식을 가져와 저장합니다."""
+        api_key = api_key or Config.NEIS_API_KEY
+        if not api_key:
+            raise ValueError('NEIS_API_KEY가 설정되지 않았습니다.')
+        start, end = school_year_range(year)
+        records = fetch_neis_records(api_key, start, end, session)
+        return self.ingest(records, f'neis:{start.isoformat()}~{end.isoformat()}')
+
+    # 조회
+    def get_meals(self, start, end, meal_code=LUNCH):
+        """
+        기간의 급식을 날짜순으로 반환합니다.
+
+        Returns:
+            [{'date', 'calories', 'nutrients', 'allergen_mask', 'dishes': [{'name', 'allergen_mask'}]}]
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(f'''SELECT meal_date, calories, {', '.join(NUTRIENT_FIELDS)}, allergen_mask
+                                    FROM meals WHERE meal_code = ? AND meal_date BETWEEN ? AND ?
+                                    ORDER BY meal_date''',
+                                (meal_code, str(start), str(end))).fetchall()
+            dishes = {}
+            for meal_date, name, mask in conn.execute('''SELECT meal_date, name, allergen_mask FROM meal_dishes
+                                                         WHERE meal_code = ? AND meal_date BETWEEN ? AND ?
+                                                         ORDER BY meal_date, position''',
+                                                      (meal_code, str(start), str(end))):
+                dishes.setdefault(meal_date, []).append({'name': name, 'allergen_mask': mask})
+        finally:
+            conn.close()
+        meals = []
+        for row in rows:
+            meals.append({
+                'date': row[0],
+                'calories': row[1],
+                'nutrients': dict(zip(NUTRIENT_FIELDS, row[2:2 + len(NUTRIENT_FIELDS)])),
+                'allergen_mask': row[-1],
+                'dishes': dishes.get(row[0], [])
+            })
+        return meals
+
+    def nutrition_rows(self, meal_code=LUNCH):
+        """날짜순 (meal_date, calories, 영양소...) 행 전체를 반환합니다 (영양 분석 행렬용)."""
+        conn = self._connect()
+        try:
+            return conn.execute(f'''SELECT meal_date, calories, {', '.join(NUTRIENT_FIELDS)}
+                                    FROM meals WHERE meal_code = ? ORDER BY meal_date''', (meal_code,)).fetchall()
+        finally:
+            conn.close()
+
+    def dish_rows(self, meal_code=LUNCH):
+        """날짜·순서대로 (meal_date, name, allergen_mask) 행 전체를 반환합니다 (알레르기 인덱스용)."""
+        conn = self._connect()
+        try:
+            return conn.execute('''SELECT meal_date, name, allergen_mask FROM meal_dishes
+                                   WHERE meal_code = ? ORDER BY meal_date, position''', (meal_code,)).fetchall()
+        finally:
+            conn.close()
+
+    # 메트릭
+    def stats(self):
+        conn = self._connect()
+        try:
+            count, first, last = conn.execute('SELECT COUNT(*), MIN(meal_date), MAX(meal_date) FROM meals').fetchone()
+            sources = [{'source': s, 'meals': n, 'ingested_at': at}
+                       for s, n, at in conn.execute('SELECT source, meals, ingested_at FROM meal_sources')]
+        finally:
+            conn.close()
+        return {'meals': count, 'first_date': first, 'last_date': last, 'version': self.version(), 'sources': sources}
+
+
+# 요청 추적 중이면 급식 저장소 조회마다 span
+tracer.instrument(MealStore, 'meal_store', exclude=('stats', 'version'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='급식 데이터를 저장소로 미리 가져오기')
+    sub = parser.add_subparsers(dest='command', required=True)
+    csv_parser = sub.add_parser('csv', help='food_calender.csv 형식 파일 가져오기')
+    csv_parser.add_argument('path')
+    neis_parser = sub.add_parser('neis', help='NEIS에서 학년도 전체 가져오기')
+    neis_parser.add_argument('--year', type=int, default=None, help='학년도 (기본: 현재 학년도)')
+    parser.add_argument('--db', default=Config.MEAL_DB_PATH)
+    args = parser.parse_args(argv)
+
+    store = MealStore(args.db)
+    store.init()
+    started = time.time()
+    if args.command == 'csv':
+        count = store.ingest_csv(args.path, force=True)
+    else:
+        today = date.today()
+        year = args.year or (today.year if today.month >= 3 else today.year - 1)
+        count = store.prefetch_year(year)
+    print(f'✅ 급식 {count}건 저장 ({(time.time() - started) * 1000:.0f}ms): {args.db}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+프로세스 내 메트릭 레지스트리
+카운터/게이지와 호출 시점에 값을 계산하는 provider를 모아 /api/metrics로 노출합니다.
+"""
+
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_providers = {}
+
+
+def incr(name, value=1):
+    """카운터를 증가시킵니다."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name, value):
+    """게이지 값을 설정합니다."""
+    with _lock:
+        _gauges[name] = value
+
+
+def register(name, provider):
+    """
+    스냅샷 시점에 호출될 provider를 등록합니다.
+
+    Args:
+        name: 메트릭 그룹 이름
+        provider: 인자 없이 호출되어 딕셔너리를 반환하는 함수
+    """
+    with _lock:
+        _providers[name] = provider
+
+
+def snapshot():
+    """현재 메트릭 값을 딕셔너리로 반환합니다."""
+    with _lock:
+        result = {'counters': dict(_counters), 'gauges': dict(_gauges)}
+        providers = list(_providers.items())
+    for name, provider in providers:
+        try:
+            result[name] = provider()
+        except Exception as e:
+            result[name] = {'error': str(e)}
+    return result
@@ -0,0 +1,318 @@
+"""
+Write-behind 아웃박스
+모든 쓰기는 SQLite에 먼저 커밋되고, 같은 트랜잭션에서 outbox 테이블에 기록된
+변경 사항을 백그라운드 스레드가 Supabase로 순서대로 배치 전송합니다.
+
+- upsert: 로컬 id를 그대로 사용하는 upsert(on_conflict=id)라서 재전송해도 결과가 같습니다.
+- delete: `in_` 조건 삭제라서 재전송해도 결과가 같습니다.
+- 실패한 배치는 지수 백오프 후 재시도하며, 순서를 지키기 위해 뒤의 항목은 기다립니다.
+"""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# 로컬 id를 Supabase와 공유하는 테이블 (FK 순서대로)
+SYNCED_TABLES = ('yaja_students', 'hagteugsa', 'hagteugsa_members', 'suhang')
+
+
+def init_outbox(cursor):
+    """outbox 테이블을 생성합니다. init_db()에서 호출합니다."""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idempotency_key TEXT NOT NULL UNIQUE,
+        table_name TEXT NOT NULL,
+        op TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        leased_until REAL NOT NULL DEFAULT 0,
+        last_error TEXT
+    )''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbox_status_id ON outbox (status, id)')
+
+
+def pending_changes(cursor):
+    """
+    아직 Supabase에 반영되지 않은 변경 사항을 테이블별로 모읍니다.
+    dead 항목도 로컬이 최신이므로 포함합니다.
+
+    Returns:
+        (upserts, deletes): {테이블: id 집합}, {테이블: {컬럼: 값 집합}}
+    """
+    upserts, deletes = {}, {}
+    for table_name, op, payload in cursor.execute('SELECT table_name, op, payload FROM outbox'):
+        payload = json.loads(payload)
+        if op == 'upsert':
+            upserts.setdefault(table_name, set()).add(payload['id'])
+        else:
+            deletes.setdefault(table_name, {}).setdefault(payload['column'], set()).add(payload['value'])
+    return upserts, deletes
+
+
+class OutboxReplayer:
+    def __init__(self, db_path, db_manager, enabled=True, batch_size=100, interval=1.0,
+                 base_backoff=1.0, max_backoff=300.0, max_attempts=50, lease_seconds=30.0):
+        self.db_path = db_path
+        self.db_manager = db_manager
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.interval = interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # 전송과 읽기 복제본 동기화가 겹치지 않도록 잡는 락
+        self.lock = threading.Lock()
+        self._sequences_aligned = False
+        self.last_success_at = None
+        self.last_replay_lag = None
+        self.last_error = None
+
+    def is_active(self):
+        """Supabase가 연결되어 있고 아웃박스가 켜져 있을 때만 변경 사항을 기록합니다."""
+        return self.enabled and self.db_manager.is_connected()
+
+    # 쓰기 경로
+    def enqueue(self, cursor, table_name, op, payload):
+        """
+        호출자의 트랜잭션 안에서 변경 사항을 기록합니다.
+
+        Args:
+            cursor: 로컬 쓰기를 수행한 같은 커넥션의 커서
+            table_name: Supabase 테이블 이름
+            op: 'upsert' (payload=행 전체, id 포함) 또는 'delete' (payload={'column', 'value'})
+        """
+        if not self.is_active():
+            return
+        self._check_aligned()
+        if op == 'upsert':
+            key = f"{table_name}:upsert:{payload['id']}"
+        elif op == 'delete':
+            key = f"{table_name}:delete:{payload['column']}={payload['value']}"
+        else:
+            raise ValueError(f'알 수 없는 아웃박스 작업: {op}')
+        cursor.execute('''INSERT OR IGNORE INTO outbox (idempotency_key, table_name, op, payload, created_at)
+                          VALUES (?, ?, ?, ?, ?)''',
+                       (key, table_name, op, json.dumps(payload, ensure_ascii=False), time.time()))
+
+    def enqueue_many(self, cursor, table_name, payloads):
+        """여러 행의 upsert를 한 번의 executemany로 기록합니다 (일괄 가져오기용)."""
+        if not self.is_active() or not payloads:
+            return
+        self._check_aligned()
+        now = time.time()
+        cursor.executemany('''INSERT OR IGNORE INTO outbox (idempotency_key, table_name, op, payload, created_at)
+                              VALUES (?, ?, ?, ?, ?)''',
+                           [(f"{table_name}:upsert:{payload['id']}", table_name, 'upsert',
+                             json.dumps(payload, ensure_ascii=False), now) for payload in payloads])
+
+    def _check_aligned(self):
+        # 맞추기 전에 만든 로컬 id는 Supabase에만 있는 행과 겹쳐 upsert(on_conflict=id)가 덮어쓸 수 있으므로
+        # 호출자의 트랜잭션이 커밋되지 않도록 예외로 막음 (리플레이어가 다시 맞추면 풀림)
+        if not self._sequences_aligned:
+            raise RuntimeError('Supabase와 id 순서를 맞추는 중입니다. 잠시 후 다시 시도하세요.')
+
+    def prepare(self):
+        """요청을 받기 전에 id 순서를 맞춥니다. 실패하면 로그만 남기고 리플레이어가 다시 시도합니다."""
+        if not self.is_active():
+            return
+        try:
+            self.align_sequences()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error('Supabase id 순서 맞추기 실패, 맞출 때까지 쓰기를 거절합니다: %s', e)
+
+    def notify(self):
+        """커밋 직후 호출하여 리플레이어를 깨웁니다."""
+        if not self.is_active():
+            return
+        self.start()
+        self._wake.set()
+
+    # 백그라운드 스레드
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='outbox-replayer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            processed = 0
+            if self.is_active():
+                try:
+                    if not self._sequences_aligned:
+                        self.align_sequences()
+                    processed = self.drain_once()
+                except Exception as e:
+                    self.last_error = str(e)
+                    logger.error('아웃박스 처리 실패: %s', e)
+            if not processed:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+    def align_sequences(self):
+        """
+        로컬 AUTOINCREMENT가 Supabase의 최대 id보다 뒤에서 시작하도록 맞춥니다.
+        아웃박스 이전에 Supabase에만 쓰인 행과 id가 겹치지 않게 하기 위함입니다.
+        """
+        client = self.db_manager.supabase
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            for table in SYNCED_TABLES:
+                resp = client.table(table).select('id').order('id', desc=True).limit(1).execute()
+                remote_max = resp.data[0]['id'] if resp.data else 0
+                row = conn.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()
+                if row is None:
+                    conn.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (table, remote_max))
+                elif row[0] < remote_max:
+                    conn.execute('UPDATE sqlite_sequence SET seq = ? WHERE name = ?', (remote_max, table))
+            conn.commit()
+            self._sequences_aligned = True
+        finally:
+            conn.close()
+
+    def _claim(self, conn, now):
+        """
+        다른 워커가 처리 중이 아니면 맨 앞부터 batch_size개를 임대합니다.
+        맨 앞 항목이 백오프 중이면 순서를 지키기 위해 아무것도 가져오지 않습니다.
+        """
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            busy = conn.execute('SELECT 1 FROM outbox WHERE leased_until > ? LIMIT 1', (now,)).fetchone()
+            if busy:
+                conn.rollback()
+                return []
+            rows = conn.execute('''SELECT id, table_name, op, payload, attempts, created_at, next_attempt_at
+                                   FROM outbox WHERE status = 'pending' ORDER BY id LIMIT ?''',
+                                (self.batch_size,)).fetchall()
+            if not rows or rows[0][6] > now:
+                conn.rollback()
+                return []
+            ids = [row[0] for row in rows]
+            conn.execute(f"UPDATE outbox SET leased_until = ? WHERE id IN ({','.join('?' * len(ids))})",
+                         [now + self.lease_seconds] + ids)
+            conn.commit()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+
+    @staticmethod
+    def _group(rows):
+        """같은 테이블·작업·컬럼 구성이 연속된 항목을 하나의 요청으로 묶습니다."""
+        groups = []
+        for row in rows:
+            entry_id, table_name, op, payload, attempts, created_at, _ = row
+            payload = json.loads(payload)
+            shape = tuple(sorted(payload)) if op == 'upsert' else payload['column']
+            key = (table_name, op, shape)
+            if groups and groups[-1]['key'] == key:
+                groups[-1]['entries'].append((entry_id, payload, attempts, created_at))
+            else:
+                groups.append({'key': key, 'entries': [(entry_id, payload, attempts, created_at)]})
+        return groups
+
+    def _push(self, group):
+        table_name, op, shape = group['key']
+        payloads = [payload for _, payload, _, _ in group['entries']]
+        table = self.db_manager.supabase.table(table_name)
+        if op == 'upsert':
+            table.upsert(payloads, on_conflict='id').execute()
+        else:
+            table.delete().in_(shape, [p['value'] for p in payloads]).execute()
+
+    def drain_once(self):
+        """배치 하나를 처리하고 성공적으로 반영한 항목 수를 반환합니다."""
+        with self.lock:
+            return self._drain_locked()
+
+    def _drain_locked(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            now = time.time()
+            rows = self._claim(conn, now)
+            if not rows:
+                return 0
+            done = []
+            for group in self._group(rows):
+                ids = [entry_id for entry_id, _, _, _ in group['entries']]
+                try:
+                    self._push(group)
+                except Exception as e:
+                    self._record_failure(conn, group, e)
+                    break
+                done.extend(ids)
+                self.last_replay_lag = time.time() - max(c for _, _, _, c in group['entries'])
+            if done:
+                conn.execute(f"DELETE FROM outbox WHERE id IN ({','.join('?' * len(done))})", done)
+                self.last_success_at = time.time()
+                metrics.incr('outbox.replayed', len(done))
+            metrics.incr('outbox.batches')
+            # 처리하지 못한 나머지 항목의 임대를 해제합니다.
+            conn.execute('UPDATE outbox SET leased_until = 0 WHERE leased_until > 0')
+            return len(done)
+        finally:
+            conn.close()
+
+    def _record_failure(self, conn, group, error):
+        self.last_error = str(error)
+        metrics.incr('outbox.failed_attempts')
+        attempts = max(a for _, _, a, _ in group['entries']) + 1
+        ids = [entry_id for entry_id, _, _, _ in group['entries']]
+        placeholders = ','.join('?' * len(ids))
+        if attempts >= self.max_attempts:
+            conn.execute(f"UPDATE outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id IN ({placeholders})",
+                         [attempts, str(error)] + ids)
+            metrics.incr('outbox.dead_lettered', len(ids))
+            logger.error('아웃박스 항목 %d개를 dead 처리했습니다: %s', len(ids), error)
+            return
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+        delay *= random.uniform(0.5, 1.0)
+        conn.execute(f'''UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?
+                         WHERE id IN ({placeholders})''',
+                     [attempts, time.time() + delay, str(error)] + ids)
+        logger.warning('아웃박스 전송 실패 (%d회), %.1f초 후 재시도: %s', attempts, delay, error)
+
+    # 메트릭
+    def stats(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            pending, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE status = 'pending'").fetchone()
+            dead = conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'dead'").fetchone()[0]
+        finally:
+            conn.close()
+        now = time.time()
+        return {
+            'active': self.is_active(),
+            'sequences_aligned': self._sequences_aligned,
+            'queue_depth': pending,
+            'dead': dead,
+            'lag_seconds': round(now - oldest, 3) if oldest else 0.0,
+            'last_replay_lag_seconds': round(self.last_replay_lag, 3) if self.last_replay_lag is not None else None,
+            'last_success_age_seconds': round(now - self.last_success_at, 3) if self.last_success_at else None,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,183 @@
+"""
+요청 단위 프로파일링
+운영 중 느린 라우트의 시간이 Supabase, SQLite, pandas, 직렬화 중 어디에 쓰이는지 보기 위해
+요청 하나를 프로파일러로 감싸고 결과를 파일로 남깁니다. 기본은 꺼져 있습니다.
+
+- mode='sample': 별도 스레드가 interval마다 요청 스레드의 스택을 찍어 collapsed stack
+  (`a;b;c 횟수`, flamegraph.pl·speedscope 입력)으로 저장합니다. 부하가 작습니다.
+- mode='cprofile': cProfile로 모든 호출을 기록해 .prof(pstats, snakeviz 입력)로 저장합니다.
+- 관리자 헤더가 있는 요청이나 sample_rate 비율의 요청만 프로파일링하며,
+  최근 keep개만 남기고 오래된 파일은 지웁니다.
+"""
+
+import collections
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+MODES = ('sample', 'cprofile')
+
+
+class StackSampler:
+    """한 스레드의 스택을 주기적으로 찍어 (스택 문자열 -> 횟수)로 모읍니다."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class Session:
+    """진행 중인 요청 하나의 프로파일."""
+
+    def __init__(self, mode, interval):
+        self.mode = mode
+        # 응답 헤더(X-Profile-Id)를 저장 전에 보낼 수 있도록 시작할 때 정함
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.started = time.perf_counter()
+        if mode == 'cprofile':
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            self.profile = StackSampler(threading.get_ident(), interval)
+            self.profile.start()
+
+    def stop(self):
+        if self.mode == 'cprofile':
+            self.profile.disable()
+        else:
+            self.profile.stop()
+        return (time.perf_counter() - self.started) * 1000
+
+    def dump(self, path_base):
+        if self.mode == 'cprofile':
+            path = path_base + '.prof'
+            self.profile.dump_stats(path)
+        else:
+            path = path_base + '.collapsed'
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.profile.collapsed())
+        return path
+
+
+class RequestProfiler:
+    def __init__(self, directory, enabled=False, sample_rate=0.0, mode='sample', interval_ms=5.0, keep=100):
+        """
+        Args:
+            directory: 프로파일 파일을 쓸 디렉터리
+            enabled: False면 어떤 요청도 프로파일링하지 않음
+            sample_rate: 관리자 헤더 없이도 프로파일링할 요청 비율 (0~1)
+            mode: 'sample' 또는 'cprofile'
+            interval_ms: sample 모드에서 스택을 찍는 간격
+            keep: 남겨 둘 최근 프로파일 수
+        """
+        if mode not in MODES:
+            raise ValueError(f'알 수 없는 프로파일 모드: {mode}')
+        self.directory = directory
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval = interval_ms / 1000
+        self.keep = keep
+        self._profiles = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.started = 0
+        self.skipped = 0
+
+    def should_profile(self, requested):
+        """requested(관리자 헤더로 요청)이거나 표본에 뽑히면 True."""
+        if not self.enabled:
+            return False
+        return requested or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def start(self):
+        """현재 스레드의 프로파일을 시작합니다. 시작할 수 없으면 None."""
+        try:
+            session = Session(self.mode, self.interval)
+        except ValueError:
+            # Python 3.12+의 cProfile은 프로세스에 하나만 켤 수 있음
+            self.skipped += 1
+            return None
+        self.started += 1
+        return session
+
+    def finish(self, session, method, route, status):
+        """프로파일을 멈추고 파일로 저장한 뒤 목록 항목을 반환합니다."""
+        duration = session.stop()
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = session.id
+        path = session.dump(os.path.join(self.directory, profile_id))
+        entry = {
+            'id': profile_id,
+            'method': method,
+            'route': route,
+            'status': status,
+            'duration_ms': round(duration, 1),
+            'mode': self.mode,
+            'file': os.path.basename(path),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        with self._lock:
+            self._profiles[profile_id] = entry
+            expired = []
+            while len(self._profiles) > self.keep:
+                expired.append(self._profiles.popitem(last=False)[1])
+        for old in expired:
+            try:
+                os.remove(os.path.join(self.directory, old['file']))
+            except OSError:
+                pass
+        return entry
+
+    def slowest(self, limit=20, route=None):
+        """최근 프로파일을 느린 순으로 반환합니다."""
+        with self._lock:
+            entries = [e for e in self._profiles.values() if route is None or e['route'] == route]
+        return sorted(entries, key=lambda e: e['duration_ms'], reverse=True)[:limit]
+
+    def path(self, profile_id):
+        """프로파일 파일 경로 (없으면 None)."""
+        with self._lock:
+            entry = self._profiles.get(profile_id)
+        return os.path.join(self.directory, entry['file']) if entry else None
+
+    # 메트릭
+    def stats(self):
+        with self._lock:
+            kept = len(self._profiles)
+        return {
+            'enabled': self.enabled,
+            'mode': self.mode,
+            'sample_rate': self.sample_rate,
+            'started': self.started,
+            'skipped': self.skipped,
+            'kept': kept
+        }
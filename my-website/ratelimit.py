@@ -0,0 +1,187 @@
+"""
+클라이언트별 요청 제한 (토큰 버킷)
+탭 하나가 /api/yaja/list, /api/yaja/statistics 등을 계속 호출해 Supabase 요청 한도를 다 쓰지 않도록
+(클라이언트, 라우트)마다 버킷을 두고, 토큰이 없으면 429와 Retry-After로 응답합니다.
+클라이언트는 세션 쿠키의 id로 구분하고, 쿠키가 없으면 IP로 구분합니다 (flask_app.limit_request_rate).
+
+- 버킷은 초당 rate개씩 채워지고 최대 burst개까지 쌓입니다. 요청마다 1개를 씁니다.
+- 라우트별 예산은 'rule=rate/burst'를 쉼표로 이은 문자열로 정합니다. 예: '/api/yaja/statistics=1/10'
+- 기본은 프로세스 메모리의 딕셔너리이며, shared_path를 주면 같은 서버의 여러 워커가
+  SQLite 파일 하나로 버킷을 공유합니다 (요청마다 UPSERT 한 번).
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+
+
+def parse_limit(value):
+    """'rate/burst' (예: '2/20')를 (초당 토큰, 최대 토큰)으로 바꿉니다."""
+    rate, _, burst = value.partition('/')
+    rate = float(rate)
+    burst = float(burst) if burst else max(1.0, rate)
+    if rate <= 0 or burst < 1:
+        raise ValueError(f'잘못된 요청 제한: {value}')
+    return rate, burst
+
+
+def parse_rules(value):
+    """'rule=rate/burst,...'를 {rule: (rate, burst)}로 바꿉니다."""
+    rules = {}
+    for part in (value or '').split(','):
+        if part.strip():
+            rule, _, limit = part.strip().rpartition('=')
+            rules[rule] = parse_limit(limit)
+    return rules
+
+
+class MemoryBuckets:
+    """프로세스 안에서만 공유하는 버킷 (요청당 수 마이크로초)."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        # key -> [남은 토큰, 마지막 갱신 시각]
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """토큰 하나를 씁니다. 남은 토큰 수(허용) 또는 -기다릴 초(거절)를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                self._buckets[key] = [burst - 1, now, rate, burst]
+                return burst - 1
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return bucket[0]
+            bucket[0] = tokens
+            return -(1 - tokens) / rate
+
+    def _prune(self, now):
+        # 다 채워진(한동안 요청이 없던) 버킷은 지워도 결과가 같음
+        full = [key for key, (tokens, updated, rate, burst) in self._buckets.items()
+                if tokens + (now - updated) * rate >= burst]
+        for key in full:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBuckets:
+    """같은 서버의 여러 워커 프로세스가 공유하는 버킷 (SQLite 파일, 요청당 UPSERT 한 번)."""
+
+    # 한 문장으로 채우기·차감: 토큰이 부족하면 갱신하지 않고 아무 행도 반환하지 않음
+    TAKE_SQL = '''
+        INSERT INTO buckets (key, tokens, updated) VALUES (:key, :burst - 1, :now)
+        ON CONFLICT(key) DO UPDATE SET
+            tokens = min(:burst, tokens + (:now - updated) * :rate) - 1,
+            updated = :now
+        WHERE min(:burst, tokens + (:now - updated) * :rate) >= 1
+        RETURNING tokens
+    '''
+
+    def __init__(self, path, idle_seconds=3600):
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self._local = threading.local()
+        self._calls = 0
+        conn = self._connect()
+        conn.execute('''CREATE TABLE IF NOT EXISTS buckets (
+                            key TEXT PRIMARY KEY,
+                            tokens REAL NOT NULL,
+                            updated REAL NOT NULL
+                        ) WITHOUT ROWID''')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            # 스레드·프로세스(fork)마다 커넥션 하나, 자동 커밋
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # 버킷 상태는 잃어도 되므로 커밋마다 fsync하지 않음
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, rate, burst):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(self.TAKE_SQL, {'key': key, 'rate': rate, 'burst': burst, 'now': now}).fetchone()
+        self._calls += 1
+        if self._calls % 10000 == 0:
+            conn.execute('DELETE FROM buckets WHERE updated < ?', (now - self.idle_seconds,))
+        if row is not None:
+            return row[0]
+        tokens, updated = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+        tokens = min(burst, tokens + (now - updated) * rate)
+        return -(1 - tokens) / rate
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM buckets').fetchone()[0]
+
+
+class RateLimiter:
+    def __init__(self, rules=None, default=None, shared_path=None, enabled=True):
+        """
+        Args:
+            rules: {라우트 규칙: (rate, burst)} (예: {'/api/yaja/list/<date>': (2, 20)})
+            default: 규칙에 없는 라우트의 (rate, burst), None이면 제한 없음
+            shared_path: 여러 워커가 공유할 SQLite 파일 (없으면 프로세스 메모리)
+        """
+        self.rules = dict(rules or {})
+        self.default = default
+        self.enabled = enabled
+        self.buckets = SQLiteBuckets(shared_path) if shared_path else MemoryBuckets()
+        self.allowed = 0
+        self.limited = 0
+
+    def limit_for(self, rule):
+        return self.rules.get(rule, self.default)
+
+    def check(self, client, rule, clients=1):
+        """
+        요청 하나를 셉니다.
+
+        Args:
+            client: 버킷 키 (세션 또는 IP)
+            rule: 라우트 규칙
+            clients: 이 키를 함께 쓰는 클라이언트 수 (IP로 셀 때), 예산을 그만큼 늘림
+
+        Returns:
+            None이면 허용, 아니면 Retry-After로 보낼 초(정수)
+        """
+        if not self.enabled:
+            return None
+        limit = self.limit_for(rule)
+        if limit is None:
+            return None
+        rate, burst = limit
+        remaining = self.buckets.take(f'{client}|{rule}', rate * clients, burst * clients)
+        if remaining >= 0:
+            self.allowed += 1
+            return None
+        self.limited += 1
+        return max(1, math.ceil(-remaining))
+
+    # 메트릭
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'store': 'sqlite' if isinstance(self.buckets, SQLiteBuckets) else 'memory',
+            'buckets': len(self.buckets),
+            'allowed': self.allowed,
+            'limited': self.limited,
+            'default': list(self.default) if self.default else None,
+            'rules': {rule: list(limit) for rule, limit in self.rules.items()}
+        }
@@ -0,0 +1,315 @@
+"""
+로컬 읽기 복제본
+읽기 API는 SQLite 테이블을 Supabase의 복제본으로 보고 직접 조회합니다.
+백그라운드 스레드가 id 기준으로 새 행을 주기적으로 가져오고,
+몇 번에 한 번씩 전체 id 목록을 비교해 빠진 행과 삭제된 행을 맞춥니다.
+
+- 아직 아웃박스에 남아 있는 로컬 변경은 Supabase보다 최신이므로 덮어쓰지 않습니다.
+- 동기화는 아웃박스 전송과 같은 락을 잡아, 전송 직후의 행이 삭제되거나 되살아나지 않게 합니다.
+- 마지막 동기화가 max_staleness보다 오래되면 읽기 요청에서 동기화를 한 번 기다립니다.
+  단, 직전 동기화가 실패한 상태(Supabase 장애)라면 기다리지 않고 마지막 데이터로 응답합니다.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import metrics
+from outbox import SYNCED_TABLES, pending_changes
+
+logger = logging.getLogger(__name__)
+
+# SQLite CURRENT_TIMESTAMP와 같은 형식으로 맞출 컬럼
+TIMESTAMP_COLUMNS = ('created_at', 'joined_at')
+# class_id가 없는 Supabase 행이 로컬에 들어갈 때의 반 (로컬 스키마 기본값과 같음)
+LEGACY_CLASS_ID = '1-5'
+# 동기화로 바뀐 행을 알려 줄 테이블과 알려 줄 컬럼 (캐시·인덱스 무효화용)
+TRACKED_KEYS = {
+    'yaja_students': ('class_id', 'date'),
+    'suhang': ('class_id',),
+}
+
+
+def normalize_timestamp(value):
+    """Supabase의 ISO 8601 시각을 SQLite 기본 형식(UTC 'YYYY-MM-DD HH:MM:SS')으로 바꿉니다."""
+    if not isinstance(value, str) or 'T' not in value:
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return value
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ReadReplica:
+    def __init__(self, db_path, db_manager, outbox, enabled=True, interval=5.0, max_staleness=30.0,
+                 reconcile_every=12, page_size=1000, on_yaja_change=None, on_suhang_change=None, archive=None,
+                 timeout=None):
+        self.db_path = db_path
+        self.db_manager = db_manager
+        self.outbox = outbox
+        self.enabled = enabled
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.reconcile_every = max(1, reconcile_every)
+        self.page_size = page_size
+        # 페이지 단위로 많이 읽으므로 요청 처리용보다 긴 Supabase 타임아웃 (None이면 기본값)
+        self.timeout = timeout
+        # 동기화로 야자 기록이 바뀌면 (class_id, date) 집합으로 호출 (통계 캐시 무효화용)
+        self.on_yaja_change = on_yaja_change
+        # 동기화로 수행평가가 바뀌면 class_id 집합으로 호출 (마감일 인덱스 무효화용)
+        self.on_suhang_change = on_suhang_change
+        # 보관 파일로 옮긴 행은 로컬 테이블에 없어도 다시 가져오지 않음
+        self.archive = archive
+        self._watermarks = {}
+        self._columns = {}
+        self._cycles = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.last_synced_at = None
+        self.last_sync_ms = None
+        self.last_error = None
+
+    def is_active(self):
+        """아웃박스가 로컬 쓰기를 Supabase로 보내고 있을 때만 SQLite가 복제본 역할을 합니다."""
+        return self.enabled and self.outbox.is_active()
+
+    def serves_reads(self):
+        """
+        읽기 API가 SQLite에서 바로 응답해도 되는지 반환합니다.
+        복제본이 오래되었으면 응답 전에 동기화를 시도합니다.
+        """
+        if not self.is_active():
+            return False
+        self.start()
+        self.ensure_fresh()
+        return True
+
+    def staleness(self):
+        if self.last_synced_at is None:
+            return None
+        return time.time() - self.last_synced_at
+
+    def _is_fresh(self):
+        staleness = self.staleness()
+        return staleness is not None and staleness <= self.max_staleness
+
+    def ensure_fresh(self):
+        if self._is_fresh():
+            return
+        # Supabase 장애 중에는 요청이 기다리지 않고 마지막 데이터로 응답 (복구는 백그라운드가 담당)
+        if self.last_error is not None:
+            metrics.incr('replica.stale_reads')
+            return
+        with self._sync_lock:
+            # 기다리는 동안 다른 스레드가 동기화했거나 실패했을 수 있음
+            if self._is_fresh():
+                return
+            if self.last_error is not None:
+                metrics.incr('replica.stale_reads')
+                return
+            metrics.incr('replica.sync_on_read')
+            try:
+                self._sync(reconcile=self.last_synced_at is None)
+            except Exception as e:
+                metrics.incr('replica.stale_reads')
+                logger.warning('복제본 동기화 실패, 마지막 데이터로 응답합니다: %s', e)
+
+    # 백그라운드 스레드
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='read-replica', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.is_active():
+                with self._sync_lock:
+                    try:
+                        with self.db_manager.timeout(self.timeout):
+                            self._sync(reconcile=self._cycles % self.reconcile_every == 0)
+                    except Exception as e:
+                        logger.error('복제본 동기화 실패: %s', e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def reset(self):
+        """워터마크와 동기화 상태를 지웁니다. 로컬 DB를 다시 채운 뒤 호출합니다."""
+        with self._sync_lock:
+            self._watermarks.clear()
+            self._cycles = 0
+            self.last_synced_at = None
+            self.last_sync_ms = None
+            self.last_error = None
+
+    def sync_now(self, reconcile=True):
+        """즉시 동기화합니다 (시작 직후 채우기·벤치마크용)."""
+        with self._sync_lock, self.db_manager.timeout(self.timeout):
+            self._sync(reconcile=reconcile)
+
+    # 동기화
+    def _sync(self, reconcile):
+        started = time.time()
+        self._cycles += 1
+        client = self.db_manager.supabase
+        try:
+            with self.outbox.lock:
+                conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+                try:
+                    # 네트워크 요청은 SQLite 쓰기 락을 잡기 전에 모두 끝냅니다.
+                    remote = {}
+                    for table in SYNCED_TABLES:
+                        archived = self.archive.archived_ids(table) if self.archive is not None else set()
+                        rows = self._fetch_new(client, table)
+                        remote_ids = None
+                        if reconcile:
+                            remote_ids = self._fetch_ids(client, table)
+                            rows = rows + self._fetch_missing(client, conn, table, remote_ids, rows, archived)
+                        if archived:
+                            rows = [row for row in rows if row['id'] not in archived]
+                        remote[table] = (rows, remote_ids)
+                    conn.execute('BEGIN IMMEDIATE')
+                    upserts, deletes = pending_changes(conn)
+                    touched = {}
+                    for table, (rows, remote_ids) in remote.items():
+                        touched[table] = self._apply(conn, table, rows, remote_ids,
+                                                     upserts.get(table, set()), deletes.get(table, {}))
+                    conn.execute('COMMIT')
+                except Exception:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    raise
+                finally:
+                    conn.close()
+        except Exception as e:
+            self.last_error = str(e)
+            metrics.incr('replica.sync_failures')
+            raise
+        if touched.get('yaja_students') and self.on_yaja_change is not None:
+            self.on_yaja_change(touched['yaja_students'])
+        if touched.get('suhang') and self.on_suhang_change is not None:
+            self.on_suhang_change({key[0] for key in touched['suhang']})
+        self.last_synced_at = started
+        self.last_sync_ms = (time.time() - started) * 1000
+        self.last_error = None
+        metrics.incr('replica.syncs')
+        if reconcile:
+            metrics.incr('replica.reconciles')
+
+    def _fetch_new(self, client, table):
+        """워터마크 이후의 행을 id 순으로 가져옵니다."""
+        cursor = self._watermarks.get(table, 0)
+        rows = []
+        while True:
+            page = client.table(table).select('*').gt('id', cursor).order('id').limit(self.page_size).execute().data
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            cursor = page[-1]['id']
+
+    def _fetch_ids(self, client, table):
+        """전체 id 목록을 가져옵니다. 응답 행 수 제한이 있어도 빈 페이지가 나올 때까지 읽습니다."""
+        ids = set()
+        cursor = 0
+        while True:
+            page = client.table(table).select('id').gt('id', cursor).order('id').limit(self.page_size).execute().data
+            if not page:
+                return ids
+            ids.update(row['id'] for row in page)
+            cursor = page[-1]['id']
+
+    def _fetch_missing(self, client, conn, table, remote_ids, fetched, archived):
+        """워터마크보다 작은 id로 다른 경로에서 추가된 행을 가져옵니다 (보관된 행 제외)."""
+        local_ids = {row[0] for row in conn.execute(f'SELECT id FROM {table}')}
+        missing = sorted(remote_ids - local_ids - archived - {row['id'] for row in fetched})
+        rows = []
+        for i in range(0, len(missing), 100):
+            rows.extend(client.table(table).select('*').in_('id', missing[i:i + 100]).execute().data)
+        return rows
+
+    def _local_columns(self, conn, table):
+        if table not in self._columns:
+            self._columns[table] = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        return self._columns[table]
+
+    @staticmethod
+    def _local_keys(conn, table, key_columns, ids):
+        """로컬 행 id들의 TRACKED_KEYS 컬럼 값을 반환합니다."""
+        keys = set()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            keys.update(conn.execute(f"SELECT {', '.join(key_columns)} FROM {table} "
+                                     f"WHERE id IN ({','.join('?' * len(chunk))})", chunk).fetchall())
+        return keys
+
+    def _apply(self, conn, table, rows, remote_ids, pending_upserts, pending_deletes):
+        """가져온 행을 반영하고, TRACKED_KEYS 테이블이면 바뀐 행의 키 집합을 반환합니다."""
+        columns = self._local_columns(conn, table)
+        key_columns = TRACKED_KEYS.get(table)
+        touched = set()
+        applied = 0
+        for row in rows:
+            self._watermarks[table] = max(self._watermarks.get(table, 0), row['id'])
+            # 아직 전송되지 않은 로컬 변경이 더 최신임
+            if row['id'] in pending_upserts:
+                continue
+            if any(row.get(column) in values for column, values in pending_deletes.items()):
+                continue
+            if key_columns:
+                # 기존 행의 반·날짜가 바뀌는 경우도 있으므로 이전 값도 포함
+                touched |= self._local_keys(conn, table, key_columns, [row['id']])
+                touched.add(tuple(row.get(c, LEGACY_CLASS_ID) if c == 'class_id' else row[c] for c in key_columns))
+            names = [c for c in columns if c in row]
+            values = [normalize_timestamp(row[c]) if c in TIMESTAMP_COLUMNS else row[c] for c in names]
+            updates = ', '.join(f'{c} = excluded.{c}' for c in names if c != 'id')
+            try:
+                conn.execute(f'''INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})
+                                 ON CONFLICT(id) DO UPDATE SET {updates}''', values)
+            except sqlite3.IntegrityError:
+                # Supabase에 남은 중복 야자 기록(같은 날·차시·학생, 다른 id)은 로컬의 기존 행을 유지
+                metrics.incr('replica.rows_conflicted')
+                continue
+            applied += 1
+        removed = 0
+        if remote_ids is not None:
+            local_ids = {r[0] for r in conn.execute(f'SELECT id FROM {table}')}
+            stale = sorted(local_ids - remote_ids - pending_upserts)
+            if key_columns and stale:
+                touched |= self._local_keys(conn, table, key_columns, stale)
+            for i in range(0, len(stale), 500):
+                chunk = stale[i:i + 500]
+                conn.execute(f"DELETE FROM {table} WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            removed = len(stale)
+        if applied:
+            metrics.incr('replica.rows_pulled', applied)
+        if removed:
+            metrics.incr('replica.rows_removed', removed)
+        return touched
+
+    # 메트릭
+    def stats(self):
+        staleness = self.staleness()
+        return {
+            'active': self.is_active(),
+            'staleness_seconds': round(staleness, 3) if staleness is not None else None,
+            'max_staleness_seconds': self.max_staleness,
+            'last_sync_ms': round(self.last_sync_ms, 3) if self.last_sync_ms is not None else None,
+            'watermarks': dict(self._watermarks),
+            'last_error': self.last_error
+        }
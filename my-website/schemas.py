@@ -0,0 +1,231 @@
+"""
+요청 본문 스키마
+POST 라우트의 JSON 본문 필드를 한 번 선언해 두고, 필드마다 변환 함수를 미리 만들어(compile)
+요청마다 그 목록만 돌며 검사·형 변환합니다. 예: periods는 정수 목록, max_members는 정수.
+
+    YAJA_ADD = Schema(date=DateField(), periods=IntListField(min_value=1, max_value=3), ...)
+    data = YAJA_ADD.parse(request.get_json(silent=True))   # 실패하면 SchemaError
+"""
+
+import re
+from datetime import date
+
+# date.fromisoformat은 3.11부터 '20251020', '2025-W43-1'도 받으므로 형식을 먼저 확인
+_DATE_PATTERN = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+# str.isdigit은 '²' 같은 문자도 받으므로 ASCII 숫자만
+_INT_PATTERN = re.compile(r'-?[0-9]+')
+
+
+class SchemaError(ValueError):
+    """본문이 스키마에 맞지 않을 때. 메시지는 그대로 응답 msg로 씁니다."""
+
+    def __init__(self, msg, field=None):
+        super().__init__(msg)
+        self.field = field
+
+
+class _Missing(Exception):
+    pass
+
+
+class Field:
+    def __init__(self, required=True, default=None):
+        self.required = required
+        self.default = default
+
+    def compile(self, name):
+        """값 하나를 변환하는 함수를 반환합니다. 없는 값이면 _Missing, 잘못된 값이면 SchemaError."""
+        raise NotImplementedError
+
+
+class StrField(Field):
+    def __init__(self, max_length=None, strip=True, **kwargs):
+        super().__init__(**kwargs)
+        self.max_length = max_length
+        self.strip = strip
+
+    def compile(self, name):
+        max_length, strip = self.max_length, self.strip
+
+        def convert(value):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            elif not isinstance(value, str):
+                raise SchemaError(f'{name}은(는) 문자열이어야 합니다.', name)
+            if strip:
+                value = value.strip()
+            if not value:
+                raise _Missing
+            if max_length is not None and len(value) > max_length:
+                raise SchemaError(f'{name}은(는) {max_length}자 이하여야 합니다.', name)
+            return value
+        return convert
+
+
+def _to_int(name, value):
+    if isinstance(value, bool):
+        raise SchemaError(f'{name}은(는) 정수여야 합니다.', name)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and _INT_PATTERN.fullmatch(value.strip()):
+        return int(value)
+    raise SchemaError(f'{name}은(는) 정수여야 합니다.', name)
+
+
+def _check_range(name, value, min_value, max_value):
+    if min_value is not None and value < min_value:
+        raise SchemaError(f'{name}은(는) {min_value} 이상이어야 합니다.', name)
+    if max_value is not None and value > max_value:
+        raise SchemaError(f'{name}은(는) {max_value} 이하여야 합니다.', name)
+    return value
+
+
+class IntField(Field):
+    def __init__(self, min_value=None, max_value=None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def compile(self, name):
+        min_value, max_value = self.min_value, self.max_value
+
+        def convert(value):
+            if value == '':
+                raise _Missing
+            return _check_range(name, _to_int(name, value), min_value, max_value)
+        return convert
+
+
+class IntListField(Field):
+    """정수 목록 (문자열 숫자도 허용, 중복은 처음 것만)."""
+
+    def __init__(self, min_value=None, max_value=None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def compile(self, name):
+        min_value, max_value = self.min_value, self.max_value
+
+        def convert(value):
+            if not isinstance(value, list):
+                value = [value]
+            if not value:
+                raise _Missing
+            result = []
+            for item in value:
+                item = _check_range(name, _to_int(name, item), min_value, max_value)
+                if item not in result:
+                    result.append(item)
+            return result
+        return convert
+
+
+class DateField(Field):
+    """'YYYY-MM-DD' 문자열 (달력에 있는 날짜인지 확인하고 같은 형식으로 돌려줌)."""
+
+    def compile(self, name):
+        def convert(value):
+            if not isinstance(value, str):
+                raise SchemaError(f'{name}은(는) YYYY-MM-DD 형식이어야 합니다.', name)
+            value = value.strip()
+            if not value:
+                raise _Missing
+            if not _DATE_PATTERN.fullmatch(value):
+                raise SchemaError(f'{name}은(는) YYYY-MM-DD 형식이어야 합니다.', name)
+            try:
+                return date.fromisoformat(value).isoformat()
+            except ValueError:
+                raise SchemaError(f'{name}은(는) YYYY-MM-DD 형식이어야 합니다.', name)
+        return convert
+
+
+class Schema:
+    def __init__(self, missing_msg='모든 필드를 입력하세요.', **fields):
+        """
+        Args:
+            missing_msg: 필수 필드가 없거나 비었을 때의 메시지 (라우트마다 기존 메시지 유지)
+            fields: 필드 이름 -> Field
+        """
+        self.missing_msg = missing_msg
+        # (이름, 변환 함수, 필수 여부, 기본값)을 미리 만들어 둠
+        self._fields = tuple((name, field.compile(name), field.required, field.default)
+                             for name, field in fields.items())
+
+    def parse(self, data):
+        """본문(dict)을 검사·변환한 새 dict를 반환합니다."""
+        if not isinstance(data, dict):
+            raise SchemaError('JSON 본문이 필요합니다.')
+        result = {}
+        for name, convert, required, default in self._fields:
+            value = data.get(name)
+            if value is not None:
+                try:
+                    result[name] = convert(value)
+                    continue
+                except _Missing:
+                    pass
+            if required:
+                raise SchemaError(self.missing_msg, name)
+            result[name] = default
+        return result
+
+
+# 라우트별 본문 스키마
+SIGNUP = Schema(
+    missing_msg='모든 항목을 입력하세요.',
+    id=StrField(max_length=50, strip=False),
+    name=StrField(max_length=50),
+    password=StrField(strip=False)
+)
+
+LOGIN = Schema(
+    missing_msg='모든 항목을 입력하세요.',
+    id=StrField(max_length=50, strip=False),
+    password=StrField(strip=False)
+)
+
+YAJA_ADD = Schema(
+    date=DateField(),
+    periods=IntListField(min_value=1, max_value=3),
+    student_name=StrField(max_length=50),
+    student_code=StrField(max_length=50),
+    student_number=StrField(max_length=50),
+    reason=StrField(max_length=500)
+)
+
+# 일괄 가져오기(yaja_import.py)의 한 행: 차시 하나, 학생명·학번은 명단에서 채울 수 있음
+YAJA_IMPORT = Schema(
+    date=DateField(),
+    period=IntField(min_value=1, max_value=3),
+    student_code=StrField(max_length=50),
+    student_name=StrField(max_length=50, required=False),
+    student_number=StrField(max_length=50, required=False),
+    reason=StrField(max_length=500)
+)
+
+HAGTEUGSA_CREATE = Schema(
+    title=StrField(max_length=200),
+    description=StrField(max_length=2000),
+    max_members=IntField(min_value=1, max_value=100),
+    creator_name=StrField(max_length=50),
+    creator_code=StrField(max_length=50)
+)
+
+HAGTEUGSA_JOIN = Schema(
+    hagteugsa_id=IntField(min_value=1),
+    member_name=StrField(max_length=50),
+    member_code=StrField(max_length=50)
+)
+
+SUHANG_ADD = Schema(
+    missing_msg='모든 필드를 입력해주세요.',
+    subject=StrField(max_length=50),
+    title=StrField(max_length=200),
+    deadline=DateField(),
+    description=StrField(max_length=2000),
+    creator_name=StrField(max_length=50),
+    creator_code=StrField(max_length=50)
+)
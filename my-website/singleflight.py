@@ -0,0 +1,99 @@
+"""
+동시 요청 합치기 (singleflight)
+조회 시간에 여러 브라우저가 같은 목록을 동시에 요청하면, 같은 인자의 Supabase 조회를 한 번만 실행하고
+기다리던 호출들이 그 결과를 함께 받습니다. 끝난 결과는 보관하지 않으므로 캐시와 달리 오래된 데이터를 주지 않습니다.
+
+결과 객체는 기다리던 호출들이 함께 쓰므로 호출하는 쪽에서 수정하지 않아야 합니다.
+"""
+
+import functools
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """key가 같은 호출이 실행 중이면 그 결과를 기다리고, 아니면 func를 실행합니다."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # 결과를 채운 뒤 목록에서 빼야, 그 사이에 들어온 호출도 같은 결과를 받음
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    # 메트릭
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        total = self.executed + self.shared
+        return {
+            'in_flight': in_flight,
+            'executed': self.executed,
+            'shared': self.shared,
+            'shared_ratio': round(self.shared / total, 4) if total else None
+        }
+
+
+def _freeze(value):
+    """집합·리스트 인자(예: granularity)도 키가 되도록 바꿉니다."""
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def coalesced(method):
+    """
+    DatabaseManager 조회 메서드용 데코레이터. (메서드 이름, 인자)가 같은 동시 호출을 합칩니다.
+    인스턴스의 singleflight 속성(SingleFlight)을 사용하며, 없으면 그대로 실행합니다.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        flight = getattr(self, 'singleflight', None)
+        if flight is None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, tuple(_freeze(a) for a in args),
+               tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            # 해시할 수 없는 인자는 합치지 않음
+            return method(self, *args, **kwargs)
+        return flight.do(key, method, self, *args, **kwargs)
+    return wrapper
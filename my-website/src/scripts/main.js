@@ -0,0 +1,52 @@
+// 첫 화면 대시보드: 오늘 급식, 오늘 야자 불참, 마감 임박 수행평가, 학특사 현황을 한 번에 불러옴
+document.addEventListener('DOMContentLoaded', async function() {
+    const container = document.getElementById('dashboard');
+    if (!container) return;
+
+    const escapeHtml = (text) => String(text).replace(/[&<>"']/g, (ch) => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+
+    function card(title, href, body) {
+        return `<a href="${href}" class="dashboard-card"><h2>${title}</h2>${body}</a>`;
+    }
+
+    function mealCard(meal) {
+        if (meal.error) return card('오늘 급식', 'pages/food_calender.html', '<p>급식 정보를 불러오지 못했습니다.</p>');
+        const menu = meal.menu.length ? meal.menu.map(escapeHtml).join(', ') : '오늘은 급식이 없습니다.';
+        return card('오늘 급식', 'pages/food_calender.html', `<p>${menu}</p><small>${escapeHtml(meal.calories)}</small>`);
+    }
+
+    function yajaCard(yaja) {
+        if (yaja.error) return card('오늘 야자 불참', 'pages/yaga_ganri.html', '<p>불러오지 못했습니다.</p>');
+        const periods = [1, 2, 3].map(p => `${p}차시 ${(yaja.periods[p] || []).length}명`).join(' · ');
+        return card('오늘 야자 불참', 'pages/yaga_ganri.html', `<p>${yaja.count}명</p><small>${periods}</small>`);
+    }
+
+    function suhangCard(suhang) {
+        if (suhang.error) return card('마감 임박 수행평가', 'pages/suhang.html', '<p>불러오지 못했습니다.</p>');
+        if (!suhang.items.length) return card('마감 임박 수행평가', 'pages/suhang.html', `<p>${suhang.days}일 안에 마감되는 수행평가가 없습니다.</p>`);
+        const items = suhang.items.slice(0, 3).map(item => {
+            const left = item.days_left === 0 ? '오늘 마감' : `D-${item.days_left}`;
+            return `<li class="${item.status}">[${escapeHtml(item.subject)}] ${escapeHtml(item.title)} <b>${left}</b></li>`;
+        }).join('');
+        return card('마감 임박 수행평가', 'pages/suhang.html', `<ul>${items}</ul>`);
+    }
+
+    function hagteugsaCard(hagteugsa) {
+        if (hagteugsa.error) return card('학급특색사업', 'pages/hagteugsa.html', '<p>불러오지 못했습니다.</p>');
+        return card('학급특색사업', 'pages/hagteugsa.html',
+            `<p>모집 중 ${hagteugsa.open} / 전체 ${hagteugsa.count}</p><small>참여 ${hagteugsa.members}명 (정원 ${hagteugsa.capacity}명)</small>`);
+    }
+
+    try {
+        const response = await fetch('/api/dashboard');
+        const result = await response.json();
+        if (!result.success) return;
+        const data = result.data;
+        container.innerHTML = mealCard(data.meal) + yajaCard(data.yaja) + suhangCard(data.suhang) + hagteugsaCard(data.hagteugsa);
+        container.hidden = false;
+    } catch (error) {
+        console.error('대시보드 불러오기 실패:', error);
+    }
+});
@@ -0,0 +1,116 @@
+"""
+야자 통계 결과 캐시
+같은 반·기간·집계 단위·섹션·형식의 /api/yaja/statistics 응답(JSON 본문)을 LRU로 보관합니다.
+야자 기록이 추가·삭제되면 바뀐 날짜를 포함하는 기간의 항목만 지웁니다.
+
+반마다 버전 번호를 두어, 계산 도중 쓰기가 끼어든 결과는 저장하지 않습니다.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+
+
+def normalize_date(value):
+    """'2025-3-4'처럼 자리수가 다른 날짜도 같은 키가 되도록 'YYYY-MM-DD'로 맞춥니다."""
+    if not value:
+        return ''
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        parts = value.split('-')
+        if len(parts) == 3 and all(p.isdigit() for p in parts):
+            try:
+                return date(int(parts[0]), int(parts[1]), int(parts[2])).isoformat()
+            except ValueError:
+                pass
+        return value
+
+
+class StatsCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(class_id, start_date, end_date, granularity, fields=(), fmt='object'):
+        return (class_id, normalize_date(start_date), normalize_date(end_date), tuple(sorted(granularity)),
+                tuple(sorted(fields)), fmt)
+
+    def get(self, key):
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def version(self, class_id):
+        """계산을 시작하기 전에 읽어 두고 put()에 넘깁니다."""
+        with self._lock:
+            return self._versions.get(class_id, 0)
+
+    def put(self, key, value, version):
+        """계산하는 동안 같은 반에 쓰기가 없었을 때만 저장합니다."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if self._versions.get(key[0], 0) != version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, class_id, dates=None):
+        """
+        반의 항목 중 바뀐 날짜를 기간에 포함하는 것만 지웁니다.
+
+        Args:
+            class_id: 바뀐 반
+            dates: 바뀐 날짜('YYYY-MM-DD') 목록, None이면 반 전체
+        """
+        dates = None if dates is None else {normalize_date(d) for d in dates}
+        with self._lock:
+            self._versions[class_id] = self._versions.get(class_id, 0) + 1
+            stale = []
+            for key in self._entries:
+                if key[0] != class_id:
+                    continue
+                start, end = key[1], key[2]
+                if dates is None or any((not start or d >= start) and (not end or d <= end) for d in dates):
+                    stale.append(key)
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            for class_id in self._versions:
+                self._versions[class_id] += 1
+            self._entries.clear()
+
+    # 메트릭
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
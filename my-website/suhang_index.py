@@ -0,0 +1,166 @@
+"""
+수행평가 마감일 인덱스
+반별 수행평가를 (마감일, id) 순으로 정렬된 목록으로 메모리에 두고,
+상태 구분과 "N일 이내 마감" 조회를 이분 탐색으로 처리합니다.
+
+상태는 서버 날짜 기준이며 수행평가 페이지와 같습니다.
+- urgent: 오늘·내일 마감
+- scheduled: 모레 이후 마감
+- done: 마감일이 지남 (최근 마감 순)
+
+추가·삭제 API가 인덱스를 바로 고치고, 복제본 동기화로 바뀐 반은 다음 조회 때 SQLite에서 다시 읽습니다.
+"""
+
+import bisect
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+STATUSES = ('urgent', 'scheduled', 'done')
+# 오늘부터 이 일수 미만으로 남은 마감은 urgent
+URGENT_DAYS = 2
+
+COLUMNS = ('id', 'subject', 'title', 'deadline', 'description', 'creator_name', 'creator_code', 'created_at')
+
+
+def parse_statuses(value):
+    """
+    'urgent,scheduled' 같은 쿼리 값을 상태 목록으로 바꿉니다 (입력 순서와 관계없이 urgent, scheduled, done 순).
+
+    Raises:
+        ValueError: 알 수 없는 상태가 포함된 경우
+    """
+    parts = {part.strip() for part in value.split(',') if part.strip()}
+    if not parts or parts - set(STATUSES):
+        raise ValueError(f"status는 {', '.join(STATUSES)} 중에서 선택하세요.")
+    return [status for status in STATUSES if status in parts]
+
+
+def _ordinal(deadline):
+    try:
+        return date.fromisoformat(deadline).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class Deadlines:
+    """한 반의 수행평가를 마감일 순으로 보관합니다."""
+
+    def __init__(self, rows=()):
+        self.keys = []
+        self.rows = {}
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        # 같은 id가 이미 있으면 교체 (SQLite 커밋 직후 다시 읽힌 경우 등)
+        self.remove(row['id'])
+        key = (row['deadline'] or '', row['id'])
+        bisect.insort(self.keys, key)
+        self.rows[row['id']] = (dict(row), _ordinal(row['deadline']))
+
+    def remove(self, suhang_id):
+        entry = self.rows.pop(suhang_id, None)
+        if entry is None:
+            return
+        key = (entry[0]['deadline'] or '', suhang_id)
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+    def _items(self, keys, status, today):
+        items = []
+        for _, suhang_id in keys:
+            row, ordinal = self.rows[suhang_id]
+            items.append(dict(row, status=status, days_left=None if ordinal is None else ordinal - today.toordinal()))
+        return items
+
+    def _bounds(self, today):
+        """오늘·모레 마감이 시작되는 위치 (그 앞은 done, 사이는 urgent, 뒤는 scheduled)."""
+        today_index = bisect.bisect_left(self.keys, (today.isoformat(),))
+        scheduled_index = bisect.bisect_left(self.keys, ((today + timedelta(days=URGENT_DAYS)).isoformat(),))
+        return today_index, scheduled_index
+
+    def by_status(self, statuses, today):
+        """상태별로 나눈 목록을 urgent, scheduled, done 순으로 이어서 반환합니다."""
+        today_index, scheduled_index = self._bounds(today)
+        slices = {
+            'urgent': self.keys[today_index:scheduled_index],
+            'scheduled': self.keys[scheduled_index:],
+            'done': self.keys[:today_index][::-1]
+        }
+        items = []
+        for status in statuses:
+            items.extend(self._items(slices[status], status, today))
+        return items
+
+    def in_order(self, today):
+        """마감일 오름차순 전체 목록 (상태 포함)."""
+        today_index, scheduled_index = self._bounds(today)
+        return (self._items(self.keys[:today_index], 'done', today)
+                + self._items(self.keys[today_index:scheduled_index], 'urgent', today)
+                + self._items(self.keys[scheduled_index:], 'scheduled', today))
+
+    def upcoming(self, days, today):
+        """오늘부터 days일 뒤까지 마감인 수행평가를 마감일 순으로 반환합니다."""
+        today_index, scheduled_index = self._bounds(today)
+        end_index = bisect.bisect_left(self.keys, ((today + timedelta(days=days + 1)).isoformat(),))
+        return (self._items(self.keys[today_index:min(scheduled_index, end_index)], 'urgent', today)
+                + self._items(self.keys[scheduled_index:end_index], 'scheduled', today))
+
+
+class SuhangIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._classes = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _load(self, class_id):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(f'''SELECT {', '.join(COLUMNS)} FROM suhang WHERE class_id = ?
+                                    ORDER BY deadline''', (class_id,)).fetchall()
+        finally:
+            conn.close()
+        self.loads += 1
+        return Deadlines(dict(zip(COLUMNS, row)) for row in rows)
+
+    def query(self, class_id, func):
+        """반 인덱스를 (없으면 SQLite에서 읽어) 락 안에서 func(Deadlines)로 조회합니다."""
+        with self._lock:
+            deadlines = self._classes.get(class_id)
+            if deadlines is None:
+                deadlines = self._classes[class_id] = self._load(class_id)
+            return func(deadlines)
+
+    def add(self, class_id, row):
+        """SQLite 커밋 후 호출합니다. 아직 읽지 않은 반이면 다음 조회 때 함께 읽힙니다."""
+        with self._lock:
+            deadlines = self._classes.get(class_id)
+            if deadlines is not None:
+                deadlines.add(row)
+
+    def remove(self, class_id, suhang_id):
+        with self._lock:
+            deadlines = self._classes.get(class_id)
+            if deadlines is not None:
+                deadlines.remove(suhang_id)
+
+    def invalidate(self, class_ids=None):
+        """반 인덱스를 버립니다 (None이면 전체). 다음 조회 때 SQLite에서 다시 읽습니다."""
+        with self._lock:
+            if class_ids is None:
+                self._classes.clear()
+            else:
+                for class_id in class_ids:
+                    self._classes.pop(class_id, None)
+
+    # 메트릭
+    def stats(self):
+        with self._lock:
+            return {
+                'classes': len(self._classes),
+                'items': sum(len(d.keys) for d in self._classes.values()),
+                'loads': self.loads
+            }
@@ -0,0 +1,303 @@
+"""
+요청 추적 (tracing span)
+요청 하나에서 Supabase 호출, SQLite 쿼리, 급식 로딩, JSON 인코딩이 각각 언제 얼마나 걸렸는지
+폭포(waterfall)로 보기 위한 작은 span API입니다. 부모 span은 contextvar로 전달됩니다.
+
+- 요청마다 루트 span을 열고(sample_rate 비율), 그 안에서 열린 span만 기록합니다.
+  추적하지 않는 요청에서 span()은 contextvar 하나를 읽고 바로 돌아옵니다.
+- 끝난 span은 루트 span에 모았다가 요청이 끝나면 큐에 넣고,
+  백그라운드 스레드가 NDJSON(한 줄에 span 하나) 파일에 씁니다.
+  파일은 max_bytes마다 돌려 가며 backups개까지 남깁니다.
+- `python tracing.py spans.ndjson > trace.json`으로 Chrome trace 형식으로 바꿔
+  Perfetto(ui.perfetto.dev)나 chrome://tracing에서 봅니다.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from config import Config
+
+_current = contextvars.ContextVar('trace_span', default=None)
+_ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'attrs', 'start', 'started', 'duration', 'error',
+                 'thread', 'finished')
+
+    def __init__(self, trace_id, parent, name, attrs):
+        self.trace_id = trace_id
+        self.span_id = next(_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.duration = None
+        self.error = None
+        self.thread = threading.get_ident()
+        # 같은 추적에서 끝난 span 목록 (루트가 끝날 때 한 번에 내보냄)
+        self.finished = parent.finished if parent is not None else []
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        entry = {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_us': int(self.start * 1e6),
+            'duration_us': int(self.duration * 1e6),
+            'pid': os.getpid(),
+            'tid': self.thread
+        }
+        if self.attrs:
+            entry['attrs'] = self.attrs
+        if self.error:
+            entry['error'] = self.error
+        return entry
+
+
+class _SpanListener(logging.handlers.QueueListener):
+    """큐에 들어온 추적 하나(span 목록)를 내보내기 스레드에서 NDJSON 줄로 바꿔 파일 핸들러에 넘깁니다."""
+
+    def prepare(self, spans):
+        lines = [json.dumps(span.to_dict(), ensure_ascii=False, default=str) for span in spans]
+        return logging.makeLogRecord({'msg': '\n'.join(lines)})
+
+
+class Tracer:
+    def __init__(self, path, enabled=False, sample_rate=1.0, max_bytes=10 * 1024 * 1024, backups=3,
+                 queue_size=50000):
+        """
+        Args:
+            path: span을 쓸 NDJSON 파일
+            enabled: False면 아무것도 기록하지 않음
+            sample_rate: 루트 span(요청)을 기록할 비율 (0~1)
+            max_bytes: 파일을 돌리는 크기
+            backups: 남겨 둘 이전 파일 수
+        """
+        self.path = path
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue = queue.Queue(queue_size)
+        self._listener = None
+        self._start_lock = threading.Lock()
+        self.traces = 0
+        self.spans = 0
+        self.dropped = 0
+
+    # 시작/종료
+    def _ensure_started(self):
+        if self._listener is not None:
+            return
+        with self._start_lock:
+            if self._listener is not None:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._listener = _SpanListener(self._queue, handler)
+            self._listener.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """남은 span을 모두 쓰고 내보내기 스레드를 멈춥니다."""
+        with self._start_lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+    def _after_fork(self):
+        # fork된 자식에는 내보내기 스레드가 없으므로 처음 쓸 때 다시 시작
+        self._queue = queue.Queue(self._queue.maxsize)
+        self._listener = None
+        self._start_lock = threading.Lock()
+
+    # span
+    def start_trace(self, name, trace_id, **attrs):
+        """
+        루트 span을 열고 (span, 토큰)을 반환합니다. 표본에서 빠지면 (None, None).
+        end()로 닫습니다.
+        """
+        if not self.enabled or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return None, None
+        self._ensure_started()
+        self.traces += 1
+        span = Span(trace_id, None, name, attrs)
+        return span, _current.set(span)
+
+    def end(self, span, token=None, error=None):
+        if token is not None:
+            _current.reset(token)
+        span.duration = time.perf_counter() - span.started
+        if error is not None:
+            span.error = error if isinstance(error, str) else f'{type(error).__name__}: {error}'
+        span.finished.append(span)
+        if span.parent_id is None:
+            # 직렬화·쓰기는 내보내기 스레드에서, 요청당 큐 넣기 한 번
+            self._export(span.finished)
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        """현재 추적 안에서 하위 span을 엽니다. 추적 중이 아니면 아무것도 하지 않습니다."""
+        parent = _current.get()
+        if parent is None:
+            yield None
+            return
+        span = Span(parent.trace_id, parent, name, attrs)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            _current.reset(token)
+            self.end(span, error=e)
+            raise
+        _current.reset(token)
+        self.end(span)
+
+    def _export(self, spans):
+        try:
+            self._queue.put_nowait(spans)
+            self.spans += len(spans)
+        except queue.Full:
+            self.dropped += len(spans)
+
+    # 계측 도우미
+    def wrap(self, name, func):
+        """func 호출을 name span으로 감쌉니다."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with self.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, cls, prefix, exclude=()):
+        """cls의 공개 메서드를 (exclude 제외) 모두 '{prefix}.{메서드}' span으로 감쌉니다."""
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith('_') or attr in exclude:
+                continue
+            if callable(value) and not isinstance(value, (staticmethod, classmethod, type)):
+                setattr(cls, attr, self.wrap(f'{prefix}.{attr}', value))
+        return cls
+
+    def connect(self, database, **kwargs):
+        """execute마다 span을 남기는 sqlite3 연결을 엽니다."""
+        return sqlite3.connect(database, factory=TracedConnection, **kwargs)
+
+    # 메트릭
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'path': self.path,
+            'traces': self.traces,
+            'spans': self.spans,
+            'pending': self._queue.qsize(),
+            'dropped': self.dropped
+        }
+
+
+# 모듈 전역 tracer (DatabaseManager·MealStore 계측과 flask_app이 함께 사용)
+tracer = Tracer(Config.TRACE_PATH, enabled=Config.TRACE_ENABLED, sample_rate=Config.TRACE_SAMPLE_RATE,
+                max_bytes=Config.TRACE_MAX_BYTES, backups=Config.TRACE_BACKUPS)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=tracer._after_fork)
+
+
+def traced(name):
+    """함수를 name span으로 감싸는 데코레이터."""
+    return lambda func: tracer.wrap(name, func)
+
+
+def _sql_name(sql):
+    """공백을 정리한 SQL 문 (값은 ? 자리로 넘어오므로 들어가지 않음)."""
+    return ' '.join(sql.split())[:200]
+
+
+class TracedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        if _current.get() is None:
+            return super().execute(sql, parameters)
+        with tracer.span('sqlite.execute', sql=_sql_name(sql)) as span:
+            result = super().execute(sql, parameters)
+            if self.rowcount >= 0:
+                span.set(rows=self.rowcount)
+            return result
+
+    def executemany(self, sql, seq_of_parameters):
+        if _current.get() is None:
+            return super().executemany(sql, seq_of_parameters)
+        with tracer.span('sqlite.executemany', sql=_sql_name(sql)) as span:
+            result = super().executemany(sql, seq_of_parameters)
+            span.set(rows=self.rowcount)
+            return result
+
+
+class TracedConnection(sqlite3.Connection):
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute는 cursor()를 거치지 않으므로 직접 연결
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def to_chrome_trace(lines):
+    """NDJSON span 줄들을 Chrome trace event(JSON) 목록으로 바꿉니다."""
+    events = []
+    for line in lines:
+        if not line.strip():
+            continue
+        span = json.loads(line)
+        args = dict(span.get('attrs') or {}, trace_id=span['trace_id'], span_id=span['span_id'])
+        if span.get('error'):
+            args['error'] = span['error']
+        events.append({
+            'name': span['name'],
+            'cat': span['name'].split('.')[0],
+            'ph': 'X',
+            'ts': span['start_us'],
+            'dur': span['duration_us'],
+            'pid': span['pid'],
+            'tid': span['tid'],
+            'args': args
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('사용법: python tracing.py traces/spans.ndjson [trace_id] > trace.json')
+        raise SystemExit(2)
+    with open(sys.argv[1], encoding='utf-8') as f:
+        lines = f.readlines()
+    if len(sys.argv) > 2:
+        lines = [line for line in lines if f'"trace_id": "{sys.argv[2]}"' in line]
+    json.dump(to_chrome_trace(lines), sys.stdout, ensure_ascii=False)
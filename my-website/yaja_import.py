@@ -0,0 +1,354 @@
+"""
+야자 기록 일괄 가져오기
+지난 학기 기록을 스프레드시트(CSV/XLSX)에서 한꺼번에 넣습니다.
+야자 추가 API처럼 한 행씩 커밋하지 않고, 파일을 chunk_size행씩 읽어 한 트랜잭션의 executemany로 씁니다.
+
+- 행은 schemas.YAJA_IMPORT로 검사하고, 반 명단에 없는 학생코드는 거부합니다 (학생명·학번은 명단 값 사용).
+- (날짜, 차시, 학생코드)가 파일 안에서 겹치면 처음 행만, DB에 이미 있으면 건너뜁니다.
+- Supabase에는 아웃박스로 보내므로 OUTBOX_BATCH_SIZE(또는 --supabase-batch)행씩 upsert됩니다.
+- 통계 캐시 무효화(on_imported)는 행마다가 아니라 끝에 한 번, 바뀐 (반, 날짜) 전체로 합니다.
+  CLI는 보관 기준일 이전 날짜가 있으면 끝에 보관(archive)을 한 번 실행해 요약(rollup)을 만듭니다.
+
+열 이름은 영문(date, period, student_code, student_name, student_number, reason)이나
+한글(날짜, 차시, 학생코드, 이름, 학번, 사유)을 씁니다. XLSX는 openpyxl이 필요합니다.
+
+사용법 (my-website 디렉터리에서):
+    python yaja_import.py 2024-2학기.csv --class-id 1-5
+    python yaja_import.py 기록.xlsx --sheet 야자 --dry-run
+"""
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import time
+from datetime import date, datetime
+
+from config import Config
+from schemas import YAJA_IMPORT, SchemaError
+
+# 표준 열 이름 -> 허용하는 머리글
+COLUMN_ALIASES = {
+    'date': ('date', '날짜', '일자'),
+    'period': ('period', '차시'),
+    'student_code': ('student_code', 'code', '학생코드', '코드'),
+    'student_name': ('student_name', 'name', '이름', '학생명'),
+    'student_number': ('student_number', 'studentnumber', '학번'),
+    'reason': ('reason', '사유')
+}
+REQUIRED_COLUMNS = ('date', 'period', 'student_code')
+# 머리글을 찾을 때 살펴볼 앞쪽 줄 수
+HEADER_SCAN_ROWS = 10
+# 보고서에 남길 오류 행 수
+MAX_ERRORS = 50
+
+INSERT_SQL = '''INSERT INTO yaja_students
+                (date, period, student_name, student_code, student_number, reason, class_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (class_id, date, period, student_code) DO NOTHING'''
+INSERTED_COLUMNS = ('id', 'date', 'period', 'student_name', 'student_code', 'student_number', 'reason',
+                    'class_id')
+
+_ALIAS_LOOKUP = {alias: column for column, aliases in COLUMN_ALIASES.items() for alias in aliases}
+_DATE_PATTERN = re.compile(r'^(\d{4})[./-](\d{1,2})[./-](\d{1,2})\.?$')
+
+
+def _header_index(row):
+    """머리글 줄이면 {표준 열 이름: 위치}, 아니면 None."""
+    index = {}
+    for i, value in enumerate(row):
+        column = _ALIAS_LOOKUP.get(str(value or '').strip().lower().replace(' ', ''))
+        if column and column not in index:
+            index[column] = i
+    return index if all(c in index for c in REQUIRED_COLUMNS) else None
+
+
+def _normalize_date(value):
+    """'2024.9.2', '2024/09/02', '20240902', 날짜 셀을 'YYYY-MM-DD'로 맞춥니다 (모르는 형식은 그대로 두어 스키마 검사에서 거부)."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip()
+    match = _DATE_PATTERN.match(text)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+        return f'{year:04d}-{month:02d}-{day:02d}'
+    if len(text) == 8 and text.isdigit():
+        return f'{text[:4]}-{text[4:6]}-{text[6:]}'
+    return text
+
+
+def _cell(value):
+    # XLSX 숫자 셀(학생코드·학번·차시)이 1.0처럼 읽히면 정수로
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _records(rows):
+    """(줄 번호, 셀 목록)에서 머리글을 찾아 (줄 번호, {열: 값})을 만듭니다."""
+    index = None
+    for line, row in rows:
+        if index is None:
+            index = _header_index(row)
+            if index is None and line >= HEADER_SCAN_ROWS:
+                raise ValueError(f"머리글(날짜, 차시, 학생코드)을 찾을 수 없습니다 (앞 {HEADER_SCAN_ROWS}줄).")
+            continue
+        if all(value is None or str(value).strip() == '' for value in row):
+            continue
+        record = {column: _cell(row[i]) if i < len(row) else None for column, i in index.items()}
+        if record.get('date') is not None:
+            record['date'] = _normalize_date(record['date'])
+        yield line, record
+    if index is None:
+        raise ValueError('머리글(날짜, 차시, 학생코드)을 찾을 수 없습니다.')
+
+
+def read_csv(path, encoding='utf-8-sig'):
+    with open(path, encoding=encoding, newline='') as f:
+        yield from _records(enumerate(csv.reader(f), start=1))
+
+
+def read_xlsx(path, sheet=None):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError('XLSX 파일을 읽으려면 openpyxl이 필요합니다: pip install openpyxl')
+    # read_only: 시트 전체를 메모리에 올리지 않고 줄 단위로 읽음
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        yield from _records(enumerate(worksheet.iter_rows(values_only=True), start=1))
+    finally:
+        workbook.close()
+
+
+def read_rows(path, sheet=None, encoding='utf-8-sig'):
+    """파일 확장자에 따라 (줄 번호, {열: 값})을 차례로 읽습니다."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return read_csv(path, encoding)
+    if extension in ('.xlsx', '.xlsm'):
+        return read_xlsx(path, sheet)
+    raise ValueError(f'CSV 또는 XLSX 파일만 가져올 수 있습니다: {path}')
+
+
+class YajaImporter:
+    def __init__(self, db_path, outbox, class_id=Config.DEFAULT_CLASS_ID, roster=None, chunk_size=5000,
+                 archive=None, on_imported=None, progress=None):
+        """
+        Args:
+            db_path: SQLite 파일
+            outbox: 추가한 행을 Supabase로 보낼 OutboxReplayer (꺼져 있으면 SQLite에만 씀)
+            class_id: 가져올 반
+            roster: classes.load_roster() 결과. None이면 명단 검사를 하지 않음 (학생명·학번 열 필요)
+            chunk_size: 한 트랜잭션에 쓰는 행 수
+            archive: Archive. 보관된 기간의 행은 원본 테이블에 없으므로 보관 파일에서 중복을 확인
+            on_imported: 끝난 뒤 추가된 {(class_id, date)}로 한 번 호출 (캐시 무효화용)
+            progress: chunk를 쓸 때마다 현재 보고서(dict)로 호출
+        """
+        self.db_path = db_path
+        self.outbox = outbox
+        self.class_id = class_id
+        self.roster = {entry['code']: entry for entry in roster} if roster is not None else None
+        self.chunk_size = chunk_size
+        self.archive = archive
+        self.on_imported = on_imported
+        self.progress = progress
+
+    def _validate(self, record):
+        """검사한 행을 INSERT 인자로 반환합니다. 잘못된 행이면 SchemaError."""
+        data = YAJA_IMPORT.parse(record)
+        if self.roster is not None:
+            entry = self.roster.get(data['student_code'])
+            if entry is None:
+                raise SchemaError(f"{self.class_id}반 명단에 없는 학생코드입니다: {data['student_code']}",
+                                  'student_code')
+            data['student_name'], data['student_number'] = entry['name'], entry['studentNumber']
+        elif not data['student_name'] or not data['student_number']:
+            raise SchemaError('명단이 없으면 이름과 학번 열이 필요합니다.', 'student_name')
+        return (data['date'], data['period'], data['student_name'], data['student_code'],
+                data['student_number'], data['reason'], self.class_id)
+
+    def _drop_archived(self, batch):
+        """이미 보관 파일로 옮겨진 (날짜, 차시, 학생코드)를 뺍니다."""
+        if self.archive is None:
+            return batch
+        start = min(values[0] for values in batch)
+        if not self.archive.covers(start):
+            return batch
+        end = min(max(values[0] for values in batch), self.archive.archived_through)
+        archived = self.archive.yaja_keys(self.class_id, start, end)
+        if not archived:
+            return batch
+        return [values for values in batch if (values[0], values[1], values[3]) not in archived]
+
+    def _write(self, batch):
+        """chunk 하나를 한 트랜잭션으로 쓰고, 새로 추가된 행을 반환합니다."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # AUTOINCREMENT라 새 행의 id는 모두 지금의 최대 id보다 큼 (쓰기 락을 잡은 상태)
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM yaja_students').fetchone()[0]
+            conn.executemany(INSERT_SQL, batch)
+            inserted = conn.execute(f'''SELECT {', '.join(INSERTED_COLUMNS)} FROM yaja_students
+                                        WHERE id > ? ORDER BY id''', (last_id,)).fetchall()
+            self.outbox.enqueue_many(conn, 'yaja_students', [dict(zip(INSERTED_COLUMNS, row)) for row in inserted])
+            conn.execute('COMMIT')
+            return inserted
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def run(self, records, dry_run=False):
+        """
+        records((줄 번호, {열: 값}))를 가져옵니다.
+
+        Returns:
+            {'read', 'inserted', 'duplicates', 'invalid', 'errors', 'chunks', 'dates', 'duration_ms', 'rows_per_sec'}
+            errors는 앞쪽 MAX_ERRORS개의 {'line', 'field', 'msg'}
+        """
+        started = time.perf_counter()
+        report = {'read': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0, 'errors': [], 'chunks': 0,
+                  'dry_run': dry_run}
+        seen = set()
+        touched = set()
+        batch = []
+
+        def flush():
+            if not dry_run:
+                rows = self._drop_archived(batch)
+                inserted = self._write(rows) if rows else []
+                report['inserted'] += len(inserted)
+                report['duplicates'] += len(batch) - len(inserted)
+                touched.update((row[7], row[1]) for row in inserted)
+            report['chunks'] += 1
+            batch.clear()
+            self._finish(report, started)
+            if self.progress is not None:
+                self.progress(report)
+
+        for line, record in records:
+            report['read'] += 1
+            try:
+                values = self._validate(record)
+            except SchemaError as e:
+                report['invalid'] += 1
+                if len(report['errors']) < MAX_ERRORS:
+                    report['errors'].append({'line': line, 'field': e.field, 'msg': str(e)})
+                continue
+            # 파일 안의 (날짜, 차시, 학생코드) 중복은 처음 행만
+            key = (values[0], values[1], values[3])
+            if key in seen:
+                report['duplicates'] += 1
+                continue
+            seen.add(key)
+            batch.append(values)
+            if len(batch) >= self.chunk_size:
+                flush()
+        if batch:
+            flush()
+        dates = sorted(date for _, date in touched)
+        report['dates'] = [dates[0], dates[-1]] if dates else None
+        self._finish(report, started)
+        if touched and self.on_imported is not None:
+            self.on_imported(touched)
+        return report
+
+    @staticmethod
+    def _finish(report, started):
+        elapsed = time.perf_counter() - started
+        report['duration_ms'] = round(elapsed * 1000, 1)
+        report['rows_per_sec'] = round(report['read'] / elapsed, 1) if elapsed > 0 else 0.0
+
+
+def _print_progress(report):
+    print(f"  {report['read']:,}행 읽음 · 추가 {report['inserted']:,} · 중복 {report['duplicates']:,} · "
+          f"오류 {report['invalid']:,} · {report['rows_per_sec']:,.0f}행/s", flush=True)
+
+
+def drain_outbox(outbox):
+    """아웃박스를 배치 단위로 Supabase에 보냅니다. 보낸 항목 수를 반환합니다."""
+    total = outbox.stats()['queue_depth']
+    sent = 0
+    started = time.perf_counter()
+    while True:
+        processed = outbox.drain_once()
+        if not processed:
+            break
+        sent += processed
+        rate = sent / max(time.perf_counter() - started, 1e-9)
+        print(f"  Supabase {sent:,}/{total:,} · {rate:,.0f}행/s", flush=True)
+    return sent
+
+
+def main(argv=None):
+    from archive import Archive
+    from classes import load_roster, resolve_class_id
+    from database import db_manager
+    from logs import setup_logging
+    from outbox import OutboxReplayer
+
+    parser = argparse.ArgumentParser(description='CSV/XLSX의 야자 기록을 한꺼번에 가져오기')
+    parser.add_argument('path', help='CSV 또는 XLSX 파일')
+    parser.add_argument('--class-id', default=Config.DEFAULT_CLASS_ID, help='가져올 반 (기본: DEFAULT_CLASS_ID)')
+    parser.add_argument('--sheet', default=None, help='XLSX 시트 이름 (기본: 첫 시트)')
+    parser.add_argument('--encoding', default='utf-8-sig', help='CSV 인코딩 (예: cp949)')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='한 트랜잭션에 쓰는 행 수')
+    parser.add_argument('--supabase-batch', type=int, default=Config.OUTBOX_BATCH_SIZE,
+                        help='Supabase upsert 한 번에 보내는 행 수')
+    parser.add_argument('--local-only', action='store_true', help='SQLite에만 쓰고 Supabase로 보내지 않음')
+    parser.add_argument('--no-roster', action='store_true', help='명단 검사 없이 파일의 이름·학번 사용')
+    parser.add_argument('--no-archive', action='store_true', help='끝난 뒤 보관(archive)을 실행하지 않음')
+    parser.add_argument('--dry-run', action='store_true', help='검사만 하고 쓰지 않음')
+    args = parser.parse_args(argv)
+    setup_logging(fmt='text', sample_rate=1.0)
+
+    class_id = resolve_class_id(args.class_id)
+    roster = None
+    if not args.no_roster:
+        roster = load_roster(class_id)
+        if roster is None:
+            parser.error(f'{class_id}반 명단 파일이 없습니다. --no-roster로 명단 검사 없이 가져올 수 있습니다.')
+
+    outbox = OutboxReplayer(Config.SQLITE_PATH, db_manager, enabled=Config.OUTBOX_ENABLED and not args.local_only,
+                            batch_size=args.supabase_batch)
+    if outbox.is_active() and not args.dry_run:
+        # 로컬 id가 Supabase에만 있는 행과 겹치지 않도록 먼저 맞춤
+        outbox.align_sequences()
+
+    archive = Archive(Config.SQLITE_PATH, Config.ARCHIVE_DB_PATH, outbox, Config.ARCHIVE_AFTER_DAYS)
+    archive.init()
+
+    print(f"📥 {args.path} -> {class_id}반 ({'검사만' if args.dry_run else Config.SQLITE_PATH})")
+    importer = YajaImporter(Config.SQLITE_PATH, outbox, class_id, roster, args.chunk_size, archive,
+                            progress=_print_progress)
+    report = importer.run(read_rows(args.path, args.sheet, args.encoding), dry_run=args.dry_run)
+    print(f"✅ {report['read']:,}행 중 {report['inserted']:,}행 추가, 중복 {report['duplicates']:,}, "
+          f"오류 {report['invalid']:,} ({report['duration_ms'] / 1000:.1f}s, {report['rows_per_sec']:,.0f}행/s)")
+    for error in report['errors']:
+        print(f"  {error['line']}줄: {error['msg']}")
+    if report['invalid'] > len(report['errors']):
+        print(f"  ... 외 {report['invalid'] - len(report['errors'])}행")
+    if args.dry_run or not report['inserted']:
+        return
+
+    if outbox.is_active():
+        sent = drain_outbox(outbox)
+        remaining = outbox.stats()['queue_depth']
+        print(f"☁️  Supabase에 {sent:,}행 반영" + (f", 남은 {remaining:,}행은 서버 아웃박스가 이어서 보냄" if remaining else ''))
+
+    if not args.no_archive:
+        # 지난 학기를 가져왔으면 보관을 한 번 실행해 원본을 옮기고 요약(rollup)을 만듦
+        if report['dates'][0] < archive.cutoff().isoformat():
+            result = archive.run()
+            print(f"🗄️  기준일 {result['cutoff']} 이전 야자 {result['yaja_students']:,}행 보관 ({result['duration_ms']:.0f}ms)")
+
+
+if __name__ == '__main__':
+    main()
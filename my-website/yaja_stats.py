@@ -0,0 +1,321 @@
+"""
+야자 통계 집계 모듈
+yaja_students 행 목록을 날짜+학생 단위로 집계하고 ISO 주·월 단위로 묶습니다.
+보관(archive)된 학기는 날짜+학생 단위 요약(rollup)으로 받아 같은 방식으로 합칩니다.
+"""
+
+from collections import Counter
+from datetime import date as date_cls
+
+# 요청 가능한 집계 단위
+GRANULARITIES = ('day', 'week', 'month')
+# 응답 섹션 (fields로 필요한 것만 요청 가능)
+FIELDS = ('total_absences', 'daily_stats', 'daily_unique_students', 'weekly_stats', 'monthly_stats',
+          'reason_stats', 'student_stats', 'period_stats', 'student_details',
+          'unique_absence_sum', 'unique_absence_avg', 'weekly_avg', 'monthly_avg')
+# 응답 형식: object(날짜·학생마다 딕셔너리) 또는 columnar(일별·학생별 표를 열 배열로)
+FORMATS = ('object', 'columnar')
+
+
+def parse_granularity(value):
+    """
+    'day,week' 같은 쿼리 값을 집계 단위 집합으로 바꿉니다. 값이 없으면 전체 단위입니다.
+
+    Raises:
+        ValueError: 알 수 없는 단위가 포함된 경우
+    """
+    if not value:
+        return set(GRANULARITIES)
+    parts = {part.strip() for part in value.split(',') if part.strip()}
+    unknown = parts - set(GRANULARITIES)
+    if unknown or not parts:
+        raise ValueError(f"granularity는 {', '.join(GRANULARITIES)} 중에서 선택하세요.")
+    return parts
+
+
+def parse_fields(value):
+    """
+    'period_stats,reason_stats' 같은 쿼리 값을 응답 섹션 집합으로 바꿉니다. 값이 없으면 전체 섹션입니다.
+
+    Raises:
+        ValueError: 알 수 없는 섹션이 포함된 경우
+    """
+    if not value:
+        return set(FIELDS)
+    parts = {part.strip() for part in value.split(',') if part.strip()}
+    unknown = parts - set(FIELDS)
+    if unknown or not parts:
+        raise ValueError(f"fields는 {', '.join(FIELDS)} 중에서 선택하세요.")
+    return parts
+
+
+def parse_format(value):
+    """format 쿼리 값을 확인합니다. 값이 없으면 'object'입니다."""
+    if not value:
+        return 'object'
+    if value not in FORMATS:
+        raise ValueError(f"format은 {', '.join(FORMATS)} 중에서 선택하세요.")
+    return value
+
+
+def week_key(date_str):
+    """'YYYY-MM-DD'를 ISO 주 키('YYYY-Www')로 바꿉니다."""
+    year, week, _ = date_cls.fromisoformat(date_str).isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+def month_key(date_str):
+    return date_str[:7]
+
+
+def semester_key(date_str):
+    """학기 키: 3~8월은 'YYYY-1', 9월~다음 해 2월은 'YYYY-2' (YYYY는 학년도)."""
+    year, month = int(date_str[:4]), int(date_str[5:7])
+    if month >= 9:
+        return f'{year}-2'
+    if month >= 3:
+        return f'{year}-1'
+    return f'{year - 1}-2'
+
+
+def semester_start(day):
+    """day(date)가 속한 학기의 첫날(3월 1일 또는 9월 1일)을 반환합니다."""
+    if day.month >= 9:
+        return date_cls(day.year, 9, 1)
+    if day.month >= 3:
+        return date_cls(day.year, 3, 1)
+    return date_cls(day.year - 1, 9, 1)
+
+
+def _new_bucket():
+    return {'students': set(), 'absences': 0, 'periods': {1: 0, 2: 0, 3: 0}, 'reasons': {}}
+
+
+def _finish_buckets(buckets):
+    """버킷의 학생 집합을 학생 수로 바꾸고 키 순으로 정렬합니다."""
+    result = {}
+    for key in sorted(buckets):
+        bucket = buckets[key]
+        result[key] = {
+            'unique_students': len(bucket['students']),
+            'absences': bucket['absences'],
+            'periods': bucket['periods'],
+            'reasons': bucket['reasons']
+        }
+    return result
+
+
+def build_yaja_statistics(rows, granularity=GRANULARITIES, rollups=(), fields=FIELDS, columnar=False):
+    """
+    야자 기록을 통계 응답 형태로 집계합니다.
+
+    Args:
+        rows: (date, period, reason, student_name) 튜플 목록
+        rollups: 보관된 기록의 (date, student_name, (1차시 수, 2차시 수, 3차시 수), [사유 목록]) 목록
+        granularity: 포함할 집계 단위 ('day', 'week', 'month')
+            - day: daily_stats, daily_unique_students
+            - week: weekly_stats, 학생별 weeks
+            - month: monthly_stats, 학생별 months
+            주/월 평균(weekly_avg, monthly_avg)은 단위와 관계없이 항상 포함합니다.
+        fields: 포함할 응답 섹션 (FIELDS 중). 빠진 섹션은 집계하지 않습니다.
+        columnar: True면 일별·학생별 표(daily_stats, daily_unique_students, student_stats,
+            student_details)를 행마다 딕셔너리 대신 열 배열로 만듭니다.
+            예: daily_stats = {'date': [...], 'count': [...]}
+    """
+    fields = set(fields)
+    if 'day' not in granularity:
+        fields -= {'daily_stats', 'daily_unique_students'}
+    if 'week' not in granularity:
+        fields.discard('weekly_stats')
+    if 'month' not in granularity:
+        fields.discard('monthly_stats')
+    need_details = 'student_details' in fields
+    need_student_days = need_details or 'student_stats' in fields
+    need_reasons = need_details or bool(fields & {'reason_stats', 'weekly_stats', 'monthly_stats'})
+    need_weekly, need_monthly = 'weekly_stats' in fields, 'monthly_stats' in fields
+    # 차시별 통계만 요청하면 날짜+학생 단위로 묶지 않음
+    need_pairs = bool(fields - {'period_stats'})
+
+    period_stats = {1: 0, 2: 0, 3: 0}
+    # (date, student_name) -> (차시 집합, [사유 목록])
+    day_student_map = {}
+    for date, student_name, period_counts, reasons in rollups:
+        info = day_student_map.setdefault((date, student_name), (set(), [])) if need_pairs else None
+        for period, count in enumerate(period_counts, start=1):
+            if count:
+                period_stats[period] += count
+                if info is not None:
+                    info[0].add(period)
+        if info is not None:
+            info[1].extend(reasons)
+    for date, period, reason, student_name in rows:
+        # 차시별 통계(전체)
+        period_stats[period] += 1
+        if need_pairs:
+            info = day_student_map.get((date, student_name))
+            if info is None:
+                info = day_student_map[(date, student_name)] = (set(), [])
+            info[0].add(period)
+            info[1].append(reason)
+
+    stats = {}
+    if not need_pairs:
+        stats['period_stats'] = period_stats
+        return stats
+
+    # 날짜별 불참 학생 (날짜+학생은 한 번씩만 나오므로 목록), 학생별 불참 일수·상세, 사유, 주·월 버킷
+    daily_unique_students = {}
+    student_stats, student_details, reason_stats = {}, {}, {}
+    weekly, monthly = {}, {}
+    student_weeks, student_months = {}, {}
+    # 날짜별 주·월 키 (같은 날짜가 여러 학생에 반복되므로 한 번만 계산)
+    period_keys = {}
+    for (date, student_name), (periods, reasons) in day_student_map.items():
+        students = daily_unique_students.get(date)
+        if students is None:
+            students = daily_unique_students[date] = []
+            period_keys[date] = (week_key(date), month_key(date))
+        students.append(student_name)
+        week, month = period_keys[date]
+        if need_student_days:
+            student_stats[student_name] = student_stats.get(student_name, 0) + 1
+        distinct_reasons = set(reasons) if need_reasons else ()
+        if need_details:
+            details = student_details.get(student_name)
+            if details is None:
+                details = student_details[student_name] = {'total': 0, 'periods': {1: 0, 2: 0, 3: 0}, 'reasons': {}}
+            details['total'] += 1
+            for p in periods:
+                details['periods'][p] += 1
+            # 대표 사유(가장 많이 나온 사유)
+            top_reason = Counter(reasons).most_common(1)[0][0] if reasons else '-'
+            details['reasons'][top_reason] = details['reasons'].get(top_reason, 0) + 1
+            weeks = student_weeks.setdefault(student_name, {})
+            weeks[week] = weeks.get(week, 0) + 1
+            months = student_months.setdefault(student_name, {})
+            months[month] = months.get(month, 0) + 1
+        for r in distinct_reasons:
+            reason_stats[r] = reason_stats.get(r, 0) + 1
+        # 주·월 버킷 (불참은 날짜+학생 단위, 차시는 학생별 상세와 같이 날짜+학생의 차시 단위)
+        for wanted, buckets, key in ((need_weekly, weekly, week), (need_monthly, monthly, month)):
+            if not wanted:
+                continue
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = _new_bucket()
+            bucket['students'].add(student_name)
+            bucket['absences'] += 1
+            for p in periods:
+                bucket['periods'][p] += 1
+            for r in distinct_reasons:
+                bucket['reasons'][r] = bucket['reasons'].get(r, 0) + 1
+
+    # 전체 불참(날짜+학생명) 카운트와 평균
+    total_absences = len(day_student_map)
+    week_count = len({week for week, _ in period_keys.values()})
+    month_count = len({month for _, month in period_keys.values()})
+    # 주·월 평균: 불참(날짜+학생) 수 / 불참이 있었던 주(월) 수
+    for student_name, details in student_details.items():
+        weeks = student_weeks[student_name]
+        months = student_months[student_name]
+        details['weekly_avg'] = round(details['total'] / len(weeks), 2)
+        details['monthly_avg'] = round(details['total'] / len(months), 2)
+        if 'week' in granularity:
+            details['weeks'] = dict(sorted(weeks.items()))
+        if 'month' in granularity:
+            details['months'] = dict(sorted(months.items()))
+
+    sections = {
+        'total_absences': lambda: total_absences,
+        'daily_stats': lambda: {d: len(s) for d, s in daily_unique_students.items()},
+        'daily_unique_students': lambda: daily_unique_students,
+        'weekly_stats': lambda: _finish_buckets(weekly),
+        'monthly_stats': lambda: _finish_buckets(monthly),
+        'reason_stats': lambda: reason_stats,
+        'student_stats': lambda: student_stats,
+        'period_stats': lambda: period_stats,
+        'student_details': lambda: student_details,
+        'unique_absence_sum': lambda: total_absences,
+        # 일평균 불참: 날짜별 유니크 학생 수의 합 / 날짜 수
+        'unique_absence_avg': lambda: round(total_absences / len(daily_unique_students), 2) if daily_unique_students else 0,
+        'weekly_avg': lambda: round(total_absences / week_count, 2) if week_count else 0,
+        'monthly_avg': lambda: round(total_absences / month_count, 2) if month_count else 0
+    }
+    for name in FIELDS:
+        if name in fields:
+            stats[name] = sections[name]()
+    if columnar:
+        _to_columnar(stats)
+    return stats
+
+
+def build_student_history(rows):
+    """
+    학생 한 명의 야자 기록을 날짜별 타임라인과 요약으로 만듭니다 (반 전체 통계는 계산하지 않음).
+
+    Args:
+        rows: 날짜·차시 순으로 정렬된 (date, period, reason, student_name, student_number) 목록
+    """
+    timeline = []
+    periods = {1: 0, 2: 0, 3: 0}
+    reasons = {}
+    weeks, months = set(), set()
+    entry = None
+    for date, period, reason, _, _ in rows:
+        periods[period] += 1
+        if entry is None or entry['date'] != date:
+            entry = {'date': date, 'periods': [], 'reasons': []}
+            timeline.append(entry)
+            weeks.add(week_key(date))
+            months.add(month_key(date))
+        entry['periods'].append(period)
+        entry['reasons'].append(reason)
+    # 사유는 전체 통계(reason_stats)와 같이 날짜 단위로 셈
+    for entry in timeline:
+        for r in set(entry['reasons']):
+            reasons[r] = reasons.get(r, 0) + 1
+    days = len(timeline)
+    return {
+        'student_name': rows[-1][3] if rows else None,
+        'student_number': rows[-1][4] if rows else None,
+        'timeline': timeline,
+        'summary': {
+            'days': days,
+            'absences': len(rows),
+            'periods': periods,
+            'reasons': reasons,
+            'first_date': timeline[0]['date'] if timeline else None,
+            'last_date': timeline[-1]['date'] if timeline else None,
+            'weekly_avg': round(days / len(weeks), 2) if weeks else 0,
+            'monthly_avg': round(days / len(months), 2) if months else 0
+        }
+    }
+
+
+def _to_columnar(stats):
+    """일별·학생별 표를 열 배열로 바꿉니다. 행은 날짜·학생명 순입니다."""
+    if 'daily_stats' in stats:
+        dates = sorted(stats['daily_stats'])
+        stats['daily_stats'] = {'date': dates, 'count': [stats['daily_stats'][d] for d in dates]}
+    if 'daily_unique_students' in stats:
+        dates = sorted(stats['daily_unique_students'])
+        stats['daily_unique_students'] = {'date': dates, 'students': [stats['daily_unique_students'][d] for d in dates]}
+    if 'student_stats' in stats:
+        names = sorted(stats['student_stats'])
+        stats['student_stats'] = {'name': names, 'days': [stats['student_stats'][n] for n in names]}
+    if 'student_details' in stats:
+        details = stats['student_details']
+        names = sorted(details)
+        rows = [details[n] for n in names]
+        table = {
+            'name': names,
+            'total': [d['total'] for d in rows],
+            'periods': [[d['periods'][1], d['periods'][2], d['periods'][3]] for d in rows],
+            'reasons': [d['reasons'] for d in rows],
+            'weekly_avg': [d['weekly_avg'] for d in rows],
+            'monthly_avg': [d['monthly_avg'] for d in rows]
+        }
+        for key in ('weeks', 'months'):
+            if rows and key in rows[0]:
+                table[key] = [d[key] for d in rows]
+        stats['student_details'] = table